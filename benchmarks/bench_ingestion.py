@@ -0,0 +1,279 @@
+# benchmarks/bench_ingestion.py
+
+import os
+import sys
+import gc
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+from unittest.mock import AsyncMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_tweets import SyntheticTweetGenerator
+from benchmarks.in_memory_db import InMemoryDBManager, NullVectorDBManager
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'ingestion.json')
+
+# name -> function taking (generator, args) and returning a result dict; may be async
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns, total_seconds, items):
+    latencies_ns.sort()
+    return {
+        'items': items,
+        'total_seconds': round(total_seconds, 4),
+        'tweets_per_sec': round(items / total_seconds, 1) if total_seconds > 0 else 0.0,
+        'p50_us': round(percentile(latencies_ns, 0.50) / 1000, 2),
+        'p99_us': round(percentile(latencies_ns, 0.99) / 1000, 2),
+    }
+
+
+def measure(func, items):
+    """Time func(item) for every item; returns throughput and per-item latency percentiles."""
+    latencies = []
+    gc.collect()
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter_ns()
+        func(item)
+        latencies.append(time.perf_counter_ns() - t0)
+    return summarize(latencies, time.perf_counter() - start, len(items))
+
+
+async def measure_async(func, items):
+    latencies = []
+    gc.collect()
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter_ns()
+        await func(item)
+        latencies.append(time.perf_counter_ns() - t0)
+    return summarize(latencies, time.perf_counter() - start, len(items))
+
+
+async def make_db_manager(args):
+    if args.postgres:
+        from src.database.sql_db_manager import SQLDBManager
+        db_manager = SQLDBManager()
+        await db_manager.initialize()
+        return db_manager
+    return InMemoryDBManager()
+
+
+def make_fetcher(db_manager):
+    from src.data_ingestion.twitter_fetcher import TwitterFetcher
+    return TwitterFetcher(db_manager, vector_db_manager=NullVectorDBManager())
+
+
+@benchmark('relevance_check')
+def bench_relevance(generator, args):
+    from src.utils.relevance_check import is_tweet_relevant
+    tweets = [tweet for tweet, _ in generator.tweets(args.count)]
+    return measure(lambda tweet: is_tweet_relevant(tweet['text']), tweets)
+
+
+@benchmark('data_cleaner')
+def bench_data_cleaner(generator, args):
+    from src.preprocessing.data_cleaner import clean_text
+    tweets = [tweet for tweet, _ in generator.tweets(args.count)]
+    return measure(lambda tweet: clean_text(tweet['text'], tweet.get('entities')), tweets)
+
+
+@benchmark('engagement_score')
+def bench_engagement_score(generator, args):
+    from src.utils.engagement_score import calculate_engagement_score
+    tweets = [tweet for tweet, _ in generator.tweets(args.count)]
+    return measure(lambda tweet: calculate_engagement_score(tweet.get('public_metrics', {})), tweets)
+
+
+@benchmark('sentiment')
+def bench_sentiment(generator, args):
+    """Batch scoring in pipeline-sized batches: cold cache first, then the same texts again."""
+    from src.agents.sentiment_analyzer import SentimentAnalyzer
+    analyzer = SentimentAnalyzer()
+    texts = [tweet['text'] for tweet, _ in generator.tweets(args.count)]
+    batches = [texts[index:index + 100] for index in range(0, len(texts), 100)]
+    result = measure(analyzer.score_batch, batches)
+    result['items'] = len(texts)
+    result['tweets_per_sec'] = round(len(texts) / result['total_seconds'], 1) if result['total_seconds'] > 0 else 0.0
+    start = time.perf_counter()
+    for batch in batches:
+        analyzer.score_batch(batch)
+    result['cached_tweets_per_sec'] = round(len(texts) / (time.perf_counter() - start), 1)
+    return result
+
+
+@benchmark('engagement_classifier')
+def bench_engagement_classifier(generator, args):
+    """Feature building and scoring in pipeline-sized batches, on text already cleaned as the parse stage does."""
+    from src.agents.engagement_classifier import EngagementClassifier
+    from src.preprocessing.data_cleaner import clean_tweet
+    fetcher = make_fetcher(InMemoryDBManager())
+    classifier = EngagementClassifier()
+    rows = [(tweet, fetcher.parse_user(user), fetcher.parse_tweet(tweet)['created_at']) for tweet, user in generator.tweets(args.count)]
+    for tweet, _, _ in rows:
+        clean_tweet(tweet)
+    batches = [rows[index:index + 100] for index in range(0, len(rows), 100)]
+    result = measure(classifier.classify, batches)
+    result['items'] = len(rows)
+    result['tweets_per_sec'] = round(len(rows) / result['total_seconds'], 1) if result['total_seconds'] > 0 else 0.0
+    return result
+
+
+@benchmark('process_tweet')
+async def bench_process_tweet(generator, args):
+    db_manager = await make_db_manager(args)
+    try:
+        fetcher = make_fetcher(db_manager)
+        pairs = generator.tweets(args.count)
+        return await measure_async(lambda pair: fetcher.process_tweet(*pair), pairs)
+    finally:
+        await db_manager.close()
+
+
+@benchmark('pipeline')
+async def bench_pipeline(generator, args):
+    """End-to-end IngestionPipeline run with fetches served from synthetic timeline pages."""
+    db_manager = await make_db_manager(args)
+    try:
+        fetcher = make_fetcher(db_manager)
+        pages = generator.timeline_pages(args.count)
+        fetcher.fetch_user_tweets = AsyncMock(side_effect=lambda account_id, *a, **kw: pages[account_id])
+        items = sum(len(page['data']) for page in pages.values())
+        gc.collect()
+        start = time.perf_counter()
+        metrics = await fetcher.create_pipeline().run(account_ids=list(pages))
+        total = time.perf_counter() - start
+        result = summarize([], total, items)
+        # Per-item latency is not meaningful for overlapped stages; report stage busy time instead
+        del result['p50_us'], result['p99_us']
+        result['stage_busy_seconds'] = {stage: stats['busy_seconds'] for stage, stats in metrics.items()}
+        return result
+    finally:
+        await db_manager.close()
+
+
+@benchmark('embedding')
+def bench_embedding(generator, args):
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+    except Exception as e:
+        return {'skipped': f"embedding model unavailable: {e}"}
+    texts = [tweet['text'] for tweet, _ in generator.tweets(min(args.count, args.embedding_count))]
+    result = measure(lambda text: model.encode(text), texts)
+    start = time.perf_counter()
+    model.encode(texts, batch_size=64)
+    result['batched_tweets_per_sec'] = round(len(texts) / (time.perf_counter() - start), 1)
+    return result
+
+
+def run_benchmarks(args):
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        if name == 'embedding' and not (args.embedding or args.only):
+            continue
+        # Best of several runs, each with a fresh generator so the inputs are identical
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            result = func(SyntheticTweetGenerator(seed=args.seed), args)
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+            runs.append(result)
+        result = max(runs, key=lambda run: run.get('tweets_per_sec', 0))
+        results[name] = result
+        print(f"{name:20s} {json.dumps(result)}")
+    return results
+
+
+def check_regressions(results, baseline, tolerance):
+    """
+    Compare results against a baseline. Throughput may not drop, and p99 latency
+    may not rise, by more than the tolerance fraction.
+    """
+    failures = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'skipped' in result or 'skipped' in base:
+            continue
+        if result['tweets_per_sec'] < base['tweets_per_sec'] * (1 - tolerance):
+            failures.append(f"{name}: {result['tweets_per_sec']} tweets/sec vs baseline {base['tweets_per_sec']}")
+        if 'p99_us' in base and result['p99_us'] > base['p99_us'] * (1 + tolerance):
+            failures.append(f"{name}: p99 {result['p99_us']}us vs baseline {base['p99_us']}us")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion hot path throughput benchmarks")
+    parser.add_argument('--count', type=int, default=5000, help="synthetic tweets per benchmark")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark; the fastest is reported")
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument('--postgres', action='store_true', help="run DB benchmarks against the DB_* Postgres instead of in memory")
+    parser.add_argument('--embedding', action='store_true', help="include the embedding benchmark (loads the model)")
+    parser.add_argument('--embedding-count', type=int, default=500)
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help=f"overwrite {BASELINE_PATH}")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--check', action='store_true', help="exit non-zero on regression against the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    # Per-tweet INFO logging would dominate the numbers being measured
+    logging.disable(logging.INFO)
+
+    results = run_benchmarks(args)
+    report = {
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'count': args.count,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'backend': 'postgres' if args.postgres else 'in_memory',
+        'results': results,
+    }
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {path}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}")
+            return 1
+        with open(args.baseline) as file:
+            failures = check_regressions(results, json.load(file), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# Run command: python -m benchmarks.bench_ingestion --check
@@ -0,0 +1,67 @@
+# benchmarks/in_memory_db.py
+
+from typing import Dict, List
+
+
+class InMemoryDBManager:
+    """
+    Dict-backed stand-in for SQLDBManager with the methods the ingestion path calls.
+    Keeps the benchmark independent of Postgres while preserving the upsert semantics.
+    """
+
+    def __init__(self):
+        self.users: Dict[int, Dict] = {}
+        self.tweets: Dict[int, Dict] = {}
+        self.term_counts: Dict = {}
+        self.user_profile_deltas: List = []
+
+    async def initialize(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def insert_or_update_user(self, user_data):
+        self.users[int(user_data['id'])] = user_data
+        return str(user_data['id'])
+
+    async def insert_tweet(self, tweet_data, with_status=False):
+        tweet_id = int(tweet_data['id'])
+        inserted = tweet_id not in self.tweets
+        self.tweets[tweet_id] = tweet_data
+        return (str(tweet_id), inserted) if with_status else str(tweet_id)
+
+    def new_tweet_flags(self, tweet_ids):
+        # An exact stand-in for the membership filter: no false positives
+        return [int(tweet_id) not in self.tweets for tweet_id in tweet_ids]
+
+    async def insert_new_tweets(self, tweets):
+        stored = {}
+        for tweet_data in tweets:
+            tweet_id = int(tweet_data['id'])
+            stored.setdefault(str(tweet_id), tweet_id not in self.tweets)
+            self.tweets[tweet_id] = tweet_data
+        return stored
+
+    async def upsert_term_counts(self, rows):
+        for term_type, term, bucket, count in rows:
+            key = (term_type, term, bucket)
+            self.term_counts[key] = self.term_counts.get(key, 0) + count
+
+    async def upsert_user_profiles(self, rows):
+        self.user_profile_deltas.extend(rows)
+
+    async def get_user_profiles(self):
+        return []
+
+
+class NullVectorDBManager:
+    """Vector DB stand-in that accepts embeddings and discards them."""
+
+    def batch_store_tweet_embeddings(self, tweets):
+        pass
+
+    def store_tweet_embedding(self, tweet_id, tweet_text):
+        pass
+
+# This file is not meant to be run directly
@@ -0,0 +1,253 @@
+# benchmarks/mock_twitter_api.py
+
+import os
+import sys
+import time
+import zlib
+import random
+import asyncio
+import logging
+import argparse
+from typing import Dict, List
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_tweets import SyntheticTweetGenerator
+
+logger = logging.getLogger(__name__)
+
+# Per-endpoint request limits per window, matching the v2 app-auth limits
+DEFAULT_RATE_LIMITS = {
+    'user_tweets': 1500,
+    'search_recent': 450,
+    'tweets_lookup': 3500,
+}
+
+
+class RateLimitWindow:
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.remaining = limit
+        self.reset_at = time.time() + window_seconds
+
+    def take(self) -> bool:
+        now = time.time()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window_seconds
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            'x-rate-limit-limit': str(self.limit),
+            'x-rate-limit-remaining': str(max(0, self.remaining)),
+            'x-rate-limit-reset': str(int(self.reset_at + 0.999)),
+        }
+
+
+class MockTwitterAPI:
+    """
+    Local stand-in for the v2 endpoints TwitterFetcher calls:
+    GET /2/users/{id}/tweets, GET /2/tweets/search/recent and GET /2/tweets.
+
+    Timelines and search results are synthetic, deterministic per id/query and
+    paginated with next_token. Each endpoint has its own rate-limit window and
+    returns the x-rate-limit-* headers; latency and error rates can be injected.
+    Counters are served from GET /_stats.
+    """
+
+    def __init__(self, seed: int = 42, timeline_length: int = 250, search_length: int = 1000,
+                 rate_limits: Dict[str, int] = None, window_seconds: float = 900,
+                 latency_ms: float = 0.0, latency_jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 send_retry_after: bool = False, bearer_token: str = None):
+        self.seed = seed
+        self.timeline_length = timeline_length
+        self.search_length = search_length
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.send_retry_after = send_retry_after
+        self.bearer_token = bearer_token
+        self.random = random.Random(seed)
+        self.windows = {
+            endpoint: RateLimitWindow(limit, window_seconds)
+            for endpoint, limit in {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}.items()
+        }
+        self.stats = {'requests': 0, 'ok': 0, 'rate_limited': 0, 'errors': 0, 'unauthorized': 0, 'tweets_served': 0}
+        self._timelines = {}
+        self._searches = {}
+        self._tweets_by_id = {}
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/2/users/{user_id}/tweets', self.user_tweets)
+        app.router.add_get('/2/tweets/search/recent', self.search_recent)
+        app.router.add_get('/2/tweets', self.tweets_lookup)
+        app.router.add_get('/_stats', self.get_stats)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        if request.path == '/_stats':
+            return await handler(request)
+        self.stats['requests'] += 1
+        if self.bearer_token and request.headers.get('Authorization') != f"Bearer {self.bearer_token}":
+            self.stats['unauthorized'] += 1
+            return web.json_response({'title': 'Unauthorized', 'status': 401}, status=401)
+        if self.latency_ms or self.latency_jitter_ms:
+            delay = self.latency_ms + self.random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            status = self.random.choice([500, 502, 503])
+            return web.json_response({'title': 'Service Unavailable', 'status': status}, status=status)
+        return await handler(request)
+
+    def _limited(self, endpoint: str):
+        """Returns a 429 response if the endpoint window is exhausted, else None."""
+        window = self.windows[endpoint]
+        if window.take():
+            return None
+        self.stats['rate_limited'] += 1
+        headers = window.headers()
+        if self.send_retry_after:
+            headers['Retry-After'] = str(max(1, int(window.reset_at - time.time() + 0.999)))
+        return web.json_response({'title': 'Too Many Requests', 'status': 429}, status=429, headers=headers)
+
+    def _respond(self, endpoint: str, body: Dict) -> web.Response:
+        self.stats['ok'] += 1
+        self.stats['tweets_served'] += len(body.get('data', []))
+        return web.json_response(body, headers=self.windows[endpoint].headers())
+
+    def _timeline(self, user_id: str) -> List:
+        if user_id not in self._timelines:
+            generator = SyntheticTweetGenerator(seed=zlib.crc32(f"{self.seed}:{user_id}".encode()), user_count=1)
+            user = dict(generator.users[0], id=user_id, username=f"user_{user_id}")
+            tweets = sorted((generator.make_tweet(user) for _ in range(self.timeline_length)),
+                            key=lambda tweet: int(tweet['id']), reverse=True)
+            self._timelines[user_id] = (tweets, [user])
+            self._tweets_by_id.update((tweet['id'], (tweet, user)) for tweet in tweets)
+        return self._timelines[user_id]
+
+    def _search(self, query: str) -> List:
+        if query not in self._searches:
+            generator = SyntheticTweetGenerator(seed=zlib.crc32(f"{self.seed}:{query}".encode()), relevant_ratio=1.0, user_count=50)
+            pairs = generator.tweets(self.search_length)
+            pairs.sort(key=lambda pair: int(pair[0]['id']), reverse=True)
+            self._searches[query] = pairs
+            self._tweets_by_id.update((tweet['id'], (tweet, user)) for tweet, user in pairs)
+        return self._searches[query]
+
+    @staticmethod
+    def _page_bounds(request, total: int, token_param: str):
+        max_results = min(100, max(5, int(request.query.get('max_results', 10))))
+        token = request.query.get(token_param)
+        offset = int(token) if token and token.isdigit() else 0
+        end = min(total, offset + max_results)
+        return offset, end, (str(end) if end < total else None)
+
+    @staticmethod
+    def _meta(tweets: List, next_token: str) -> Dict:
+        meta = {'result_count': len(tweets)}
+        if tweets:
+            meta['newest_id'] = tweets[0]['id']
+            meta['oldest_id'] = tweets[-1]['id']
+        if next_token:
+            meta['next_token'] = next_token
+        return meta
+
+    async def user_tweets(self, request):
+        limited = self._limited('user_tweets')
+        if limited:
+            return limited
+        tweets, users = self._timeline(request.match_info['user_id'])
+        since_id = request.query.get('since_id')
+        if since_id:
+            tweets = [tweet for tweet in tweets if int(tweet['id']) > int(since_id)]
+        offset, end, next_token = self._page_bounds(request, len(tweets), 'pagination_token')
+        page = tweets[offset:end]
+        body = {'meta': self._meta(page, next_token)}
+        if page:
+            body['data'] = page
+            body['includes'] = {'users': users}
+        return self._respond('user_tweets', body)
+
+    async def search_recent(self, request):
+        limited = self._limited('search_recent')
+        if limited:
+            return limited
+        if not request.query.get('query'):
+            return web.json_response({'title': 'Invalid Request', 'status': 400}, status=400)
+        pairs = self._search(request.query['query'])
+        offset, end, next_token = self._page_bounds(request, len(pairs), 'next_token')
+        page = pairs[offset:end]
+        tweets = [tweet for tweet, _ in page]
+        users = list({user['id']: user for _, user in page}.values())
+        body = {'meta': self._meta(tweets, next_token)}
+        if tweets:
+            body['data'] = tweets
+            body['includes'] = {'users': users}
+        return self._respond('search_recent', body)
+
+    async def tweets_lookup(self, request):
+        limited = self._limited('tweets_lookup')
+        if limited:
+            return limited
+        ids = [tweet_id for tweet_id in request.query.get('ids', '').split(',') if tweet_id]
+        if not ids or len(ids) > 100:
+            return web.json_response({'title': 'Invalid Request', 'status': 400}, status=400)
+        found = [self._tweets_by_id[tweet_id] for tweet_id in ids if tweet_id in self._tweets_by_id]
+        body = {}
+        if found:
+            body['data'] = [tweet for tweet, _ in found]
+            body['includes'] = {'users': list({user['id']: user for _, user in found}.values())}
+        missing = [tweet_id for tweet_id in ids if tweet_id not in self._tweets_by_id]
+        if missing:
+            body['errors'] = [{'value': tweet_id, 'detail': f"Could not find tweet with ids: [{tweet_id}].",
+                               'title': 'Not Found Error', 'resource_type': 'tweet'} for tweet_id in missing]
+        return self._respond('tweets_lookup', body)
+
+    async def get_stats(self, request):
+        return web.json_response(self.stats)
+
+
+async def start_server(api: MockTwitterAPI, host: str = '127.0.0.1', port: int = 0):
+    """Start the mock API in the running loop. Returns (runner, base_url); call runner.cleanup() to stop."""
+    runner = web.AppRunner(api.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}/2"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Twitter API v2 server for soak and load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeline-length', type=int, default=250)
+    parser.add_argument('--window-seconds', type=float, default=900)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--latency-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', action='store_true', help="also send Retry-After on 429s")
+    args = parser.parse_args(argv)
+
+    api = MockTwitterAPI(seed=args.seed, timeline_length=args.timeline_length, window_seconds=args.window_seconds,
+                         latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+                         error_rate=args.error_rate, send_retry_after=args.retry_after)
+    print(f"Serving mock Twitter API at http://{args.host}:{args.port}/2 (set TWITTER_API_BASE_URL to this)")
+    web.run_app(api.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
+
+# Run command: python -m benchmarks.mock_twitter_api --latency-ms 80 --error-rate 0.02
@@ -0,0 +1,92 @@
+# benchmarks/soak_fetcher.py
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_twitter_api import MockTwitterAPI, start_server
+from benchmarks.in_memory_db import InMemoryDBManager, NullVectorDBManager
+from src.data_ingestion.twitter_fetcher import TwitterFetcher
+from src.data_ingestion.pipeline import StageConfig
+from src.utils.profiling import profiler_from_env
+from src.utils.logging_config import configure_logging
+
+
+async def soak(args):
+    api = MockTwitterAPI(
+        seed=args.seed,
+        timeline_length=args.timeline_length,
+        rate_limits={'user_tweets': args.rate_limit},
+        window_seconds=args.window_seconds,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        send_retry_after=args.retry_after,
+    )
+    runner, base_url = await start_server(api)
+    db_manager = InMemoryDBManager()
+    fetcher = TwitterFetcher(db_manager, vector_db_manager=NullVectorDBManager(), base_url=base_url)
+    account_ids = [str(2000000 + index) for index in range(args.accounts)]
+
+    rounds = []
+    start = time.perf_counter()
+    try:
+        while True:
+            round_start = time.perf_counter()
+            pipeline = fetcher.create_pipeline({'fetch': StageConfig(workers=args.fetch_workers, queue_size=args.fetch_workers * 2)})
+            metrics = await pipeline.run(account_ids=account_ids)
+            rounds.append({'seconds': round(time.perf_counter() - round_start, 3), 'fetch': metrics['fetch'], 'persist': metrics['persist']})
+            if time.perf_counter() - start >= args.duration:
+                break
+    finally:
+        await runner.cleanup()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed_seconds': round(elapsed, 3),
+        'rounds': len(rounds),
+        'server': api.stats,
+        'requests_per_sec': round(api.stats['requests'] / elapsed, 1),
+        'tweets_stored': len(db_manager.tweets),
+        'last_round': rounds[-1] if rounds else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak TwitterFetcher against the local mock Twitter API")
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=0, help="keep re-polling all accounts for this many seconds")
+    parser.add_argument('--fetch-workers', type=int, default=16)
+    parser.add_argument('--timeline-length', type=int, default=100)
+    parser.add_argument('--rate-limit', type=int, default=1500, help="user timeline requests per window")
+    parser.add_argument('--window-seconds', type=float, default=900)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--latency-jitter-ms', type=float, default=25)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--retry-after', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--profile', metavar='DIR', help="write a per-stage profile (folded stacks, memory, summary) to DIR")
+    args = parser.parse_args(argv)
+
+    # Per-tweet lines would swamp the report
+    configure_logging(level=os.getenv("LOG_LEVEL", "WARNING"))
+    os.environ.setdefault("TWITTER_BEARER_TOKEN", "soak-test")
+    profiler = profiler_from_env(args.profile)
+    if profiler:
+        profiler.start()
+    try:
+        print(json.dumps(asyncio.run(soak(args)), indent=2))
+    finally:
+        if profiler:
+            profiler.stop()
+
+
+if __name__ == "__main__":
+    main()
+
+# Run command: python -m benchmarks.soak_fetcher --accounts 500 --rate-limit 300 --window-seconds 10
@@ -0,0 +1,144 @@
+# benchmarks/synthetic_tweets.py
+
+import os
+import sys
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from configs.project_config import PROJECT_ACCOUNTS, KEYWORDS, HASHTAGS
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'twitter_data.json')
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+
+def load_sample_tweets(path: str = SAMPLE_PATH) -> List[Dict]:
+    with open(path, 'r') as file:
+        accounts = json.load(file)
+    tweets = []
+    for account in accounts:
+        for page in account.values():
+            tweets.extend(page.get('data', []))
+    return tweets
+
+
+class SyntheticTweetGenerator:
+    """
+    Deterministic generator of Twitter API v2 shaped tweets and timeline pages,
+    modeled on data/twitter_data.json: same fields, entity layout and metric ranges.
+    The same seed always yields the same corpus.
+    """
+
+    def __init__(self, seed: int = 42, relevant_ratio: float = 0.3, user_count: int = 200):
+        self.random = random.Random(seed)
+        self.relevant_ratio = relevant_ratio
+        samples = load_sample_tweets()
+        self.words = [word for tweet in samples for word in tweet['text'].split() if word.isalpha()] or ['gm']
+        self.mention_pool = [mention['username'] for tweet in samples for mention in tweet.get('entities', {}).get('mentions', [])]
+        self.start = datetime(2024, 7, 1)
+        self.users = [self._make_user(index) for index in range(user_count)]
+        self._next_id = 1808336253991244265
+
+    def _make_user(self, index: int) -> Dict:
+        created_at = self.start - timedelta(days=self.random.randint(30, 4000))
+        return {
+            'id': str(100000000 + index),
+            'username': f"synthetic_user_{index}",
+            'name': f"Synthetic {index}",
+            'created_at': created_at.strftime(TIMESTAMP_FORMAT),
+            'public_metrics': {
+                'followers_count': int(self.random.paretovariate(1.2) * 50),
+                'following_count': self.random.randint(0, 2000),
+                'tweet_count': self.random.randint(10, 50000),
+            },
+        }
+
+    def _make_text(self, relevant: bool):
+        words = self.random.choices(self.words, k=self.random.randint(6, 30))
+        mentions = []
+        hashtags = []
+        if self.mention_pool and self.random.random() < 0.5:
+            mentions.append(self.random.choice(self.mention_pool))
+        if relevant:
+            choice = self.random.random()
+            if choice < 0.4:
+                mentions.append(self.random.choice(PROJECT_ACCOUNTS).lstrip('@'))
+            elif choice < 0.7:
+                words.insert(self.random.randrange(len(words)), self.random.choice(KEYWORDS))
+            else:
+                hashtags.append(self.random.choice(HASHTAGS).lstrip('#'))
+
+        text = ""
+        entities = {}
+        for username in mentions:
+            start = len(text)
+            text += f"@{username} "
+            entities.setdefault('mentions', []).append({'start': start, 'end': start + len(username) + 1, 'username': username})
+        text += " ".join(words)
+        for tag in hashtags:
+            text += " "
+            start = len(text)
+            text += f"#{tag}"
+            entities.setdefault('hashtags', []).append({'start': start, 'end': start + len(tag) + 1, 'tag': tag})
+        if self.random.random() < 0.4:
+            text += " "
+            start = len(text)
+            url = f"https://t.co/{self.random.getrandbits(40):010x}"
+            text += url
+            entities.setdefault('urls', []).append({'start': start, 'end': start + len(url), 'url': url})
+        return text, entities
+
+    def make_tweet(self, user: Dict) -> Dict:
+        self._next_id += self.random.randint(1, 10_000_000)
+        text, entities = self._make_text(self.random.random() < self.relevant_ratio)
+        created_at = self.start + timedelta(seconds=self.random.randint(0, 30 * 24 * 3600))
+        impressions = int(self.random.paretovariate(1.1) * 10)
+        tweet = {
+            'id': str(self._next_id),
+            'text': text,
+            'author_id': user['id'],
+            'created_at': created_at.strftime(TIMESTAMP_FORMAT),
+            'edit_history_tweet_ids': [str(self._next_id)],
+            'public_metrics': {
+                'retweet_count': self.random.randint(0, max(1, impressions // 50)),
+                'reply_count': self.random.randint(0, max(1, impressions // 40)),
+                'like_count': self.random.randint(0, max(1, impressions // 10)),
+                'quote_count': self.random.randint(0, max(1, impressions // 200)),
+                'bookmark_count': self.random.randint(0, max(1, impressions // 100)),
+                'impression_count': impressions,
+            },
+        }
+        if entities:
+            tweet['entities'] = entities
+        return tweet
+
+    def tweets(self, count: int) -> List[Dict]:
+        """Flat list of (tweet, user) pairs."""
+        pairs = []
+        for _ in range(count):
+            user = self.random.choice(self.users)
+            pairs.append((self.make_tweet(user), user))
+        return pairs
+
+    def timeline_pages(self, count: int, page_size: int = 100) -> Dict[str, Dict]:
+        """Timeline responses keyed by author id, up to count tweets in total (page_size per author at most)."""
+        pages = {}
+        per_user = max(1, min(page_size, -(-count // len(self.users))))
+        remaining = count
+        for user in self.users:
+            if remaining <= 0:
+                break
+            size = min(per_user, remaining)
+            tweets = [self.make_tweet(user) for _ in range(size)]
+            remaining -= size
+            pages[user['id']] = {
+                'data': tweets,
+                'includes': {'users': [user]},
+                'meta': {'result_count': size, 'newest_id': tweets[-1]['id'], 'oldest_id': tweets[0]['id']},
+            }
+        return pages
+
+# This file is not meant to be run directly
@@ -1,12 +1,24 @@
 # main.py
 
 import asyncio
+import signal
+import logging
+import argparse
 from src.database.sql_db_manager import SQLDBManager
+from src.database.job_queue import JobQueue, JobWorker, build_fetcher_handlers, JOB_FETCH_TIMELINE, JOB_KEYWORD_SEARCH
 from src.data_ingestion.twitter_fetcher import TwitterFetcher
+from src.data_ingestion.metrics_refresher import MetricsRefresher
+from src.data_ingestion.poll_scheduler import AdaptivePollScheduler
+from src.data_ingestion.sharded_runner import default_accounts
+from src.utils.profiling import profiler_from_env
+from src.utils.logging_config import configure_logging
+from configs.project_config import KEYWORDS
 from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables
 
+logger = logging.getLogger(__name__)
+
 async def setup():
     db_manager = SQLDBManager()
     await db_manager.initialize()
@@ -16,10 +28,61 @@ async def setup():
 async def cleanup(db_manager):
     await db_manager.close()
 
-async def main():
+async def enqueue_jobs(db_manager):
+    """Queue one timeline job per tracked account and one keyword search; live duplicates are skipped."""
+    job_queue = JobQueue(db_manager)
+    for account_id in default_accounts():
+        await job_queue.enqueue(JOB_FETCH_TIMELINE, {'account_id': account_id}, dedup_key=f"{JOB_FETCH_TIMELINE}:{account_id}")
+    await job_queue.enqueue(JOB_KEYWORD_SEARCH, {'keywords': KEYWORDS}, priority=-1,
+                            dedup_key=f"{JOB_KEYWORD_SEARCH}:{' OR '.join(KEYWORDS)}")
+    logger.info(f"Job queue: {await job_queue.stats()}")
+
+async def run_worker(db_manager, twitter_fetcher, concurrency):
+    worker = JobWorker(JobQueue(db_manager), build_fetcher_handlers(twitter_fetcher), concurrency=concurrency)
+
+    def shutdown():
+        worker.stop()
+        twitter_fetcher.stop()
+
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, shutdown)
+    loop.add_signal_handler(signal.SIGINT, shutdown)
+    await worker.run()
+
+async def run_refresher(db_manager, twitter_fetcher):
+    refresher = MetricsRefresher(twitter_fetcher, db_manager)
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, refresher.stop)
+    loop.add_signal_handler(signal.SIGINT, refresher.stop)
+    await refresher.run()
+
+async def run_poller(db_manager, twitter_fetcher):
+    scheduler = AdaptivePollScheduler(twitter_fetcher, db_manager)
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, scheduler.stop)
+    loop.add_signal_handler(signal.SIGINT, scheduler.stop)
+    await scheduler.run(default_accounts())
+
+async def main(mode='run', concurrency=4):
     db_manager, twitter_fetcher = await setup()
-    
+
+    # On SIGTERM, stop starting new fetches and let in-flight tweets drain
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, twitter_fetcher.stop)
+
     try:
+        if mode == 'enqueue':
+            await enqueue_jobs(db_manager)
+            return
+        if mode == 'worker':
+            await run_worker(db_manager, twitter_fetcher, concurrency)
+            return
+        if mode == 'refresh':
+            await run_refresher(db_manager, twitter_fetcher)
+            return
+        if mode == 'poll':
+            await run_poller(db_manager, twitter_fetcher)
+            return
+
         # Example workflow
         accounts_to_process = ['account1', 'account2', 'account3']  # Replace with actual Twitter IDs
         await twitter_fetcher.process_accounts(accounts_to_process)
@@ -36,4 +99,19 @@ async def main():
         await cleanup(db_manager)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('mode', nargs='?', default='run', choices=['run', 'enqueue', 'worker', 'refresh', 'poll'],
+                        help="run: example workflow; enqueue: queue fetch jobs; worker: process queued jobs; "
+                             "refresh: keep recent tweets' metrics fresh; poll: poll accounts at adaptive cadences")
+    parser.add_argument('--concurrency', type=int, default=4, help="jobs in flight per worker")
+    parser.add_argument('--profile', metavar='DIR', help="sample stacks and memory per stage into DIR (or set PROFILE_DIR)")
+    args = parser.parse_args()
+    configure_logging()
+    profiler = profiler_from_env(args.profile)
+    if profiler:
+        profiler.start()
+    try:
+        asyncio.run(main(args.mode, args.concurrency))
+    finally:
+        if profiler:
+            profiler.stop()
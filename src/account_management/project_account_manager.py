@@ -1,20 +1,57 @@
 # src/account_management/project_account_manager.py
 
 import logging
+from configs.project_config import PROJECT_ACCOUNTS, ACCOUNT_IDS
 from src.database.sql_db_manager import SQLDBManager
 from src.services.twitter_service import TwitterService
 
 logger = logging.getLogger(__name__)
 
 class ProjectAccountManager:
-    def __init__(self):
-        self.db_manager = SQLDBManager()
+    """
+    Project accounts are kept in the project_accounts table, so every process
+    (config_processor, the sharded runner's supervisor) sees the same set.
+    db_manager must be initialized by the caller.
+    """
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or SQLDBManager()
         self.twitter_service = TwitterService()
+        self._listeners = []
+
+    async def get_project_account_ids(self):
+        """
+        Twitter ids of the active project accounts; the account source for
+        ShardSupervisor. Until the table has any rows (archived ones count),
+        the configured PROJECT_ACCOUNTS are tracked.
+        """
+        rows = await self.db_manager.get_all_project_accounts(include_archived=True)
+        if not rows:
+            return [ACCOUNT_IDS[account] for account in PROJECT_ACCOUNTS if account in ACCOUNT_IDS]
+        return [str(row['twitter_id']) for row in rows if not row['is_archived']]
+
+    def get_twitter_id(self, twitter_username):
+        twitter_id = ACCOUNT_IDS.get(twitter_username) or self.twitter_service.get_user_id(twitter_username)
+        if twitter_id is None:
+            raise ValueError(f"No Twitter id found for {twitter_username}")
+        return str(twitter_id)
+
+    def add_listener(self, callback):
+        """Register a callback run after this manager changes the set of project accounts."""
+        self._listeners.append(callback)
+
+    def _notify_listeners(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in project account listener: {str(e)}")
 
-    def add_project_account(self, twitter_username):
+    async def add_project_account(self, twitter_username):
         try:
-            twitter_id = self.get_twitter_id(twitter_username)  # Implement this method
-            self.db_manager.insert_project_account(twitter_id, twitter_username)
+            twitter_id = self.get_twitter_id(twitter_username)
+            await self.db_manager.insert_project_account(twitter_id, twitter_username)
+            self._notify_listeners()
             return True
         except Exception as e:
             logger.error(f"Error adding project account {twitter_username}: {str(e)}")
@@ -25,18 +62,21 @@ class ProjectAccountManager:
             return True
         except Exception as e:
             logger.error(f"Error setting project wallet {wallet_address}: {str(e)}")
-            return False        
-    def get_all_project_accounts(self):
-        return self.db_manager.get_all_project_accounts()
+            return False
+    async def get_all_project_accounts(self):
+        return await self.db_manager.get_all_project_accounts()
 
-    def archive_project_account(self, twitter_username):
-            try:
-                self.db_manager.archive_project_account(twitter_username)
-                logger.info(f"Archived project account: {twitter_username}")
-                return True
-            except Exception as e:
-                logger.error(f"Error archiving project account {twitter_username}: {str(e)}")
+    async def archive_project_account(self, twitter_username):
+        try:
+            if not await self.db_manager.archive_project_account(twitter_username):
+                logger.warning(f"No active project account to archive: {twitter_username}")
                 return False
+            logger.info(f"Archived project account: {twitter_username}")
+            self._notify_listeners()
+            return True
+        except Exception as e:
+            logger.error(f"Error archiving project account {twitter_username}: {str(e)}")
+            return False
 
-    def get_archived_project_accounts(self):
-        return self.db_manager.get_archived_project_accounts()
\ No newline at end of file
+    async def get_archived_project_accounts(self):
+        return await self.db_manager.get_archived_project_accounts()
@@ -0,0 +1,198 @@
+# src/agents/engagement_classifier.py
+
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.agent_config import load_agent_config
+from src.preprocessing.data_cleaner import clean_tweet
+
+logger = logging.getLogger(__name__)
+
+FEATURES = (
+    'log_followers',
+    'log_account_age_days',
+    'engagement_rate',
+    'retweet_like_ratio',
+    'reply_like_ratio',
+    'log_seconds_since_prev',
+    'log_duplicate_count',
+    'mention_count',
+    'hashtag_count',
+)
+
+# Hand-set priors: positive weights push toward farm/bot engagement. Replace with fit() output once labels exist.
+DEFAULT_WEIGHTS = {
+    'log_followers': -0.35,
+    'log_account_age_days': -0.45,
+    'engagement_rate': 0.6,
+    'retweet_like_ratio': 0.5,
+    'reply_like_ratio': 0.2,
+    'log_seconds_since_prev': -0.25,
+    'log_duplicate_count': 1.2,
+    'mention_count': 0.25,
+    'hashtag_count': 0.15,
+}
+
+LABELS = ('organic', 'suspicious', 'farm')
+
+
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+
+class EngagementClassifier:
+    """
+    Logistic engagement-quality model scored a batch at a time.
+
+    build_features fills an (n, len(FEATURES)) matrix from
+    (tweet, user_data, created_at) rows. Most of the cost is that pass over
+    the batch; scoring is one matrix-vector product. Posting cadence and text
+    duplication need history, so the last tweet time per author and a bounded
+    count of normalized texts are kept across batches. Both are updated once
+    per tweet id: a tweet seen again (re-polled, or in a timeline and a
+    search) reuses the gap and duplicate count from its first sighting, so
+    its score doesn't drift with how often it is fetched.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config if config is not None else load_agent_config('engagement_classifier')
+        weights = dict(DEFAULT_WEIGHTS, **(config.get('weights') or {}))
+        self.weights = np.array([weights[name] for name in FEATURES], dtype=np.float64)
+        self.bias = float(config.get('bias', 2.5))
+        self.suspicious_threshold = float(config.get('suspicious_threshold', 0.5))
+        self.farm_threshold = float(config.get('farm_threshold', 0.8))
+        self.ratio_cap = float(config.get('ratio_cap', 10.0))
+        self.default_gap_seconds = float(config.get('default_gap_seconds', 86400))
+        self.duplicate_cache_size = int(config.get('duplicate_cache_size', 100000))
+        self._last_seen = {}
+        self._text_counts = OrderedDict()
+        # tweet id -> (seconds since previous, duplicate count) from its first sighting
+        self._tweet_history = OrderedDict()
+
+    def _duplicate_count(self, content: str) -> int:
+        """Times this cleaned text (URLs, mentions, case and spacing already folded) was seen before."""
+        key = hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest()
+        count = self._text_counts.get(key, 0)
+        self._text_counts[key] = count + 1
+        self._text_counts.move_to_end(key)
+        if len(self._text_counts) > self.duplicate_cache_size:
+            self._text_counts.popitem(last=False)
+        return count
+
+    def _seconds_since_prev(self, author_id: str, created_at: datetime) -> float:
+        timestamp = created_at.timestamp()
+        previous = self._last_seen.get(author_id)
+        self._last_seen[author_id] = timestamp
+        # Timelines arrive newest first, so the gap can be measured in either direction
+        return abs(timestamp - previous) if previous is not None else self.default_gap_seconds
+
+    def _history(self, tweet: Dict, author_id: str, created_at: datetime) -> Tuple[float, int]:
+        """Cadence gap and duplicate count for a tweet, computed on the first sighting of its id."""
+        tweet_id = tweet.get('id')
+        if tweet_id is not None and tweet_id in self._tweet_history:
+            self._tweet_history.move_to_end(tweet_id)
+            return self._tweet_history[tweet_id]
+        history = (self._seconds_since_prev(author_id, created_at), self._duplicate_count(clean_tweet(tweet).content))
+        if tweet_id is not None:
+            self._tweet_history[tweet_id] = history
+            if len(self._tweet_history) > self.duplicate_cache_size:
+                self._tweet_history.popitem(last=False)
+        return history
+
+    def _peek_history(self, tweet: Dict, author_id: str, created_at: datetime) -> Tuple[float, int]:
+        """_history without recording anything, for scoring off the event loop."""
+        history = self._tweet_history.get(tweet.get('id'))
+        if history is not None:
+            return history
+        previous = self._last_seen.get(author_id)
+        gap = abs(created_at.timestamp() - previous) if previous is not None else self.default_gap_seconds
+        key = hashlib.blake2b(clean_tweet(tweet).content.encode('utf-8'), digest_size=8).digest()
+        return gap, self._text_counts.get(key, 0)
+
+    def build_features(self, rows: Sequence[Tuple[Dict, Dict, datetime]], update_history: bool = True) -> np.ndarray:
+        """
+        Feature matrix for (tweet, user_data, created_at) rows: the raw API tweet,
+        the author as parsed by TwitterFetcher.parse_user, and the parsed tweet time.
+        With update_history=False the cadence and duplicate history is only read,
+        so it is safe to call from a thread while ingestion scores on the loop.
+        """
+        history = self._history if update_history else self._peek_history
+        n = len(rows)
+        followers = np.empty(n)
+        account_age = np.empty(n)
+        likes = np.empty(n)
+        retweets = np.empty(n)
+        replies = np.empty(n)
+        quotes = np.empty(n)
+        gaps = np.empty(n)
+        duplicates = np.empty(n)
+        mentions = np.empty(n)
+        hashtags = np.empty(n)
+
+        for index, (tweet, user_data, created_at) in enumerate(rows):
+            metrics = tweet.get('public_metrics') or {}
+            entities = tweet.get('entities') or {}
+            followers[index] = user_data.get('follower_count') or 0
+            account_age[index] = (created_at - user_data['created_at']).total_seconds()
+            likes[index] = metrics.get('like_count', 0)
+            retweets[index] = metrics.get('retweet_count', 0)
+            replies[index] = metrics.get('reply_count', 0)
+            quotes[index] = metrics.get('quote_count', 0)
+            gaps[index], duplicates[index] = history(tweet, user_data['id'], created_at)
+            mentions[index] = len(entities.get('mentions') or ())
+            hashtags[index] = len(entities.get('hashtags') or ())
+
+        interactions = likes + retweets + replies + quotes
+        features = np.empty((n, len(FEATURES)))
+        features[:, 0] = np.log1p(followers)
+        features[:, 1] = np.log1p(np.maximum(account_age, 0) / 86400)
+        features[:, 2] = np.minimum(interactions / (followers + 1), self.ratio_cap)
+        features[:, 3] = np.minimum(retweets / (likes + 1), self.ratio_cap)
+        features[:, 4] = np.minimum(replies / (likes + 1), self.ratio_cap)
+        features[:, 5] = np.log1p(gaps)
+        features[:, 6] = np.log1p(duplicates)
+        features[:, 7] = mentions
+        features[:, 8] = hashtags
+        return features
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Probability that each row is farm/bot engagement."""
+        return sigmoid(features @ self.weights + self.bias)
+
+    def label(self, probabilities: np.ndarray) -> List[str]:
+        levels = (probabilities >= self.suspicious_threshold).astype(np.int8) + (probabilities >= self.farm_threshold)
+        return [LABELS[level] for level in levels.tolist()]
+
+    def classify(self, rows: Sequence[Tuple[Dict, Dict, datetime]],
+                 update_history: bool = True) -> Tuple[np.ndarray, List[str]]:
+        """Score a batch of (tweet, user_data, created_at) rows; returns (probabilities, labels)."""
+        if not rows:
+            return np.empty(0), []
+        probabilities = self.predict_proba(self.build_features(rows, update_history))
+        return probabilities, self.label(probabilities)
+
+    def fit(self, features: np.ndarray, targets: np.ndarray, epochs: int = 500, learning_rate: float = 0.1,
+            l2: float = 1e-3) -> Dict:
+        """Fit weights and bias by batch gradient descent on labelled rows (1 = farm). Returns them by name."""
+        targets = np.asarray(targets, dtype=np.float64)
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        x = (features - mean) / scale
+        weights = np.zeros(x.shape[1])
+        bias = 0.0
+        for _ in range(epochs):
+            error = sigmoid(x @ weights + bias) - targets
+            weights -= learning_rate * (x.T @ error / len(x) + l2 * weights)
+            bias -= learning_rate * error.mean()
+        # Fold the standardization back in so predict_proba takes raw features
+        self.weights = weights / scale
+        self.bias = float(bias - (mean / scale) @ weights)
+        return {'weights': dict(zip(FEATURES, self.weights.tolist())), 'bias': self.bias}
+
+# This file is not meant to be run directly
@@ -0,0 +1,158 @@
+# src/agents/sentiment_analyzer.py
+
+import re
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.utils.agent_config import load_agent_config
+
+logger = logging.getLogger(__name__)
+
+# Words, hashtags without '#', and the pictographic emoji ranges
+TOKEN_RE = re.compile(r"[a-z0-9_']+|[☀-➿\U0001f300-\U0001faff]")
+
+NEGATORS = frozenset([
+    "not", "no", "never", "nothing", "nobody", "none", "neither", "nor", "cannot",
+    "can't", "cant", "don't", "dont", "doesn't", "doesnt", "didn't", "didnt", "isn't", "isnt",
+    "wasn't", "wasnt", "aren't", "arent", "won't", "wont", "wouldn't", "wouldnt", "shouldn't",
+    "shouldnt", "ain't", "aint", "without",
+])
+
+# Weights roughly on a -3..3 scale; general English plus crypto-Twitter slang and emoji
+LEXICON = {
+    # positive
+    "good": 1.9, "great": 3.1, "awesome": 3.1, "amazing": 2.8, "excellent": 3.2, "love": 3.2,
+    "loving": 2.9, "like": 1.5, "nice": 1.8, "happy": 2.7, "excited": 2.2, "exciting": 2.2,
+    "best": 3.2, "better": 1.9, "cool": 1.3, "fun": 2.3, "win": 2.8, "winning": 2.4, "won": 2.7,
+    "thanks": 1.9, "thank": 1.5, "grateful": 2.0, "congrats": 2.4, "congratulations": 2.9,
+    "beautiful": 2.9, "fantastic": 2.6, "incredible": 2.4, "impressive": 2.3, "strong": 2.3,
+    "easy": 1.9, "simple": 1.0, "smooth": 1.6, "safe": 1.9, "secure": 1.4, "success": 2.7,
+    "successful": 2.8, "growth": 1.6, "gain": 2.0, "gains": 2.0, "profit": 1.9, "profits": 1.9,
+    "reward": 2.1, "rewards": 2.1, "rewarding": 2.4, "free": 1.2, "guaranteed": 1.3,
+    "bullish": 2.6, "moon": 2.0, "mooning": 2.3, "pump": 1.3, "pumping": 1.5, "gm": 1.2,
+    "wagmi": 2.4, "lfg": 2.5, "based": 1.4, "alpha": 1.5, "gem": 2.0, "undervalued": 1.2,
+    "hodl": 1.1, "ath": 1.8, "airdrop": 1.2, "legendary": 2.6, "goat": 2.0, "fire": 1.5,
+    "shoutout": 1.6, "support": 1.7, "supportive": 2.0, "hyped": 2.0, "hype": 1.1, "rare": 1.0,
+    "optimistic": 2.2, "confident": 2.2, "solid": 1.6, "huge": 1.3, "massive": 1.1, "yes": 1.7,
+    # negative
+    "bad": -2.5, "terrible": -2.1, "awful": -2.0, "horrible": -2.5, "worst": -3.1, "worse": -2.1,
+    "hate": -2.7, "sad": -2.1, "angry": -2.3, "annoying": -1.7, "disappointed": -1.9,
+    "disappointing": -2.2, "fail": -2.5, "failed": -2.3, "failure": -2.3, "lose": -1.7,
+    "losing": -1.6, "lost": -1.3, "loss": -1.3, "losses": -1.7, "broke": -1.8, "broken": -2.1,
+    "problem": -1.7, "problems": -1.7, "issue": -1.0, "issues": -1.1, "bug": -1.2, "bugs": -1.4,
+    "exhausting": -1.5, "headache": -1.8, "pain": -2.3, "painful": -2.4, "hard": -0.4,
+    "scam": -3.0, "scammer": -3.0, "scammers": -3.0, "rug": -2.8, "rugged": -3.0, "rugpull": -3.0,
+    "fraud": -3.0, "hack": -2.1, "hacked": -2.8, "exploit": -2.4, "exploited": -2.7,
+    "bearish": -2.3, "dump": -1.9, "dumping": -2.0, "crash": -2.4, "crashed": -2.5,
+    "rekt": -2.6, "ngmi": -2.2, "fud": -1.6, "ponzi": -2.8, "down": -0.8, "dead": -2.7,
+    "worthless": -2.5, "overvalued": -1.2, "risky": -1.2, "risk": -0.8, "fake": -2.1,
+    "spam": -1.5, "bot": -0.8, "bots": -1.0, "delay": -1.1, "delayed": -1.3, "sucks": -1.5,
+    "ugly": -2.3, "stupid": -2.4, "useless": -1.8, "waste": -1.8, "wtf": -1.6, "ugh": -1.8,
+    "no": -1.2,
+    # emoji
+    "\U0001f680": 1.8, "\U0001f525": 1.5, "\U0001f48e": 1.6, "\U0001f389": 2.2, "\U0001f973": 2.2,
+    "\U0001f4aa": 1.6, "\U0001f64c": 1.8, "\U0001f64f": 1.2, "❤": 2.5, "\U0001f60d": 2.7,
+    "\U0001f60a": 2.0, "\U0001f602": 1.5, "\U0001f923": 1.5, "\U0001f4af": 1.7, "\U0001f3c6": 2.0,
+    "\U0001f4c8": 1.6, "\U0001f4c9": -1.6, "\U0001f622": -2.0, "\U0001f62d": -1.8, "\U0001f621": -2.4,
+    "\U0001f620": -2.2, "\U0001f480": -0.8, "\U0001f92e": -2.4, "\U0001f6a9": -1.8, "\U0001f494": -2.2,
+}
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+class SentimentAnalyzer:
+    """
+    Lexicon sentiment scorer cheap enough to run inline during ingestion.
+
+    Scores are in (-1, 1): the negation-aware sum of token weights squashed
+    with x / sqrt(x^2 + alpha). Results are cached by a hash of the text,
+    so retweets, copypasta and re-fetched tweets are scored once.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config if config is not None else load_agent_config('sentiment_analyzer')
+        self.cache_size = int(config.get('cache_size', 200000))
+        self.negation_window = int(config.get('negation_window', 3))
+        self.negation_scale = float(config.get('negation_scale', -0.74))
+        self.alpha = float(config.get('normalization_alpha', 15))
+        self.weights = dict(LEXICON)
+        self.weights.update({str(token).lower(): float(weight) for token, weight in (config.get('lexicon_overrides') or {}).items()})
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _raw_score(self, text: str) -> float:
+        weights = self.weights
+        negation_scale = self.negation_scale
+        total = 0.0
+        negated = 0
+        for token in TOKEN_RE.findall(text.lower()):
+            if token in NEGATORS:
+                negated = self.negation_window
+                continue
+            weight = weights.get(token)
+            if weight is not None:
+                total += weight * negation_scale if negated else weight
+            if negated:
+                negated -= 1
+        return total
+
+    def score(self, text: str) -> float:
+        return float(self.score_batch([text])[0])
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Score a batch of texts; returns a float32 array aligned with texts."""
+        scores = np.empty(len(texts), dtype=np.float32)
+        cache = self._cache
+        misses = []
+        for index, text in enumerate(texts):
+            key = content_hash(text)
+            cached = cache.get(key)
+            if cached is None:
+                misses.append((index, key, text))
+            else:
+                cache.move_to_end(key)
+                scores[index] = cached
+
+        self.cache_hits += len(texts) - len(misses)
+        self.cache_misses += len(misses)
+        if not misses:
+            return scores
+
+        raw = np.fromiter((self._raw_score(text) for _, _, text in misses), dtype=np.float32, count=len(misses))
+        normalized = raw / np.sqrt(raw * raw + self.alpha)
+        for (index, key, _), value in zip(misses, normalized.tolist()):
+            scores[index] = value
+            cache[key] = value
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return scores
+
+    def label(self, score: float, threshold: float = 0.05) -> str:
+        if score >= threshold:
+            return 'positive'
+        if score <= -threshold:
+            return 'negative'
+        return 'neutral'
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def stats(self) -> Dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'cache_entries': len(self._cache),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'hit_rate': round(self.cache_hits / lookups, 4) if lookups else 0.0,
+        }
+
+# This file is not meant to be run directly
@@ -0,0 +1,175 @@
+# src/agents/topic_modeler.py
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.agent_config import load_agent_config
+
+logger = logging.getLogger(__name__)
+
+
+class TopicModeler:
+    """
+    Online topic model over tweet embeddings: mini-batch k-means.
+
+    Each batch is assigned to its nearest centroids, O(k·d) per tweet, and
+    each centroid then moves toward the mean of its new members with a
+    per-centroid learning rate of 1/count. Counts are capped at
+    max_center_count so topics keep drifting with the conversation. The
+    centroids and every tweet's assignment are persisted. Topic breakdowns
+    are read from the stored assignments, so the corpus is never re-clustered.
+    """
+
+    def __init__(self, db_manager=None, config: Optional[Dict] = None):
+        config = config if config is not None else load_agent_config('topic_modeler')
+        self.db_manager = db_manager
+        self.num_topics = int(config.get('num_topics', 24))
+        self.max_center_count = float(config.get('max_center_count', 10000))
+        self.save_every_batches = int(config.get('save_every_batches', 10))
+        self.normalize = bool(config.get('normalize', True))
+        self.rng = np.random.default_rng(config.get('seed', 42))
+        self.centroids = None
+        self.counts = None
+        self._centroid_norms = None
+        self._pending_ids = []
+        self._pending_embeddings = []
+        self._batches_since_save = 0
+        self._loaded = False
+
+    @property
+    def initialized(self) -> bool:
+        return self.centroids is not None
+
+    def _prepare(self, embeddings) -> np.ndarray:
+        x = np.asarray(embeddings, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None, :]
+        if self.normalize:
+            # Unit vectors make squared euclidean distance a monotone function of cosine similarity
+            x = x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+        return x
+
+    def _set_centroids(self, centroids: np.ndarray, counts: np.ndarray):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.float64)
+        self._centroid_norms = (self.centroids * self.centroids).sum(axis=1)
+
+    def _init_centroids(self, x: np.ndarray):
+        """k-means++ seeding from the first num_topics or more embeddings."""
+        centroids = np.empty((self.num_topics, x.shape[1]), dtype=np.float32)
+        centroids[0] = x[self.rng.integers(len(x))]
+        closest = ((x - centroids[0]) ** 2).sum(axis=1)
+        for index in range(1, self.num_topics):
+            total = closest.sum()
+            choice = self.rng.choice(len(x), p=closest / total) if total > 0 else self.rng.integers(len(x))
+            centroids[index] = x[choice]
+            closest = np.minimum(closest, ((x - centroids[index]) ** 2).sum(axis=1))
+        self._set_centroids(centroids, np.zeros(self.num_topics))
+
+    def _squared_distances(self, x: np.ndarray) -> np.ndarray:
+        # ||x - c||^2 = ||x||^2 - 2 x·c + ||c||^2, computed as a single (n, d) x (d, k) product
+        distances = (x * x).sum(axis=1)[:, None] - 2.0 * (x @ self.centroids.T) + self._centroid_norms[None, :]
+        return np.maximum(distances, 0.0)
+
+    def _assign_prepared(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        distances = self._squared_distances(x)
+        labels = distances.argmin(axis=1)
+        return labels, np.sqrt(distances[np.arange(len(x)), labels])
+
+    def assign(self, embeddings) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest topic and distance for each embedding, without updating the model."""
+        if not self.initialized:
+            raise RuntimeError("Topic model has no centroids yet")
+        return self._assign_prepared(self._prepare(embeddings))
+
+    def _update(self, x: np.ndarray, labels: np.ndarray):
+        batch_counts = np.bincount(labels, minlength=self.num_topics).astype(np.float64)
+        hit = batch_counts > 0
+        membership = np.zeros((self.num_topics, len(x)), dtype=np.float32)
+        membership[labels, np.arange(len(x))] = 1.0
+        sums = membership @ x
+
+        old_counts = self.counts[hit]
+        new_counts = old_counts + batch_counts[hit]
+        self.centroids[hit] = (old_counts[:, None] * self.centroids[hit] + sums[hit]) / new_counts[:, None]
+        self.counts[hit] = np.minimum(new_counts, self.max_center_count)
+        self._centroid_norms = (self.centroids * self.centroids).sum(axis=1)
+
+    def partial_fit(self, embeddings) -> Tuple[np.ndarray, np.ndarray]:
+        """Assign a batch, then move the centroids toward it. Returns (labels, distances)."""
+        x = self._prepare(embeddings)
+        if not self.initialized:
+            if len(x) < self.num_topics:
+                raise ValueError(f"Need at least {self.num_topics} embeddings to seed the topic model")
+            self._init_centroids(x)
+        labels, distances = self._assign_prepared(x)
+        self._update(x, labels)
+        return labels, distances
+
+    async def load(self):
+        """Resume from the centroids saved in topic_centroids, if they match num_topics."""
+        self._loaded = True
+        if not self.db_manager:
+            return
+        try:
+            rows = await self.db_manager.get_topic_centroids()
+        except Exception as e:
+            logger.error(f"Error loading topic centroids: {str(e)}")
+            return
+        if len(rows) != self.num_topics:
+            if rows:
+                logger.warning(f"Stored topic model has {len(rows)} topics, expected {self.num_topics}; reseeding")
+            return
+        rows = sorted(rows, key=lambda row: row['topic_id'])
+        self._set_centroids(np.array([row['centroid'] for row in rows], dtype=np.float32),
+                            np.array([row['member_count'] for row in rows], dtype=np.float64))
+        logger.info(f"Loaded {self.num_topics} topic centroids")
+
+    async def save(self):
+        if not self.db_manager or not self.initialized:
+            return
+        rows = [(topic_id, centroid, float(count))
+                for topic_id, (centroid, count) in enumerate(zip(self.centroids.tolist(), self.counts.tolist()))]
+        await self.db_manager.save_topic_centroids(rows)
+        self._batches_since_save = 0
+
+    async def observe(self, tweet_ids: Sequence[str], embeddings) -> int:
+        """
+        Fit a batch of tweet embeddings and persist their topic assignments.
+        Until the model is seeded, tweets are buffered; returns the number assigned.
+        """
+        if not self._loaded:
+            await self.load()
+        x = self._prepare(embeddings)
+        if self.initialized and x.shape[1] != self.centroids.shape[1]:
+            logger.warning(f"Embedding size changed from {self.centroids.shape[1]} to {x.shape[1]}; reseeding topics")
+            self.centroids = None
+
+        tweet_ids = list(tweet_ids)
+        if not self.initialized:
+            self._pending_ids.extend(tweet_ids)
+            self._pending_embeddings.append(x)
+            if len(self._pending_ids) < self.num_topics:
+                return 0
+            tweet_ids, x = self._pending_ids, np.concatenate(self._pending_embeddings)
+            self._pending_ids, self._pending_embeddings = [], []
+            self._init_centroids(x)
+
+        labels, distances = self._assign_prepared(x)
+        self._update(x, labels)
+
+        if self.db_manager:
+            rows = [(int(tweet_id), int(label), float(distance))
+                    for tweet_id, label, distance in zip(tweet_ids, labels.tolist(), distances.tolist())]
+            await self.db_manager.upsert_topic_assignments(rows)
+            self._batches_since_save += 1
+            if self._batches_since_save >= self.save_every_batches:
+                await self.save()
+        return len(tweet_ids)
+
+    def topic_sizes(self) -> List[float]:
+        return self.counts.tolist() if self.initialized else []
+
+# This file is not meant to be run directly
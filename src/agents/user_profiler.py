@@ -0,0 +1,324 @@
+# src/agents/user_profiler.py
+
+import os
+import time
+import calendar
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCORE_FIELDS = ('engagement_score', 'sentiment_score', 'quality_score')
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value: datetime) -> float:
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+def from_epoch(value: float) -> Optional[datetime]:
+    return EPOCH + timedelta(seconds=float(value)) if np.isfinite(value) else None
+
+
+class ProfileArrays:
+    """Per-user columns indexed by dense user ordinal. Every field is additive, so deltas merge by summing."""
+
+    def __init__(self, capacity: int):
+        self.tweet_count = np.zeros(capacity, dtype=np.int64)
+        self.relevant_count = np.zeros(capacity, dtype=np.int64)
+        self.score_count = np.zeros((capacity, len(SCORE_FIELDS)), dtype=np.int64)
+        self.score_sum = np.zeros((capacity, len(SCORE_FIELDS)), dtype=np.float64)
+        self.score_sumsq = np.zeros((capacity, len(SCORE_FIELDS)), dtype=np.float64)
+        self.hour_histogram = np.zeros((capacity, 24), dtype=np.int32)
+        self.first_seen = np.full(capacity, np.inf)
+        self.last_seen = np.full(capacity, -np.inf)
+
+    @staticmethod
+    def _fill(name: str) -> float:
+        return np.inf if name == 'first_seen' else -np.inf if name == 'last_seen' else 0
+
+    def grow(self, capacity: int):
+        for name, array in list(vars(self).items()):
+            grown = np.full((capacity,) + array.shape[1:], self._fill(name), dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def add_tweets(self, ordinals: np.ndarray, timestamps: np.ndarray, hours: np.ndarray, relevant: np.ndarray,
+                   scores: np.ndarray):
+        """Fold a batch of tweets in; ordinals may repeat. Missing scores are NaN."""
+        valid = ~np.isnan(scores)
+        values = np.where(valid, scores, 0.0)
+        np.add.at(self.tweet_count, ordinals, 1)
+        np.add.at(self.relevant_count, ordinals, relevant)
+        np.add.at(self.score_count, ordinals, valid)
+        np.add.at(self.score_sum, ordinals, values)
+        np.add.at(self.score_sumsq, ordinals, values * values)
+        np.add.at(self.hour_histogram, (ordinals, hours), 1)
+        np.minimum.at(self.first_seen, ordinals, timestamps)
+        np.maximum.at(self.last_seen, ordinals, timestamps)
+
+    def take(self, ordinals: np.ndarray) -> Dict[str, np.ndarray]:
+        """Copy out the rows for ordinals and reset them to empty."""
+        rows = {name: array[ordinals].copy() for name, array in vars(self).items()}
+        for name, array in vars(self).items():
+            array[ordinals] = self._fill(name)
+        return rows
+
+    def merge(self, ordinals: np.ndarray, rows: Dict[str, np.ndarray]):
+        """Add rows (as returned by take, or loaded from Postgres) onto ordinals, which must be unique."""
+        for name, values in rows.items():
+            array = getattr(self, name)
+            if name == 'first_seen':
+                array[ordinals] = np.minimum(array[ordinals], values)
+            elif name == 'last_seen':
+                array[ordinals] = np.maximum(array[ordinals], values)
+            else:
+                array[ordinals] += values
+
+
+class UserProfiler:
+    """
+    Per-user profiles maintained incrementally during ingestion.
+
+    Each author gets a dense ordinal and their state lives in column arrays:
+    tweet counts, score sums and sums of squares (for mean and variance), an
+    hour-of-day histogram, first/last seen times, and an embedding sum.
+    Observed tweets are buffered and folded into the arrays in vectorized
+    batches, so observing a tweet and looking up a profile are both
+    amortized O(1).
+
+    Changes since the last flush are tracked as separate deltas and added
+    onto user_profiles. Shard processes that see the same author therefore
+    merge correctly instead of overwriting each other. Stored profiles are
+    loaded before the first flush.
+    """
+
+    def __init__(self, db_manager=None, flush_interval: Optional[float] = None, initial_capacity: int = 1024):
+        self.db_manager = db_manager
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("USER_PROFILER_FLUSH_INTERVAL", 60))
+        self.capacity = initial_capacity
+        self.totals = ProfileArrays(initial_capacity)
+        self.pending = ProfileArrays(initial_capacity)
+        self.embedding_sum = None
+        self.embedding_count = np.zeros(initial_capacity, dtype=np.int64)
+        self._pending_embeddings = {}
+        self._ordinals = {}
+        self._user_ids = []
+        self._dirty = set()
+        self._buffer = []
+        self.buffer_size = 4096
+        self._loaded = False
+        self._listeners = []
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def _ordinal(self, user_id: str) -> int:
+        ordinal = self._ordinals.get(user_id)
+        if ordinal is None:
+            ordinal = len(self._user_ids)
+            if ordinal == self.capacity:
+                self._grow(self.capacity * 2)
+            self._ordinals[user_id] = ordinal
+            self._user_ids.append(user_id)
+        return ordinal
+
+    def _grow(self, capacity: int):
+        self.totals.grow(capacity)
+        self.pending.grow(capacity)
+        grown = np.zeros(capacity, dtype=np.int64)
+        grown[:self.capacity] = self.embedding_count
+        self.embedding_count = grown
+        if self.embedding_sum is not None:
+            grown = np.zeros((capacity, self.embedding_sum.shape[1]), dtype=np.float32)
+            grown[:self.capacity] = self.embedding_sum
+            self.embedding_sum = grown
+        self.capacity = capacity
+
+    def observe(self, tweet_data: Dict):
+        """Record one newly stored tweet (as passed to insert_tweet) for its author's profile."""
+        ordinal = self._ordinal(str(tweet_data['user_id']))
+        created_at = tweet_data['created_at']
+        self._buffer.append((ordinal, to_epoch(created_at), created_at.hour, bool(tweet_data.get('is_relevant')),
+                             *(tweet_data.get(field) for field in SCORE_FIELDS)))
+        self._dirty.add(ordinal)
+        if len(self._buffer) >= self.buffer_size:
+            self._apply()
+
+    def _apply(self):
+        """Fold buffered tweets into the arrays in one vectorized pass."""
+        if not self._buffer:
+            return
+        rows = np.array(self._buffer, dtype=np.float64)
+        self._buffer = []
+        ordinals = rows[:, 0].astype(np.int64)
+        hours = rows[:, 2].astype(np.int64)
+        relevant = rows[:, 3].astype(np.int64)
+        for arrays in (self.totals, self.pending):
+            arrays.add_tweets(ordinals, rows[:, 1], hours, relevant, rows[:, 4:])
+
+    def observe_embeddings(self, user_ids: Sequence[str], embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.embedding_sum is None:
+            self.embedding_sum = np.zeros((self.capacity, embeddings.shape[1]), dtype=np.float32)
+        for user_id, embedding in zip(user_ids, embeddings):
+            ordinal = self._ordinal(str(user_id))
+            self.embedding_sum[ordinal] += embedding
+            self.embedding_count[ordinal] += 1
+            pending = self._pending_embeddings.get(ordinal)
+            if pending is None:
+                self._pending_embeddings[ordinal] = [embedding.copy(), 1]
+            else:
+                pending[0] += embedding
+                pending[1] += 1
+            self._dirty.add(ordinal)
+
+    def profile(self, user_id: str) -> Optional[Dict]:
+        ordinal = self._ordinals.get(str(user_id))
+        if ordinal is None:
+            return None
+        self._apply()
+        totals = self.totals
+        counts = totals.score_count[ordinal]
+        means = np.divide(totals.score_sum[ordinal], counts, out=np.zeros(len(SCORE_FIELDS)), where=counts > 0)
+        variances = np.divide(totals.score_sumsq[ordinal], counts, out=np.zeros(len(SCORE_FIELDS)), where=counts > 0) - means ** 2
+        embedding_count = int(self.embedding_count[ordinal])
+        return {
+            'user_id': user_id,
+            'tweet_count': int(totals.tweet_count[ordinal]),
+            'relevant_count': int(totals.relevant_count[ordinal]),
+            'scores': {
+                field: {'count': int(counts[index]), 'mean': float(means[index]), 'std': float(np.sqrt(max(variances[index], 0.0)))}
+                for index, field in enumerate(SCORE_FIELDS)
+            },
+            'hour_histogram': totals.hour_histogram[ordinal].tolist(),
+            'first_seen': from_epoch(totals.first_seen[ordinal]),
+            'last_seen': from_epoch(totals.last_seen[ordinal]),
+            'mean_embedding': self.embedding_sum[ordinal] / embedding_count if embedding_count else None,
+        }
+
+    async def load(self):
+        """Add the stored profiles onto the in-memory totals. Runs once, before the first flush."""
+        self._loaded = True
+        if self.db_manager is None:
+            return
+        try:
+            rows = await self.db_manager.get_user_profiles()
+        except Exception as e:
+            logger.error(f"Error loading user profiles: {str(e)}")
+            return
+        if not rows:
+            return
+        ordinals = np.array([self._ordinal(str(row['user_id'])) for row in rows])
+        self.totals.merge(ordinals, {
+            'tweet_count': np.array([row['tweet_count'] for row in rows], dtype=np.int64),
+            'relevant_count': np.array([row['relevant_count'] for row in rows], dtype=np.int64),
+            'score_count': np.array([row['score_count'] for row in rows], dtype=np.int64),
+            'score_sum': np.array([row['score_sum'] for row in rows], dtype=np.float64),
+            'score_sumsq': np.array([row['score_sumsq'] for row in rows], dtype=np.float64),
+            'hour_histogram': np.array([row['hour_histogram'] for row in rows], dtype=np.int32),
+            'first_seen': np.array([to_epoch(row['first_seen']) if row['first_seen'] else np.inf for row in rows]),
+            'last_seen': np.array([to_epoch(row['last_seen']) if row['last_seen'] else -np.inf for row in rows]),
+        })
+        for ordinal, row in zip(ordinals.tolist(), rows):
+            if row['embedding_sum'] is None:
+                continue
+            embedding = np.asarray(row['embedding_sum'], dtype=np.float32)
+            if self.embedding_sum is None:
+                self.embedding_sum = np.zeros((self.capacity, len(embedding)), dtype=np.float32)
+            self.embedding_sum[ordinal] += embedding
+            self.embedding_count[ordinal] += row['embedding_count']
+        logger.info(f"Loaded {len(rows)} user profiles")
+
+    async def flush(self) -> int:
+        """Add the changes since the last flush onto user_profiles. Returns the number of users written."""
+        if self.db_manager is None or not self._dirty:
+            self._last_flush = time.monotonic()
+            return 0
+        if not self._loaded:
+            await self.load()
+        self._apply()
+
+        # Take the deltas before awaiting so observations made during the flush land in the next one
+        ordinals = np.array(sorted(self._dirty))
+        self._dirty = set()
+        deltas = self.pending.take(ordinals)
+        embeddings, self._pending_embeddings = self._pending_embeddings, {}
+        self._last_flush = time.monotonic()
+
+        rows = []
+        for index, ordinal in enumerate(ordinals.tolist()):
+            embedding = embeddings.get(ordinal)
+            rows.append((
+                int(self._user_ids[ordinal]),
+                int(deltas['tweet_count'][index]),
+                int(deltas['relevant_count'][index]),
+                deltas['score_count'][index].tolist(),
+                deltas['score_sum'][index].tolist(),
+                deltas['score_sumsq'][index].tolist(),
+                deltas['hour_histogram'][index].tolist(),
+                from_epoch(deltas['first_seen'][index]),
+                from_epoch(deltas['last_seen'][index]),
+                embedding[0].tolist() if embedding else None,
+                embedding[1] if embedding else 0,
+            ))
+        try:
+            await self.db_manager.upsert_user_profiles(rows)
+        except Exception as e:
+            logger.error(f"Error flushing user profiles: {str(e)}")
+            self.pending.merge(ordinals, deltas)
+            for ordinal, (embedding, count) in embeddings.items():
+                pending = self._pending_embeddings.setdefault(ordinal, [np.zeros_like(embedding), 0])
+                pending[0] += embedding
+                pending[1] += count
+            self._dirty.update(ordinals.tolist())
+            return 0
+        logger.info(f"Flushed {len(rows)} user profiles")
+        flushed = [self._user_ids[ordinal] for ordinal in ordinals.tolist()]
+        for callback in self._listeners:
+            try:
+                callback(flushed)
+            except Exception as e:
+                logger.error(f"Error in user profile listener: {str(e)}")
+        return len(rows)
+
+    async def flush_if_due(self) -> int:
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            return await self.flush()
+        return 0
+
+    def user_ids(self) -> List[str]:
+        return list(self._user_ids)
+
+    @property
+    def loaded(self) -> bool:
+        """True once stored profiles have been loaded, i.e. the totals cover more than this process's tweets."""
+        return self._loaded
+
+    def top_users(self, field: str = 'engagement_score', offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Users ranked by the sum of a score field, highest first."""
+        self._apply()
+        count = len(self._user_ids)
+        if offset >= count or limit <= 0:
+            return []
+        totals = self.totals.score_sum[:count, SCORE_FIELDS.index(field)]
+        end = min(offset + limit, count)
+        # Partition out the top `end` users before sorting just those
+        candidates = np.argpartition(-totals, end - 1)[:end] if end < count else np.arange(count)
+        ranked = candidates[np.lexsort((candidates, -totals[candidates]))][offset:end]
+        return [{
+            'user_id': self._user_ids[ordinal],
+            'total': float(totals[ordinal]),
+            'tweet_count': int(self.totals.tweet_count[ordinal]),
+        } for ordinal in ranked.tolist()]
+
+    def add_listener(self, callback):
+        """Register a callback run with the flushed user ids after each successful flush."""
+        self._listeners.append(callback)
+
+# This file is not meant to be run directly
@@ -0,0 +1,176 @@
+# src/aggregator/results_aggregator.py
+
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.utils.agent_config import load_agent_config
+from src.preprocessing.data_cleaner import clean_tweet
+
+logger = logging.getLogger(__name__)
+
+
+class AgentSpec:
+    """
+    One agent the aggregator fans out to. func takes the whole batch of items
+    and returns one dict of fields per item (or None for items it has nothing
+    for). Async funcs run on the event loop. CPU-bound sync funcs run in the
+    aggregator's executor, so they overlap with each other and with I/O.
+    """
+
+    def __init__(self, name: str, func: Callable, cpu_bound: bool = True, timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.cpu_bound = cpu_bound
+        self.timeout = timeout
+
+
+class AggregateResult:
+    """Merged per-tweet records plus how each agent fared (ok, timeout or error) and how long it took."""
+
+    def __init__(self, records: List[Dict], agents: Dict[str, Dict], seconds: float):
+        self.records = records
+        self.agents = agents
+        self.seconds = seconds
+
+    @property
+    def complete(self) -> bool:
+        return all(status['status'] == 'ok' for status in self.agents.values())
+
+
+class ResultsAggregator:
+    """
+    Fans a batch of pipeline items ({'tweet', 'user_data', 'tweet_data'},
+    optionally 'embedding') out to every registered agent at once and merges
+    the results into one record per tweet.
+
+    Each agent has its own timeout. An agent that times out or raises is
+    reported in the result, and the tweets' records list it under 'missing'.
+    The batch still returns with whatever the other agents produced.
+    Results are merged in the order the agents finish, so a batch takes as
+    long as its slowest agent, not the sum of all of them. An executor call
+    that times out cannot be interrupted: its thread finishes in the
+    background and the result is discarded.
+    """
+
+    def __init__(self, agents: Sequence[AgentSpec] = (), executor=None, config: Optional[Dict] = None):
+        config = config if config is not None else load_agent_config('results_aggregator')
+        self.default_timeout = float(config.get('default_timeout', 5.0))
+        self.timeouts = dict(config.get('timeouts') or {})
+        self.max_workers = int(config.get('max_workers', 4))
+        self.executor = executor
+        self._owns_executor = executor is None
+        self.agents = {}
+        for agent in agents:
+            self.register(agent)
+
+    @classmethod
+    def for_fetcher(cls, fetcher, executor=None, config: Optional[Dict] = None) -> 'ResultsAggregator':
+        """Aggregator over a TwitterFetcher's sentiment, engagement-quality, topic and profile agents."""
+        aggregator = cls(executor=executor, config=config)
+
+        def sentiment(items):
+            scores = fetcher.sentiment_analyzer.score_batch([clean_tweet(item['tweet']).content for item in items]).tolist()
+            return [{'sentiment_score': score, 'sentiment_label': fetcher.sentiment_analyzer.label(score)} for score in scores]
+
+        def engagement_quality(items):
+            # Runs in the executor, so reuse the pipeline's score and only read the classifier's history
+            results = [None] * len(items)
+            rows = []
+            for index, item in enumerate(items):
+                if item['tweet_data'].get('quality_label') is not None:
+                    results[index] = {'quality_score': item['tweet_data']['quality_score'],
+                                      'quality_label': item['tweet_data']['quality_label']}
+                else:
+                    rows.append(index)
+            scores, labels = fetcher.engagement_classifier.classify(
+                [(items[index]['tweet'], items[index]['user_data'], items[index]['tweet_data']['created_at']) for index in rows],
+                update_history=False)
+            for index, score, label in zip(rows, scores.tolist(), labels):
+                results[index] = {'quality_score': score, 'quality_label': label}
+            return results
+
+        def topic(items):
+            rows = [index for index, item in enumerate(items) if item.get('embedding') is not None]
+            results = [None] * len(items)
+            if not rows:
+                return results
+            labels, distances = fetcher.topic_modeler.assign([items[index]['embedding'] for index in rows])
+            for index, label, distance in zip(rows, labels.tolist(), distances.tolist()):
+                results[index] = {'topic_id': label, 'topic_distance': distance}
+            return results
+
+        async def profile(items):
+            # Profiles are mutated by ingestion on the event loop, so they are read there too
+            results = []
+            for item in items:
+                found = fetcher.user_profiler.profile(item['tweet_data'].get('user_id') or item['user_data']['id'])
+                results.append({'author_profile': found} if found else None)
+            return results
+
+        aggregator.register(AgentSpec('sentiment', sentiment))
+        aggregator.register(AgentSpec('engagement_quality', engagement_quality))
+        aggregator.register(AgentSpec('topic', topic))
+        aggregator.register(AgentSpec('profile', profile, cpu_bound=False))
+        return aggregator
+
+    def register(self, agent: AgentSpec):
+        if agent.timeout is None:
+            agent.timeout = float(self.timeouts.get(agent.name, self.default_timeout))
+        self.agents[agent.name] = agent
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='aggregator')
+        return self.executor
+
+    async def _run_agent(self, agent: AgentSpec, items: List[Dict]):
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(agent.func):
+                results = await asyncio.wait_for(agent.func(items), timeout=agent.timeout)
+            elif agent.cpu_bound:
+                call = asyncio.get_running_loop().run_in_executor(self._get_executor(), agent.func, items)
+                results = await asyncio.wait_for(call, timeout=agent.timeout)
+            else:
+                # Cheap sync agents run inline; they return before any timeout could fire
+                results = agent.func(items)
+            if len(results) != len(items):
+                raise ValueError(f"returned {len(results)} results for {len(items)} items")
+            return agent.name, {'status': 'ok', 'seconds': time.perf_counter() - start}, results
+        except asyncio.TimeoutError:
+            logger.warning(f"Agent {agent.name} timed out after {agent.timeout}s on {len(items)} tweets")
+            return agent.name, {'status': 'timeout', 'seconds': time.perf_counter() - start}, None
+        except Exception as e:
+            logger.error(f"Agent {agent.name} failed on {len(items)} tweets: {str(e)}")
+            return agent.name, {'status': 'error', 'seconds': time.perf_counter() - start, 'error': str(e)}, None
+
+    async def aggregate(self, items: List[Dict], agents: Optional[Sequence[str]] = None) -> AggregateResult:
+        """Run the named agents (default all) over items concurrently and merge their results per tweet."""
+        start = time.perf_counter()
+        selected = [self.agents[name] for name in agents] if agents is not None else list(self.agents.values())
+        records = [{'tweet_id': item['tweet_data'].get('id', item['tweet'].get('id')), 'missing': []} for item in items]
+        statuses = {}
+        if not items:
+            return AggregateResult(records, statuses, 0.0)
+
+        for finished in asyncio.as_completed([self._run_agent(agent, items) for agent in selected]):
+            name, status, results = await finished
+            statuses[name] = status
+            if results is None:
+                for record in records:
+                    record['missing'].append(name)
+                continue
+            for record, fields in zip(records, results):
+                if fields:
+                    record.update(fields)
+        return AggregateResult(records, statuses, time.perf_counter() - start)
+
+    def close(self):
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+# This file is not meant to be run directly
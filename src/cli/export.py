@@ -0,0 +1,33 @@
+# src/cli/export.py
+
+import sys
+import os
+import json
+import asyncio
+import click
+
+# Add the project root directory to Python's module search path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.database.parquet_exporter import ParquetExporter, EXPORT_TABLES
+from src.utils.db_context import get_db
+
+async def run_export(output_dir, tables, full, chunk_size, lag):
+    async with get_db() as db_manager:
+        exporter = ParquetExporter(db_manager, output_dir, chunk_size=chunk_size, lag_seconds=lag)
+        return await exporter.export(tables or None, full=full)
+
+@click.command()
+@click.option('--output', 'output_dir', default='exports', show_default=True, help='Directory the Parquet files and watermarks are written to')
+@click.option('--table', 'tables', multiple=True, type=click.Choice(sorted(EXPORT_TABLES)), help='Table to export (repeatable; default all)')
+@click.option('--full', is_flag=True, help='Ignore stored watermarks and export every row')
+@click.option('--chunk-size', default=50000, show_default=True, help='Rows fetched from the cursor and written per row group')
+@click.option('--lag', default=60.0, show_default=True, help='Seconds of recent updates held back for the next run')
+def export(output_dir, tables, full, chunk_size, lag):
+    """Export tweets, users, wallets and engagement scores to Parquet."""
+    summary = asyncio.run(run_export(output_dir, tables, full, chunk_size, lag))
+    click.echo(json.dumps(summary, indent=2, default=str))
+
+if __name__ == '__main__':
+    export()
@@ -0,0 +1,44 @@
+# src/cli/project_accounts.py
+
+import sys
+import os
+import asyncio
+import click
+
+# Add the project root directory to Python's module search path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.account_management.project_account_manager import ProjectAccountManager
+from src.utils.db_context import get_db
+
+async def run_with_manager(action):
+    async with get_db() as db_manager:
+        return await action(ProjectAccountManager(db_manager))
+
+@click.group()
+def cli():
+    """Manage tracked project accounts; a running sharded runner picks changes up at its next rebalance."""
+
+@cli.command()
+@click.argument('username')
+def add(username):
+    """Track a project account (or bring an archived one back)."""
+    success = asyncio.run(run_with_manager(lambda manager: manager.add_project_account(username)))
+    click.echo(f"{'Added' if success else 'Failed to add'} project account {username}")
+
+@cli.command()
+@click.argument('username')
+def archive(username):
+    """Stop tracking a project account."""
+    success = asyncio.run(run_with_manager(lambda manager: manager.archive_project_account(username)))
+    click.echo(f"{'Archived' if success else 'Failed to archive'} project account {username}")
+
+@cli.command(name='list')
+def list_accounts():
+    """List the active project accounts."""
+    for row in asyncio.run(run_with_manager(lambda manager: manager.get_all_project_accounts())):
+        click.echo(f"{row['twitter_username']}\t{row['twitter_id']}")
+
+if __name__ == '__main__':
+    cli()
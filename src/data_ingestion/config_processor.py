@@ -2,6 +2,7 @@
 
 import sys
 import os
+import asyncio
 import logging
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -10,8 +11,9 @@ from configs.project_config import PROJECT_ACCOUNTS, PROJECT_WALLET, USER_ACCOUN
 from src.account_management.project_account_manager import ProjectAccountManager
 from src.account_management.user_manager import UserManager
 from src.database.sql_db_manager import SQLDBManager
+from src.utils.db_context import get_db
+from src.utils.logging_config import configure_logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ConfigProcessor:
@@ -21,14 +23,18 @@ class ConfigProcessor:
         self.db_manager = SQLDBManager()
 
     def process_config(self):
-        self.process_project_accounts()
+        asyncio.run(self.process_project_accounts())
         self.process_project_wallet()
         self.process_user_accounts()
         self.process_keywords_and_hashtags()
 
-    def process_project_accounts(self):
+    async def process_project_accounts(self):
+        async with get_db() as db_manager:
+            await self._add_project_accounts(ProjectAccountManager(db_manager))
+
+    async def _add_project_accounts(self, project_account_manager):
         for account in PROJECT_ACCOUNTS:
-            if self.project_account_manager.add_project_account(account):
+            if await project_account_manager.add_project_account(account):
                 logger.info(f"Added project account: {account}")
             else:
                 logger.warning(f"Failed to add project account: {account}")
@@ -57,6 +63,7 @@ class ConfigProcessor:
             logger.info(f"Added hashtag: {hashtag}")
 
 def main():
+    configure_logging()
     processor = ConfigProcessor()
     processor.process_config()
 
@@ -0,0 +1,259 @@
+# src/data_ingestion/metrics_refresher.py
+
+import math
+import time
+import heapq
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from src.utils.agent_config import load_agent_config
+from src.utils.engagement_score import calculate_engagement_score, metrics_total
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'calls_per_window': 300,
+    'window_seconds': 900,
+    'batch_size': 100,
+    'max_age_hours': 168,
+    'decay_hours': 24,
+    'min_change': 5,
+    'max_interval_hours': 24,
+    'smoothing': 0.5,
+    'reload_seconds': 300,
+}
+
+
+def to_epoch(value: datetime) -> float:
+    """Stored timestamps are naive UTC."""
+    return value.replace(tzinfo=timezone.utc).timestamp() if value.tzinfo is None else value.timestamp()
+
+
+class TrackedTweet:
+    """What the refresher knows about one tweet: its last total and its interaction rate at that time."""
+
+    __slots__ = ('tweet_id', 'created_at', 'total', 'checked_at', 'rate', 'due')
+
+    def __init__(self, tweet_id: str, created_at: float, total: Optional[int], checked_at: Optional[float]):
+        self.tweet_id = tweet_id
+        self.created_at = created_at
+        self.total = total
+        self.checked_at = checked_at
+        self.rate = None
+        self.due = 0.0
+
+
+class CallBudget:
+    """At most calls lookups in any window_seconds, the way the API's 15-minute limits count them."""
+
+    def __init__(self, calls: int, window_seconds: float):
+        self.calls = calls
+        self.window_seconds = window_seconds
+        self.spent = deque()
+
+    def available(self, now: float) -> int:
+        while self.spent and self.spent[0] <= now - self.window_seconds:
+            self.spent.popleft()
+        return max(self.calls - len(self.spent), 0)
+
+    def spend(self, now: float):
+        self.spent.append(now)
+
+
+class MetricsRefresher:
+    """
+    Keeps stored public_metrics of recent tweets fresh through the batch
+    lookup endpoint (up to batch_size ids per call), spending a fixed API
+    budget where the metrics are most likely to have moved.
+
+    Each tweet's interaction rate is assumed to decay exponentially with a
+    time constant of decay_hours. It is estimated from the last two captured
+    totals, smoothed, or from the total and age alone the first time. A
+    tweet falls due once the interactions expected since its last check
+    reach min_change. Fast, young tweets come round often, and old quiet
+    ones rarely. Every tweet is rechecked at least every max_interval_hours
+    until it is max_age_hours old.
+
+    Due times are kept in a heap. Each round pops what is due, up to the
+    calls the budget allows. It then tops up the last call with the next
+    tweets to fall due, so no call goes out part-empty.
+    """
+
+    def __init__(self, fetcher, db_manager, config: Optional[Dict] = None, clock=time.time):
+        settings = dict(DEFAULT_CONFIG, **load_agent_config('metrics_refresher'))
+        settings.update(config or {})
+        self.fetcher = fetcher
+        self.db_manager = db_manager
+        self.clock = clock
+        self.batch_size = min(int(settings['batch_size']), 100)
+        self.max_age = settings['max_age_hours'] * 3600.0
+        self.decay = settings['decay_hours'] * 3600.0
+        self.min_change = float(settings['min_change'])
+        self.max_interval = settings['max_interval_hours'] * 3600.0
+        self.smoothing = float(settings['smoothing'])
+        self.reload_seconds = float(settings['reload_seconds'])
+        self.budget = CallBudget(int(settings['calls_per_window']), float(settings['window_seconds']))
+        self.tracked: Dict[str, TrackedTweet] = {}
+        # Ids the lookup no longer returns, so reloads don't pick them up again
+        self.gone = set()
+        self.heap = []
+        self._seq = 0
+        self._loaded_at = None
+        self._stopping = asyncio.Event()
+        self.stats = {'calls': 0, 'refreshed': 0, 'changed': 0, 'interactions': 0, 'missing': 0, 'retired': 0}
+
+    def stop(self):
+        self._stopping.set()
+
+    def track(self, tweet_id: str, created_at: datetime, total: Optional[int] = None,
+              checked_at: Optional[datetime] = None):
+        """Start following a tweet; without a captured total it is due at once."""
+        tweet_id = str(tweet_id)
+        if tweet_id in self.tracked or tweet_id in self.gone:
+            return
+        tweet = TrackedTweet(tweet_id, to_epoch(created_at), total, to_epoch(checked_at) if checked_at else None)
+        if total is not None:
+            tweet.checked_at = tweet.checked_at or self.clock()
+            tweet.rate = self._prior_rate(tweet)
+        self.tracked[tweet_id] = tweet
+        self._schedule(tweet, tweet.checked_at + self._interval(tweet.rate) if tweet.rate is not None else self.clock())
+
+    def _prior_rate(self, tweet: TrackedTweet) -> float:
+        """Current rate implied by the total so far, if the rate decayed from creation."""
+        age = max(tweet.checked_at - tweet.created_at, 60.0)
+        decayed = math.exp(-age / self.decay)
+        return tweet.total * decayed / (self.decay * (1 - decayed))
+
+    def _interval(self, rate: float) -> float:
+        """Seconds until rate * decay * (1 - exp(-t / decay)) interactions are expected to reach min_change."""
+        reachable = rate * self.decay
+        if reachable <= self.min_change:
+            return self.max_interval
+        return min(-self.decay * math.log(1 - self.min_change / reachable), self.max_interval)
+
+    def _observe(self, tweet: TrackedTweet, total: int, now: float):
+        if tweet.total is None or tweet.checked_at is None or now <= tweet.checked_at:
+            tweet.total, tweet.checked_at = total, now
+            tweet.rate = self._prior_rate(tweet)
+            return
+        elapsed = now - tweet.checked_at
+        decayed = math.exp(-elapsed / self.decay)
+        # Rate at the previous check that explains the observed change, carried forward to now
+        observed = max(total - tweet.total, 0) / (self.decay * (1 - decayed)) * decayed
+        predicted = (tweet.rate if tweet.rate is not None else observed) * decayed
+        tweet.rate = self.smoothing * observed + (1 - self.smoothing) * predicted
+        tweet.total, tweet.checked_at = total, now
+
+    def _schedule(self, tweet: TrackedTweet, due: float):
+        tweet.due = due
+        self._seq += 1
+        heapq.heappush(self.heap, (due, self._seq, tweet.tweet_id))
+
+    def _pop(self, now: float) -> Optional[TrackedTweet]:
+        """The tweet with the earliest due time, skipping stale heap entries and retiring old tweets."""
+        while self.heap:
+            due, _, tweet_id = heapq.heappop(self.heap)
+            tweet = self.tracked.get(tweet_id)
+            if tweet is None or tweet.due != due:
+                continue
+            if now - tweet.created_at > self.max_age:
+                del self.tracked[tweet_id]
+                self.stats['retired'] += 1
+                continue
+            return tweet
+        return None
+
+    def select(self, now: float, calls: int) -> List[TrackedTweet]:
+        selected = []
+        while len(selected) < calls * self.batch_size and self.heap and self.heap[0][0] <= now:
+            tweet = self._pop(now)
+            if tweet:
+                selected.append(tweet)
+        # Fill the last call with the next tweets to fall due
+        while selected and len(selected) % self.batch_size and self.heap:
+            tweet = self._pop(now)
+            if tweet:
+                selected.append(tweet)
+        return selected
+
+    async def reload(self):
+        now = self.clock()
+        created_since = datetime.fromtimestamp(now - self.max_age, timezone.utc).replace(tzinfo=None)
+        rows = await self.db_manager.get_refresh_candidates(created_since)
+        before = len(self.tracked)
+        for row in rows:
+            self.track(row['id'], row['created_at'], row['metrics_total'], row['metrics_refreshed_at'])
+        self._loaded_at = now
+        logger.info(f"Metrics refresher tracking {len(self.tracked)} tweets ({len(self.tracked) - before} new)")
+
+    async def run_once(self) -> Dict:
+        """Spend what the budget allows on the tweets that are due; returns this round's counts."""
+        now = self.clock()
+        if self._loaded_at is None or now - self._loaded_at >= self.reload_seconds:
+            await self.reload()
+        selected = self.select(now, self.budget.available(now))
+        round_stats = {'calls': 0, 'refreshed': 0, 'changed': 0, 'interactions': 0, 'missing': 0}
+        rows = []
+        for start in range(0, len(selected), self.batch_size):
+            batch = selected[start:start + self.batch_size]
+            self.budget.spend(self.clock())
+            round_stats['calls'] += 1
+            response = await self.fetcher.fetch_tweets_by_ids([tweet.tweet_id for tweet in batch])
+            if response is None:
+                # Leave this batch and the rest due; the next round retries them
+                for tweet in selected[start:]:
+                    self._schedule(tweet, tweet.due)
+                break
+            rows.extend(self._apply(batch, response, round_stats))
+        if rows:
+            try:
+                await self.db_manager.update_tweet_metrics(rows)
+            except Exception as e:
+                logger.error(f"Error storing refreshed metrics for {len(rows)} tweets: {str(e)}")
+        for key, value in round_stats.items():
+            self.stats[key] += value
+        if round_stats['calls']:
+            logger.info(f"Metrics refresh: {round_stats}, {round_stats['changed'] / round_stats['calls']:.1f} changed tweets per call")
+        return round_stats
+
+    def _apply(self, batch: List[TrackedTweet], response: Dict, round_stats: Dict) -> List:
+        now = self.clock()
+        found = {tweet['id']: tweet for tweet in response.get('data', [])}
+        rows = []
+        for tweet in batch:
+            data = found.get(tweet.tweet_id)
+            if data is None:
+                # Deleted or protected: nothing left to refresh
+                del self.tracked[tweet.tweet_id]
+                self.gone.add(tweet.tweet_id)
+                round_stats['missing'] += 1
+                continue
+            public_metrics = data.get('public_metrics', {})
+            total = metrics_total(public_metrics)
+            previous = tweet.total
+            self._observe(tweet, total, now)
+            self._schedule(tweet, now + self._interval(tweet.rate))
+            round_stats['refreshed'] += 1
+            if previous is None or total != previous:
+                round_stats['changed'] += 1
+                round_stats['interactions'] += total - (previous or 0)
+                rows.append((tweet.tweet_id, calculate_engagement_score(public_metrics), total))
+        return rows
+
+    async def run(self, poll_interval: float = 5.0):
+        """Refresh until stop(); idles between rounds while nothing is due or the budget is spent."""
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Error in metrics refresh round: {str(e)}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        logger.info(f"Metrics refresher stopped: {self.stats}")
+
+# This file is not meant to be run directly
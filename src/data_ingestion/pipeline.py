@@ -0,0 +1,358 @@
+# src/data_ingestion/pipeline.py
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Iterable
+
+from src.preprocessing.data_cleaner import clean_tweet
+from src.utils.relevance_check import is_text_relevant
+from src.utils.engagement_score import calculate_engagement_score, metrics_total
+from src.utils.profiling import mark, profile_stage
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('fetch', 'parse', 'relevance', 'score', 'persist', 'embed')
+
+# Marks the end of a stage's input; one is sent per downstream worker
+_DONE = object()
+
+# Timelines only reach back 3200 tweets, i.e. 32 pages of 100
+MAX_PAGES = int(os.getenv("PIPELINE_MAX_PAGES", "32"))
+
+
+class StageConfig:
+    """Worker count, batch size and input queue bound for one pipeline stage."""
+
+    def __init__(self, workers: int = 1, batch_size: int = 1, queue_size: int = 100):
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.queue_size = max(1, int(queue_size))
+
+    @classmethod
+    def from_env(cls, stage: str, workers: int = 1, batch_size: int = 1, queue_size: int = 100):
+        """Read PIPELINE_<STAGE>_WORKERS / _BATCH_SIZE / _QUEUE_SIZE, falling back to the given defaults."""
+        prefix = f"PIPELINE_{stage.upper()}_"
+        return cls(
+            workers=os.getenv(prefix + "WORKERS", workers),
+            batch_size=os.getenv(prefix + "BATCH_SIZE", batch_size),
+            queue_size=os.getenv(prefix + "QUEUE_SIZE", queue_size),
+        )
+
+
+DEFAULT_STAGE_CONFIGS = {
+    'fetch': dict(workers=4, batch_size=1, queue_size=100),
+    'parse': dict(workers=1, batch_size=1, queue_size=20),
+    'relevance': dict(workers=1, batch_size=100, queue_size=1000),
+    'score': dict(workers=1, batch_size=100, queue_size=1000),
+    'persist': dict(workers=4, batch_size=50, queue_size=1000),
+    'embed': dict(workers=1, batch_size=100, queue_size=1000),
+}
+
+
+class StageMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def observe_queue(self, depth: int):
+        self.queue_depth = depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def as_dict(self) -> Dict:
+        end = self.finished_at or time.monotonic()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'batches': self.batches,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 4),
+            'throughput_per_sec': round(self.items_in / elapsed, 2) if elapsed > 0 else 0.0,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+        }
+
+
+class IngestionPipeline:
+    """
+    Runs TwitterFetcher work as fetch -> parse -> relevance -> score -> persist -> embed,
+    with bounded asyncio.Queues between stages so network, DB and CPU work overlap.
+    A full downstream queue blocks the upstream stage (backpressure).
+    """
+
+    def __init__(self, fetcher, stage_configs: Optional[Dict[str, StageConfig]] = None):
+        self.fetcher = fetcher
+        self.configs = {
+            stage: StageConfig.from_env(stage, **DEFAULT_STAGE_CONFIGS[stage]) for stage in STAGES
+        }
+        if stage_configs:
+            self.configs.update(stage_configs)
+        self.metrics = {stage: StageMetrics(stage) for stage in STAGES}
+        # Tweets returned per account id or query by the last fetch of this run
+        self.fetch_counts: Dict[str, int] = {}
+        # Per account id or query fetched back to its since_id: the newest id, pages not yet
+        # parsed, tweets parsed and tweets persisted. since_ids only move once all are persisted.
+        self.fetched: Dict[str, Dict] = {}
+        self.queues = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop taking new fetch work; everything already fetched drains through the remaining stages."""
+        self._stopping.set()
+
+    async def run(self, account_ids: Iterable[str] = (), queries: Iterable[str] = ()) -> Dict:
+        self.queues = {stage: asyncio.Queue(maxsize=self.configs[stage].queue_size) for stage in STAGES}
+        work = [('account', str(account_id)) for account_id in account_ids] + [('query', query) for query in queries]
+
+        handlers = {
+            'fetch': self._fetch,
+            'parse': self._parse,
+            'relevance': self._relevance,
+            'score': self._score,
+            'persist': self._persist,
+            'embed': self._embed,
+        }
+        tasks = []
+        for index, stage in enumerate(STAGES):
+            downstream = STAGES[index + 1] if index + 1 < len(STAGES) else None
+            tasks.append(asyncio.create_task(self._run_stage(stage, handlers[stage], downstream)))
+
+        mark('pipeline start')
+        feeder = asyncio.create_task(self._feed(work))
+        try:
+            await asyncio.gather(feeder, *tasks)
+        finally:
+            for task in tasks + [feeder]:
+                if not task.done():
+                    task.cancel()
+            await self.fetcher.term_counter.flush()
+            await self.fetcher.user_profiler.flush()
+        self._advance_since_ids()
+
+        summary = self.metrics_summary()
+        for stage, stats in summary.items():
+            logger.info(f"Pipeline stage {stage}: {stats}")
+        return summary
+
+    def _advance_since_ids(self):
+        """Move since_id to the newest fetched tweet for every key whose tweets were all persisted."""
+        since_ids = self.fetcher.since_ids
+        if since_ids is None:
+            return
+        for key, progress in self.fetched.items():
+            if progress['pages'] == 0 and progress['persisted'] == progress['items']:
+                since_ids[key] = progress['newest_id']
+            else:
+                logger.warning(f"Keeping since_id for {key}: {progress['persisted']} of {progress['items']} tweets persisted")
+
+    def metrics_summary(self) -> Dict:
+        for stage, queue in self.queues.items():
+            self.metrics[stage].queue_depth = queue.qsize()
+        return {stage: self.metrics[stage].as_dict() for stage in STAGES}
+
+    async def _feed(self, work: List):
+        queue = self.queues['fetch']
+        for index, item in enumerate(work):
+            if self._stopping.is_set():
+                logger.info(f"Pipeline stopping; {len(work) - index} fetch items not started")
+                break
+            await queue.put(item)
+            self.metrics['fetch'].observe_queue(queue.qsize())
+        for _ in range(self.configs['fetch'].workers):
+            await queue.put(_DONE)
+
+    async def _run_stage(self, stage: str, handler, downstream: Optional[str]):
+        config = self.configs[stage]
+        metrics = self.metrics[stage]
+        metrics.started_at = time.monotonic()
+        workers = [asyncio.create_task(self._worker(stage, handler, downstream)) for _ in range(config.workers)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            metrics.finished_at = time.monotonic()
+            mark(f"pipeline {stage} done")
+            if downstream:
+                for _ in range(self.configs[downstream].workers):
+                    await self.queues[downstream].put(_DONE)
+
+    async def _worker(self, stage: str, handler, downstream: Optional[str]):
+        queue = self.queues[stage]
+        batch_size = self.configs[stage].batch_size
+        metrics = self.metrics[stage]
+        out_queue = self.queues[downstream] if downstream else None
+        out_metrics = self.metrics[downstream] if downstream else None
+
+        done = False
+        while not done:
+            batch = []
+            item = await queue.get()
+            if item is _DONE:
+                break
+            batch.append(item)
+            # Take whatever else is already queued, up to the batch size, without waiting
+            while len(batch) < batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+
+            metrics.items_in += len(batch)
+            metrics.batches += 1
+            start_time = time.perf_counter()
+            try:
+                results = await handler(batch)
+            except Exception as e:
+                metrics.errors += len(batch)
+                logger.error(f"Pipeline stage {stage} failed on a batch of {len(batch)}: {str(e)}")
+                results = []
+            metrics.busy_seconds += time.perf_counter() - start_time
+
+            if out_queue is not None:
+                for result in results:
+                    await out_queue.put(result)
+                    out_metrics.observe_queue(out_queue.qsize())
+            metrics.items_out += len(results)
+
+    # Stage handlers take a batch and return the items for the next stage
+
+    @profile_stage('pipeline.fetch')
+    async def _fetch(self, batch: List) -> List:
+        pages = []
+        since_ids = self.fetcher.since_ids
+        for kind, value in batch:
+            since_id = since_ids.get(value) if since_ids is not None else None
+            fetched, complete = await self._fetch_new(kind, value, since_id)
+            if kind == 'account' and complete:
+                # Failed fetches are left out, so they aren't mistaken for polls that found nothing
+                self.fetch_counts[value] = sum(len(page['data']) for page in fetched)
+            if not fetched:
+                logger.warning(f"No tweets found for {'account ID' if kind == 'account' else 'query'}: {value}")
+                continue
+            pages.extend((value, page) for page in fetched)
+            newest_id = fetched[0].get('meta', {}).get('newest_id')
+            if since_ids is not None and newest_id and complete:
+                self.fetched[value] = {'newest_id': newest_id, 'pages': len(fetched), 'items': 0, 'persisted': 0}
+        return pages
+
+    async def _fetch_new(self, kind: str, value: str, since_id: Optional[str]):
+        """
+        Pages of tweets newer than since_id, newest first, and whether they
+        reach all the way back to it. With since_id set, next_token is followed
+        (at 100 per page) until the API has no more, so a burst bigger than the
+        first page isn't skipped when since_id moves to the newest tweet.
+        Without since_id only the first page is read. A failed request leaves
+        the result incomplete, and since_id must not move.
+        """
+        kwargs = {'since_id': since_id} if since_id else {}
+        if kind == 'account' and value in self.fetcher.page_sizes:
+            kwargs['max_results'] = self.fetcher.page_sizes[value]
+        pages = []
+        while True:
+            if kind == 'account':
+                page = await self.fetcher.fetch_user_tweets(value, **kwargs)
+                valid = page and 'data' in page and 'includes' in page
+            else:
+                page = await self.fetcher.fetch_tweets_by_keywords(value, **kwargs)
+                valid = page and 'data' in page
+            if not valid:
+                if page is None:
+                    self.metrics['fetch'].errors += 1
+                # None is a failed request; after earlier pages it leaves a gap behind them
+                return pages, page is not None
+            pages.append(page)
+            next_token = page.get('meta', {}).get('next_token')
+            if not since_id or not next_token:
+                return pages, True
+            if len(pages) >= MAX_PAGES:
+                logger.warning(f"Stopped paging {value} after {len(pages)} pages; older new tweets are skipped")
+                return pages, True
+            kwargs.update(pagination_token=next_token, max_results=100)
+
+    @profile_stage('pipeline.parse')
+    async def _parse(self, batch: List) -> List:
+        items = []
+        for key, page in batch:
+            parsed = 0
+            for tweet, user_data in self.fetcher.iter_page_tweets(page):
+                try:
+                    # Text is normalized once here; every later stage reads the memoized result
+                    clean_tweet(tweet)
+                    items.append({
+                        'key': key,
+                        'tweet': tweet,
+                        'user_data': user_data,
+                        'tweet_data': self.fetcher.parse_tweet(tweet),
+                    })
+                    parsed += 1
+                except (KeyError, ValueError) as e:
+                    # Unparseable tweets would fail on every fetch, so they don't hold back since_id
+                    self.metrics['parse'].errors += 1
+                    logger.error(f"Error parsing tweet {tweet.get('id')}: {str(e)}")
+            progress = self.fetched.get(key)
+            if progress is not None:
+                progress['pages'] -= 1
+                progress['items'] += parsed
+        return items
+
+    @profile_stage('pipeline.relevance')
+    async def _relevance(self, batch: List) -> List:
+        for item in batch:
+            item['tweet_data']['is_relevant'] = is_text_relevant(clean_tweet(item['tweet']).text)
+        return batch
+
+    @profile_stage('pipeline.score')
+    async def _score(self, batch: List) -> List:
+        sentiment_scores = self.fetcher.sentiment_analyzer.score_batch([clean_tweet(item['tweet']).content for item in batch])
+        quality_scores, quality_labels = self.fetcher.engagement_classifier.classify(
+            [(item['tweet'], item['user_data'], item['tweet_data']['created_at']) for item in batch])
+        for item, sentiment_score, quality_score, quality_label in zip(batch, sentiment_scores.tolist(), quality_scores.tolist(), quality_labels):
+            item['tweet_data']['engagement_score'] = calculate_engagement_score(item['tweet'].get('public_metrics', {}))
+            item['tweet_data']['metrics_total'] = metrics_total(item['tweet'].get('public_metrics', {}))
+            item['tweet_data']['sentiment_score'] = sentiment_score
+            item['tweet_data']['quality_score'] = quality_score
+            item['tweet_data']['quality_label'] = quality_label
+        return batch
+
+    @profile_stage('pipeline.persist')
+    async def _persist(self, batch: List) -> List:
+        # Each author is upserted once per batch rather than once per tweet
+        users = {item['user_data']['id']: item['user_data'] for item in batch}
+        user_ids = dict(zip(users, await asyncio.gather(*(self.fetcher.persist_user(user_data) for user_data in users.values()))))
+
+        pending = []
+        for item in batch:
+            user_id = user_ids.get(item['user_data']['id'])
+            if not user_id:
+                self.metrics['persist'].errors += 1
+                continue
+            item['tweet_data']['user_id'] = user_id
+            pending.append(item)
+
+        tweet_ids = await self.fetcher.persist_tweets([(item['tweet'], item['tweet_data']) for item in pending])
+        persisted = [item for item, tweet_id in zip(pending, tweet_ids) if tweet_id]
+        self.metrics['persist'].errors += len(pending) - len(persisted)
+        for item in persisted:
+            progress = self.fetched.get(item['key'])
+            if progress is not None:
+                progress['persisted'] += 1
+        return persisted
+
+    @profile_stage('pipeline.embed')
+    async def _embed(self, batch: List) -> List:
+        await self.fetcher.embed_tweets([item['tweet'] for item in batch],
+                                        [item['tweet_data'].get('inserted', False) for item in batch])
+        return batch
+
+# This file is not meant to be run directly
@@ -0,0 +1,256 @@
+# src/data_ingestion/poll_scheduler.py
+
+import math
+import time
+import heapq
+import random
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.agent_config import load_agent_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'target_new_tweets': 5,       # new tweets a poll should find on average
+    'min_interval_minutes': 5,
+    'max_interval_hours': 12,
+    'jitter': 0.1,                # +/- fraction applied to every interval
+    'lookback_days': 14,          # stored history used for the starting rate
+    'prior_tweets_per_day': 1.0,  # pseudo-observation so new or silent accounts aren't written off
+    'prior_days': 1.0,
+    'smoothing': 0.3,             # weight of the latest poll in the rate estimate
+    'page_headroom': 2.0,         # page size as a multiple of the predicted count
+    'min_page_size': 5,           # the timeline endpoint's minimum max_results
+    'max_page_size': 100,
+    'max_accounts_per_round': 100,
+}
+
+
+class AccountPollState:
+    """Posting rate estimate, schedule and prediction accounting for one account."""
+
+    __slots__ = ('account_id', 'rate', 'last_polled', 'next_poll', 'predicted', 'page_size',
+                 'polls', 'predicted_total', 'actual_total', 'abs_error', 'saturated', 'empty', 'failed')
+
+    def __init__(self, account_id: str, rate: float):
+        self.account_id = account_id
+        self.rate = rate  # tweets per second
+        self.last_polled = None
+        self.next_poll = 0.0
+        self.predicted = None
+        self.page_size = None
+        self.polls = 0
+        self.predicted_total = 0.0
+        self.actual_total = 0
+        self.abs_error = 0.0
+        self.saturated = 0
+        self.empty = 0
+        self.failed = 0
+
+    def as_dict(self) -> Dict:
+        return {
+            'tweets_per_day': round(self.rate * 86400, 3),
+            'next_poll': datetime.fromtimestamp(self.next_poll, timezone.utc).isoformat(),
+            'page_size': self.page_size,
+            'polls': self.polls,
+            'predicted': round(self.predicted_total, 2),
+            'actual': self.actual_total,
+            'mean_abs_error': round(self.abs_error / self.polls, 3) if self.polls else None,
+            'saturated': self.saturated,
+            'empty': self.empty,
+            'failed': self.failed,
+        }
+
+
+class AdaptivePollScheduler:
+    """
+    Polls each tracked account's timeline at a cadence matched to its own
+    posting rate, instead of all of them on the same interval.
+
+    The starting rate comes from the account's stored tweets over
+    lookback_days, plus a small prior so accounts with no history still get
+    polled. After each incremental poll (since_id set), the number of new
+    tweets over the time since the previous poll is folded in with
+    exponential smoothing. The pipeline pages back to since_id, so a burst
+    that overflows the page is still fetched and counted in full; such polls
+    are reported as saturated and never lower the estimate. A poll whose
+    fetch failed (rate limited, server error, open circuit) is not an
+    observation: the account is rescheduled with its estimate unchanged, and
+    the next prediction spans back to the last poll that succeeded, since
+    that is what the next successful poll will count. The next poll is placed where
+    target_new_tweets are expected, clamped to [min_interval, max_interval]
+    and jittered so accounts don't synchronise. The page size is the
+    prediction times page_headroom.
+
+    Accounts wait in a heap ordered by next poll time. Each round runs the
+    due ones through one ingestion pipeline run. Predicted and actual new
+    tweets per poll are kept per account and overall (see report()).
+    """
+
+    def __init__(self, fetcher, db_manager, config: Optional[Dict] = None, clock=time.time,
+                 rng: Optional[random.Random] = None):
+        settings = dict(DEFAULT_CONFIG, **load_agent_config('poll_scheduler'))
+        settings.update(config or {})
+        self.fetcher = fetcher
+        self.db_manager = db_manager
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.target = float(settings['target_new_tweets'])
+        self.min_interval = settings['min_interval_minutes'] * 60.0
+        self.max_interval = settings['max_interval_hours'] * 3600.0
+        self.jitter = float(settings['jitter'])
+        self.lookback = settings['lookback_days'] * 86400.0
+        self.prior_tweets = settings['prior_tweets_per_day'] * settings['prior_days']
+        self.prior_seconds = settings['prior_days'] * 86400.0
+        self.smoothing = float(settings['smoothing'])
+        self.page_headroom = float(settings['page_headroom'])
+        self.min_page_size = int(settings['min_page_size'])
+        self.max_page_size = int(settings['max_page_size'])
+        self.max_accounts_per_round = int(settings['max_accounts_per_round'])
+        self.accounts: Dict[str, AccountPollState] = {}
+        self.heap = []
+        self._seq = 0
+        self._stopping = asyncio.Event()
+        # Incremental fetching is what makes a page's size the number of new tweets
+        if self.fetcher.since_ids is None:
+            self.fetcher.since_ids = {}
+
+    def stop(self):
+        self._stopping.set()
+        self.fetcher.stop()
+
+    async def set_accounts(self, account_ids: Iterable[str]):
+        """Track exactly these accounts; new ones get a rate from their stored tweets and a staggered first poll."""
+        account_ids = [str(account_id) for account_id in account_ids]
+        for account_id in set(self.accounts) - set(account_ids):
+            del self.accounts[account_id]
+            self.fetcher.page_sizes.pop(account_id, None)
+        new_ids = [account_id for account_id in account_ids if account_id not in self.accounts]
+        if not new_ids:
+            return
+        now = self.clock()
+        counts = {}
+        try:
+            since = datetime.fromtimestamp(now - self.lookback, timezone.utc).replace(tzinfo=None)
+            for row in await self.db_manager.get_posting_stats(new_ids, since):
+                counts[str(row['user_id'])] = row['tweet_count']
+        except Exception as e:
+            logger.error(f"Error reading posting history, starting from the prior: {str(e)}")
+        for account_id in new_ids:
+            rate = (counts.get(account_id, 0) + self.prior_tweets) / (self.lookback + self.prior_seconds)
+            state = AccountPollState(account_id, rate)
+            self.accounts[account_id] = state
+            self._plan(state, now, first=True)
+        logger.info(f"Polling {len(self.accounts)} accounts ({len(new_ids)} new)")
+
+    def _plan(self, state: AccountPollState, now: float, first: bool = False):
+        interval = min(max(self.target / state.rate, self.min_interval), self.max_interval)
+        if first:
+            # The first poll only sets since_id; spread them over the shortest interval
+            delay = self.rng.uniform(0, self.min_interval)
+        else:
+            delay = interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+        state.next_poll = now + delay
+        # Measured from the last successful poll, which is where since_id stands
+        expected = state.rate * (state.next_poll - (state.last_polled if state.last_polled is not None else now))
+        state.predicted = None if first else expected
+        page_size = int(math.ceil(expected * self.page_headroom)) if not first else self.max_page_size
+        state.page_size = min(max(page_size, self.min_page_size), self.max_page_size)
+        self.fetcher.page_sizes[state.account_id] = state.page_size
+        self._seq += 1
+        heapq.heappush(self.heap, (state.next_poll, self._seq, state.account_id))
+
+    def _observe(self, state: AccountPollState, found: int, now: float):
+        if state.predicted is not None and state.last_polled is not None:
+            state.polls += 1
+            state.predicted_total += state.predicted
+            state.actual_total += found
+            state.abs_error += abs(found - state.predicted)
+            state.empty += int(found == 0)
+            observed = found / max(now - state.last_polled, 1.0)
+            if found >= state.page_size:
+                # The page overflowed into follow-up pages
+                state.saturated += 1
+                observed = max(observed, state.rate)
+            state.rate = self.smoothing * observed + (1 - self.smoothing) * state.rate
+            # A run of empty polls must not decay the rate to zero; the interval is clamped to max_interval anyway
+            state.rate = max(state.rate, self.target / self.max_interval / 2)
+        state.last_polled = now
+
+    def due(self, now: float) -> List[AccountPollState]:
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.max_accounts_per_round:
+            next_poll, _, account_id = heapq.heappop(self.heap)
+            state = self.accounts.get(account_id)
+            if state is not None and state.next_poll == next_poll:
+                due.append(state)
+        return due
+
+    async def run_once(self) -> int:
+        """Poll every account that is due, as one pipeline run; returns how many were polled."""
+        due = self.due(self.clock())
+        if not due:
+            return 0
+        pipeline = self.fetcher.create_pipeline()
+        try:
+            await pipeline.run(account_ids=[state.account_id for state in due])
+        except Exception as e:
+            logger.error(f"Error polling {len(due)} accounts: {str(e)}")
+        now = self.clock()
+        for state in due:
+            if state.account_id not in self.accounts:
+                continue
+            found = pipeline.fetch_counts.get(state.account_id)
+            if found is None:
+                # The fetch failed; its new tweets are counted by the next poll that succeeds
+                state.failed += 1
+                self._plan(state, now, first=state.last_polled is None)
+                continue
+            self._observe(state, found, now)
+            self._plan(state, now)
+        logger.info(f"Polled {len(due)} accounts: {self.report()}")
+        return len(due)
+
+    def seconds_until_next(self) -> Optional[float]:
+        while self.heap:
+            next_poll, _, account_id = self.heap[0]
+            state = self.accounts.get(account_id)
+            if state is not None and state.next_poll == next_poll:
+                return max(next_poll - self.clock(), 0.0)
+            heapq.heappop(self.heap)
+        return None
+
+    def report(self) -> Dict:
+        """Predicted vs actual new tweets over all incremental polls so far."""
+        states = self.accounts.values()
+        polls = sum(state.polls for state in states)
+        predicted = sum(state.predicted_total for state in states)
+        actual = sum(state.actual_total for state in states)
+        return {
+            'accounts': len(self.accounts),
+            'polls': polls,
+            'predicted': round(predicted, 2),
+            'actual': actual,
+            'actual_per_predicted': round(actual / predicted, 3) if predicted else None,
+            'mean_abs_error': round(sum(state.abs_error for state in states) / polls, 3) if polls else None,
+            'saturated_polls': sum(state.saturated for state in states),
+            'empty_polls': sum(state.empty for state in states),
+            'failed_polls': sum(state.failed for state in states),
+        }
+
+    async def run(self, account_ids: Iterable[str], idle_seconds: float = 60.0):
+        """Poll until stop(), sleeping until the next account is due."""
+        await self.set_accounts(account_ids)
+        while not self._stopping.is_set():
+            await self.run_once()
+            wait = self.seconds_until_next()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), idle_seconds if wait is None else max(wait, 0.1))
+            except asyncio.TimeoutError:
+                pass
+        logger.info(f"Poll scheduler stopped: {self.report()}")
+
+# This file is not meant to be run directly
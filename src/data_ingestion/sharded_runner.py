@@ -0,0 +1,331 @@
+# src/data_ingestion/sharded_runner.py
+
+import os
+import sys
+import json
+import time
+import queue
+import asyncio
+import hashlib
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from configs.project_config import PROJECT_ACCOUNTS, ACCOUNT_IDS, KEYWORDS
+from src.utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'checkpoints')
+
+
+def shard_for(key: str, num_shards: int) -> int:
+    """
+    Rendezvous (highest random weight) hashing: stable across processes and runs,
+    and changing num_shards only moves the keys whose winning shard changed.
+    """
+    best_shard, best_weight = 0, b''
+    for shard_id in range(num_shards):
+        weight = hashlib.blake2b(f"{shard_id}:{key}".encode(), digest_size=8).digest()
+        if weight > best_weight:
+            best_shard, best_weight = shard_id, weight
+    return best_shard
+
+
+def assign_shards(accounts: Iterable[str], queries: Iterable[str], num_shards: int) -> Dict[int, Dict[str, List[str]]]:
+    assignment = {shard_id: {'accounts': [], 'queries': []} for shard_id in range(num_shards)}
+    for account_id in sorted(set(map(str, accounts))):
+        assignment[shard_for('account:' + account_id, num_shards)]['accounts'].append(account_id)
+    for query in sorted(set(queries)):
+        assignment[shard_for('query:' + query, num_shards)]['queries'].append(query)
+    return assignment
+
+
+def changed_shards(current: Dict[int, Dict], new: Dict[int, Dict]) -> List[int]:
+    """Shards whose work differs between two assignments and so need a restart."""
+    return sorted(shard_id for shard_id in set(current) | set(new) if current.get(shard_id) != new.get(shard_id))
+
+
+def default_accounts() -> List[str]:
+    return [ACCOUNT_IDS[account] for account in PROJECT_ACCOUNTS if account in ACCOUNT_IDS]
+
+
+class ShardCheckpoint:
+    """Per-shard JSON checkpoint of since_ids, written atomically after every completed round."""
+
+    def __init__(self, checkpoint_dir: str, shard_id: int):
+        self.path = os.path.join(checkpoint_dir, f"shard_{shard_id}.json")
+
+    def load(self) -> Dict:
+        try:
+            with open(self.path, 'r') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            state = {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable checkpoint {self.path}, starting fresh: {str(e)}")
+            state = {}
+        state.setdefault('since_ids', {})
+        state.setdefault('rounds', 0)
+        return state
+
+    def save(self, state: Dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+async def _watch_stop(stop_event, fetcher):
+    while not stop_event.is_set():
+        await asyncio.sleep(0.5)
+    fetcher.stop()
+
+
+async def _shard_main(shard_id: int, work: Dict, checkpoint_dir: str, stats_queue, stop_event, poll_interval: float):
+    from src.database.sql_db_manager import SQLDBManager
+    from src.data_ingestion.twitter_fetcher import TwitterFetcher
+
+    db_manager = SQLDBManager()  # Each shard owns its own connection pool
+    await db_manager.initialize()
+    checkpoint = ShardCheckpoint(checkpoint_dir, shard_id)
+    state = checkpoint.load()
+    # Only checkpoint since_ids for work this shard still owns
+    owned = set(work['accounts']) | set(work['queries'])
+    state['since_ids'] = {key: value for key, value in state['since_ids'].items() if key in owned}
+
+    try:
+        fetcher = TwitterFetcher(db_manager)
+        fetcher.since_ids = state['since_ids']
+        loop = asyncio.get_running_loop()
+        while not stop_event.is_set():
+            pipeline = fetcher.create_pipeline()
+            watcher = asyncio.create_task(_watch_stop(stop_event, fetcher))
+            start_time = time.monotonic()
+            try:
+                metrics = await pipeline.run(account_ids=work['accounts'], queries=work['queries'])
+            finally:
+                watcher.cancel()
+
+            # The pipeline only moves a since_id once every tweet fetched back to it is persisted
+            state['rounds'] += 1
+            state['updated_at'] = datetime.now().isoformat()
+            checkpoint.save(state)
+            stats_queue.put({
+                'shard': shard_id,
+                'tweets': metrics['persist']['items_out'],
+                'seconds': time.monotonic() - start_time,
+                'errors': sum(stage['errors'] for stage in metrics.values()),
+            })
+            await loop.run_in_executor(None, stop_event.wait, poll_interval)
+    finally:
+        await db_manager.close()
+
+
+def run_shard(shard_id: int, work: Dict, checkpoint_dir: str, stats_queue, stop_event, poll_interval: float):
+    """Process entry point for one shard."""
+    configure_logging()
+    asyncio.run(_shard_main(shard_id, work, checkpoint_dir, stats_queue, stop_event, poll_interval))
+
+
+class ShardSupervisor:
+    """
+    Splits the tracked accounts and queries over num_shards worker processes,
+    restarts shards that exit, aggregates their throughput, and reassigns work
+    when the account set changes. account_source is re-read every
+    rebalance_interval, or sooner after request_rebalance(); if it fails, the
+    current assignment is kept until the next attempt.
+    """
+
+    def __init__(self, num_shards: int, account_source: Optional[Callable[[], Iterable[str]]] = None,
+                 queries: Iterable[str] = (), checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                 poll_interval: float = 300, max_restarts: int = 5, restart_backoff: float = 5,
+                 rebalance_interval: float = 60, worker_target=run_shard):
+        self.num_shards = num_shards
+        self.account_source = account_source or default_accounts
+        self.queries = list(queries)
+        self.checkpoint_dir = checkpoint_dir
+        self.poll_interval = poll_interval
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.rebalance_interval = rebalance_interval
+        self.worker_target = worker_target
+        self.context = multiprocessing.get_context('spawn')
+        self.stats_queue = self.context.Queue()
+        self.assignment = {}
+        self.shards = {}
+        self.throughput = {shard_id: {'tweets': 0, 'seconds': 0.0, 'rounds': 0, 'errors': 0} for shard_id in range(num_shards)}
+        self.started_at = None
+        self._rebalance_requested = True
+        self._last_rebalance = 0.0
+        self._stopping = False
+
+    def request_rebalance(self):
+        self._rebalance_requested = True
+
+    def stop(self):
+        self._stopping = True
+
+    def rebalance(self):
+        self._rebalance_requested = False
+        self._last_rebalance = time.monotonic()
+        try:
+            accounts = self.account_source()
+        except Exception as e:
+            logger.error(f"Error reading tracked accounts, keeping the current shard assignment: {str(e)}")
+            return []
+        new_assignment = assign_shards(accounts, self.queries, self.num_shards)
+        changed = changed_shards(self.assignment, new_assignment)
+        self.assignment = new_assignment
+        for shard_id in changed:
+            logger.info(f"Shard {shard_id} reassigned: {len(new_assignment[shard_id]['accounts'])} accounts, "
+                        f"{len(new_assignment[shard_id]['queries'])} queries")
+            self._stop_shard(shard_id)
+            self.shards.pop(shard_id, None)
+            self._start_shard(shard_id)
+        return changed
+
+    def _start_shard(self, shard_id: int, restarts: int = 0):
+        work = self.assignment[shard_id]
+        if not work['accounts'] and not work['queries']:
+            return
+        stop_event = self.context.Event()
+        process = self.context.Process(
+            target=self.worker_target,
+            args=(shard_id, work, self.checkpoint_dir, self.stats_queue, stop_event, self.poll_interval),
+            name=f"fetch-shard-{shard_id}",
+            daemon=True,
+        )
+        process.start()
+        self.shards[shard_id] = {'process': process, 'stop_event': stop_event, 'restarts': restarts, 'restart_at': None}
+
+    def _stop_shard(self, shard_id: int, timeout: float = 30):
+        shard = self.shards.get(shard_id)
+        if not shard or not shard['process'].is_alive():
+            return
+        shard['stop_event'].set()
+        shard['process'].join(timeout)
+        if shard['process'].is_alive():
+            logger.warning(f"Shard {shard_id} did not drain in {timeout}s; terminating")
+            shard['process'].terminate()
+            shard['process'].join()
+
+    def _check_shards(self):
+        now = time.monotonic()
+        for shard_id, shard in list(self.shards.items()):
+            process = shard['process']
+            if process.is_alive():
+                continue
+            if shard['restart_at'] is None:
+                if shard['restarts'] >= self.max_restarts:
+                    logger.error(f"Shard {shard_id} exited with code {process.exitcode}; restart limit reached")
+                    del self.shards[shard_id]
+                    continue
+                delay = self.restart_backoff * (2 ** shard['restarts'])
+                logger.warning(f"Shard {shard_id} exited with code {process.exitcode}; restarting in {delay:.0f}s")
+                shard['restart_at'] = now + delay
+            elif now >= shard['restart_at']:
+                self._start_shard(shard_id, restarts=shard['restarts'] + 1)
+
+    def _drain_stats(self):
+        while True:
+            try:
+                report = self.stats_queue.get_nowait()
+            except queue.Empty:
+                return
+            totals = self.throughput[report['shard']]
+            totals['tweets'] += report['tweets']
+            totals['seconds'] += report['seconds']
+            totals['errors'] += report['errors']
+            totals['rounds'] += 1
+
+    def aggregate_throughput(self) -> Dict:
+        self._drain_stats()
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        shards = {
+            shard_id: dict(totals, tweets_per_sec=round(totals['tweets'] / totals['seconds'], 2) if totals['seconds'] else 0.0)
+            for shard_id, totals in self.throughput.items()
+        }
+        total_tweets = sum(totals['tweets'] for totals in self.throughput.values())
+        return {
+            'shards': shards,
+            'total_tweets': total_tweets,
+            'tweets_per_sec': round(total_tweets / elapsed, 2) if elapsed else 0.0,
+            'alive_shards': sum(1 for shard in self.shards.values() if shard['process'].is_alive()),
+        }
+
+    def run(self, duration: Optional[float] = None, report_interval: float = 60):
+        self.started_at = time.monotonic()
+        last_report = self.started_at
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                if self._rebalance_requested or now - self._last_rebalance >= self.rebalance_interval:
+                    self.rebalance()
+                self._check_shards()
+                self._drain_stats()
+                if now - last_report >= report_interval:
+                    logger.info(f"Shard throughput: {self.aggregate_throughput()}")
+                    last_report = now
+                if duration is not None and now - self.started_at >= duration:
+                    break
+                time.sleep(1)
+        finally:
+            self.shutdown()
+        return self.aggregate_throughput()
+
+    def shutdown(self):
+        for shard in self.shards.values():
+            shard['stop_event'].set()
+        for shard_id in list(self.shards):
+            self._stop_shard(shard_id)
+        self._drain_stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run TwitterFetcher sharded across worker processes")
+    parser.add_argument('--shards', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--query', action='append', default=None, help="search query to track (repeatable)")
+    parser.add_argument('--poll-interval', type=float, default=300)
+    parser.add_argument('--checkpoint-dir', default=DEFAULT_CHECKPOINT_DIR)
+    parser.add_argument('--duration', type=float, default=None)
+    parser.add_argument('--rebalance-interval', type=float, default=60, help="seconds between re-reads of the project accounts")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    from src.database.sql_db_manager import SQLDBManager
+    from src.account_management.project_account_manager import ProjectAccountManager
+
+    queries = args.query if args.query is not None else [" OR ".join(KEYWORDS)]
+    # The supervisor loop is synchronous; account reads run on a loop of its own
+    loop = asyncio.new_event_loop()
+    db_manager = SQLDBManager()
+    loop.run_until_complete(db_manager.initialize())
+    account_manager = ProjectAccountManager(db_manager)
+
+    def account_source():
+        # Accounts are added and archived from other processes, so the table is re-read on every rebalance
+        return loop.run_until_complete(account_manager.get_project_account_ids())
+
+    supervisor = ShardSupervisor(args.shards, account_source=account_source, queries=queries,
+                                 checkpoint_dir=args.checkpoint_dir, poll_interval=args.poll_interval,
+                                 rebalance_interval=args.rebalance_interval)
+    try:
+        summary = supervisor.run(duration=args.duration)
+    except KeyboardInterrupt:
+        summary = supervisor.aggregate_throughput()
+    finally:
+        loop.run_until_complete(db_manager.close())
+        loop.close()
+    logger.info(f"Final shard throughput: {summary}")
+
+
+if __name__ == "__main__":
+    main()
+
+# Run command: python -m src.data_ingestion.sharded_runner --shards 4
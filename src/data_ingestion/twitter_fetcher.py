@@ -2,12 +2,13 @@
 
 import os
 import sys
+import time
 import asyncio
+import weakref
 import aiohttp
 from dotenv import load_dotenv
 import logging
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
@@ -15,26 +16,56 @@ from configs.project_config import PROJECT_ACCOUNTS, KEYWORDS, HASHTAGS
 from src.database.sql_db_manager import SQLDBManager
 from src.vector_db.vector_db_manager import VectorDBManager
 from src.utils.validation import validate_tweet_data, validate_user_data
-from src.utils.relevance_check import is_tweet_relevant
-from src.utils.engagement_score import calculate_engagement_score
+from src.preprocessing.data_cleaner import clean_tweet
+from src.utils.relevance_check import is_text_relevant, is_tweet_relevant
+from src.utils.engagement_score import calculate_engagement_score, metrics_total
+from src.utils.term_counter import TermCounter
+from src.utils.fast_decode import loads, parse_twitter_timestamp
+from src.utils.resilience import FAIL, RETRY, CircuitOpenError, RetryableError, create_guard
+from src.utils.profiling import profile_stage
+from src.utils.logging_config import LOG_SAMPLE_EVERY
+from src.agents.sentiment_analyzer import SentimentAnalyzer
+from src.agents.topic_modeler import TopicModeler
+from src.agents.engagement_classifier import EngagementClassifier
+from src.agents.user_profiler import UserProfiler
+from src.data_ingestion.pipeline import IngestionPipeline, StageConfig
 
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def classify_http_error(exc):
+    """Network errors, timeouts, 429s and 5xx are retried."""
+    return RETRY if isinstance(exc, (RetryableError, aiohttp.ClientError, asyncio.TimeoutError)) else FAIL
+
 class TwitterFetcher:
-    def __init__(self, db_manager: SQLDBManager):
+    def __init__(self, db_manager: SQLDBManager, vector_db_manager: Optional[VectorDBManager] = None, base_url: Optional[str] = None):
         self.bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
-        self.base_url = "https://api.twitter.com/2"
+        # Point TWITTER_API_BASE_URL at benchmarks/mock_twitter_api.py for local soak tests
+        self.base_url = (base_url or os.getenv("TWITTER_API_BASE_URL", "https://api.twitter.com/2")).rstrip('/')
         self.headers = {
             "Authorization": f"Bearer {self.bearer_token}",
             "User-Agent": "v2RecentSearchPython"
         }
         self.sql_db_manager = db_manager
-        self.vector_db_manager = VectorDBManager()
+        self.vector_db_manager = vector_db_manager or VectorDBManager()
+        self.term_counter = TermCounter(db_manager)
+        self.sentiment_analyzer = SentimentAnalyzer()
+        self.topic_modeler = TopicModeler(db_manager)
+        self.engagement_classifier = EngagementClassifier()
+        self.user_profiler = UserProfiler(db_manager)
+        self.embeddings_enabled = os.getenv("EMBED_TWEETS", "false").lower() == "true"
+        # Every pipeline created and not yet garbage collected; jobs running concurrently each have their own
+        self.pipelines = weakref.WeakSet()
+        # Newest seen tweet id per account/query; None disables incremental fetching
+        self.since_ids = None
+        # max_results per account id for timeline fetches; accounts not listed get the default
+        self.page_sizes = {}
+        # Retries, retry budget and circuit breaker for API calls (one fetcher per process in production)
+        self.api_guard = create_guard('twitter_api', classify_http_error)
 
-    async def fetch_user_tweets(self, user_id: str, max_results: int = 100) -> Dict:
+    async def fetch_user_tweets(self, user_id: str, max_results: int = 100, since_id: Optional[str] = None,
+                                pagination_token: Optional[str] = None) -> Dict:
         url = f"{self.base_url}/users/{user_id}/tweets"
         params = {
             "max_results": max_results,
@@ -42,10 +73,15 @@ class TwitterFetcher:
             "expansions": "author_id",
             "user.fields": "username,public_metrics,created_at"
         }
-        
+        if since_id:
+            params["since_id"] = since_id
+        if pagination_token:
+            params["pagination_token"] = pagination_token
+
         return await self._make_request(url, params)
 
-    async def fetch_tweets_by_keywords(self, query: str, max_results: int = 100) -> Dict:
+    async def fetch_tweets_by_keywords(self, query: str, max_results: int = 100, since_id: Optional[str] = None,
+                                       pagination_token: Optional[str] = None) -> Dict:
         url = f"{self.base_url}/tweets/search/recent"
         params = {
             "query": query,
@@ -54,31 +90,61 @@ class TwitterFetcher:
             "expansions": "author_id",
             "user.fields": "username,public_metrics,created_at"
         }
-        
+        if since_id:
+            params["since_id"] = since_id
+        if pagination_token:
+            # The search endpoint names its page cursor next_token
+            params["next_token"] = pagination_token
+
+        return await self._make_request(url, params)
+
+    async def fetch_tweets_by_ids(self, tweet_ids: List[str]) -> Dict:
+        """Batch tweet lookup: current public_metrics for up to 100 ids per call."""
+        url = f"{self.base_url}/tweets"
+        params = {
+            "ids": ",".join(str(tweet_id) for tweet_id in tweet_ids[:100]),
+            "tweet.fields": "created_at,public_metrics"
+        }
         return await self._make_request(url, params)
 
     async def _make_request(self, url: str, params: Dict) -> Dict:
+        """GET through the twitter_api guard; None on a client error, after retries run out or while the circuit is open."""
+        try:
+            return await self.api_guard.call(self._get_json, url, params)
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping request to {url}: {e}")
+        except RetryableError as e:
+            logger.error(f"Giving up on {url}: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Network error occurred: {e}")
+        return None
+
+    async def _get_json(self, url: str, params: Dict) -> Optional[Dict]:
         async with aiohttp.ClientSession() as session:
-            for attempt in range(3):  # Retry up to 3 times
-                try:
-                    async with session.get(url, headers=self.headers, params=params) as response:
-                        if response.status == 200:
-                            return await response.json()
-                        elif response.status == 429:
-                            wait_time = int(response.headers.get('Retry-After', 60))
-                            logger.warning(f"Rate limit hit. Waiting for {wait_time} seconds.")
-                            await asyncio.sleep(wait_time)
-                        else:
-                            logger.error(f"HTTP Error: {response.status}")
-                            return None
-                except aiohttp.ClientError as e:
-                    logger.error(f"Network error occurred: {e}")
-                    await asyncio.sleep(1)
-            return None
+            async with session.get(url, headers=self.headers, params=params) as response:
+                if response.status == 200:
+                    return loads(await response.read())
+                if response.status == 429:
+                    wait_time = self._rate_limit_wait(response.headers)
+                    logger.warning(f"Rate limit hit. Waiting for {wait_time} seconds.")
+                    raise RetryableError("HTTP 429", retry_after=wait_time, trips_circuit=False)
+                if response.status >= 500:
+                    raise RetryableError(f"HTTP Error: {response.status}")
+                logger.error(f"HTTP Error: {response.status}")
+                return None
+
+    @staticmethod
+    def _rate_limit_wait(headers) -> int:
+        """Seconds to wait after a 429: Retry-After if sent, else until x-rate-limit-reset, else 60."""
+        if 'Retry-After' in headers:
+            return int(headers['Retry-After'])
+        if 'x-rate-limit-reset' in headers:
+            return max(1, int(headers['x-rate-limit-reset']) - int(time.time()))
+        return 60
 
     def is_relevant_tweet(self, tweet: Dict) -> bool:
-        text = tweet['text'].lower()
-        if any(keyword.lower() in text for keyword in KEYWORDS + HASHTAGS):
+        text = clean_tweet(tweet).text
+        if any(keyword.casefold() in text for keyword in KEYWORDS + HASHTAGS):
             return True
         if tweet.get('entities', {}).get('mentions'):
             mentioned_users = [mention['username'].lower() for mention in tweet['entities']['mentions']]
@@ -90,80 +156,188 @@ class TwitterFetcher:
                     return True
         return False
 
+    def parse_user(self, user: Dict) -> Dict:
+        return {
+            'id': user['id'],  # Keep as string
+            'username': user['username'],
+            'created_at': parse_twitter_timestamp(user['created_at']),
+            'follower_count': user.get('public_metrics', {}).get('followers_count', 0)
+        }
+
+    def parse_tweet(self, tweet: Dict) -> Dict:
+        return {
+            'id': tweet['id'],  # Keep as string
+            'content': tweet['text'],
+            'created_at': parse_twitter_timestamp(tweet['created_at'])
+        }
+
+    def iter_page_tweets(self, page: Dict):
+        """
+        Yield (tweet, user_data) pairs from a timeline or search response page.
+        Each author in includes.users is parsed once per page and shared by all of their tweets.
+        """
+        users = {}
+        for user in page.get('includes', {}).get('users', []):
+            try:
+                users[user['id']] = self.parse_user(user)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Error parsing user {user.get('id')}: {str(e)}")
+        for tweet in page.get('data', []):
+            user_data = users.get(tweet.get('author_id'))
+            if user_data:
+                yield tweet, user_data
+
+    async def persist_user(self, user_data: Dict) -> Optional[str]:
+        user_id = await self.sql_db_manager.insert_or_update_user(user_data)
+        if not user_id:
+            logger.error(f"Failed to insert or update user: {user_data['username']}")
+        return user_id
+
+    async def persist_tweet(self, tweet: Dict, tweet_data: Dict) -> Optional[str]:
+        tweet_id, inserted = await self.sql_db_manager.insert_tweet(tweet_data, with_status=True)
+
+        if not tweet_id:
+            logger.error(f"Failed to insert tweet: {tweet_data['id']}")
+            return None
+
+        await self._observe_stored(tweet, tweet_data, inserted)
+        return tweet_id
+
+    async def persist_tweets(self, items: List[Tuple[Dict, Dict]]) -> List[Optional[str]]:
+        """
+        Persist (tweet, tweet_data) pairs, returning each stored id or None.
+        Tweets the membership filter has definitely never stored go in one batch
+        upsert; possible re-fetches take the per-row upsert. Both report whether
+        each row was really inserted, and only those rows are counted, since the
+        filter doesn't know about rows other processes wrote.
+        """
+        new_flags = self.sql_db_manager.new_tweet_flags([tweet_data['id'] for _, tweet_data in items])
+        new_indexes = [index for index, new in enumerate(new_flags) if new]
+        stored = await self.sql_db_manager.insert_new_tweets([items[index][1] for index in new_indexes]) if new_indexes else {}
+        tweet_ids = [None] * len(items)
+        observed = set()
+        for index in new_indexes:
+            tweet, tweet_data = items[index]
+            tweet_id = str(int(tweet_data['id']))
+            if tweet_id in stored:
+                # A tweet in the batch twice (timeline and search) is counted once
+                await self._observe_stored(tweet, tweet_data, stored[tweet_id] and tweet_id not in observed)
+                observed.add(tweet_id)
+                tweet_ids[index] = tweet_id
+        # Possible hits, and anything the batch didn't store, go row by row
+        retry = [index for index, tweet_id in enumerate(tweet_ids) if tweet_id is None]
+        for index, tweet_id in zip(retry, await asyncio.gather(*(self.persist_tweet(*items[index]) for index in retry))):
+            tweet_ids[index] = tweet_id
+        return tweet_ids
+
+    async def _observe_stored(self, tweet: Dict, tweet_data: Dict, inserted: bool):
+        # Only first-seen tweets are counted, so re-fetches don't inflate the stats
+        tweet_data['inserted'] = inserted
+        if inserted:
+            self.user_profiler.observe(tweet_data)
+            await self.user_profiler.flush_if_due()
+        if inserted and tweet_data['is_relevant']:
+            self.term_counter.observe(tweet, tweet_data['created_at'])
+            await self.term_counter.flush_if_due()
+
+    async def embed_tweets(self, tweets: List[Dict], first_seen: Optional[List[bool]] = None):
+        """Embed a batch of API tweets; first_seen flags which ones count toward their author's profile."""
+        if self.vector_db_manager and self.embeddings_enabled:
+            await self._store_embeddings(tweets, first_seen)
+        elif self.vector_db_manager:
+            # Log VectorDBManager presence without performing batch operations
+            logger.debug("VectorDBManager is available for batch processing of %d tweets", len(tweets))
+        else:
+            logger.debug("VectorDBManager is not available for batch processing of %d tweets", len(tweets))
+
+    @profile_stage('process_tweet')
     async def process_tweet(self, tweet, user):
         try:
-            # Prepare user data
-            user_data = {
-                'id': user['id'],  # Keep as string
-                'username': user['username'],
-                'created_at': datetime.strptime(user['created_at'], "%Y-%m-%dT%H:%M:%S.%fZ"),
-                'follower_count': user.get('public_metrics', {}).get('followers_count', 0)
-            }
+            user_data = self.parse_user(user)
 
             # Insert or update user
-            user_id = await self.sql_db_manager.insert_or_update_user(user_data)
-
+            user_id = await self.persist_user(user_data)
             if not user_id:
-                logger.error(f"Failed to insert or update user: {user_data['username']}")
                 return
 
             # Process tweet
-            tweet_data = {
-                'id': tweet['id'],  # Keep as string
-                'user_id': user_id,  # This is now a string
-                'content': tweet['text'],
-                'created_at': datetime.strptime(tweet['created_at'], "%Y-%m-%dT%H:%M:%S.%fZ"),
-                'is_relevant': is_tweet_relevant(tweet['text']),
-                'engagement_score': calculate_engagement_score(tweet.get('public_metrics', {}))
-            }
+            tweet_data = self.parse_tweet(tweet)
+            tweet_data['user_id'] = user_id  # This is now a string
+            tweet_data['is_relevant'] = is_text_relevant(clean_tweet(tweet).text)
+            tweet_data['engagement_score'] = calculate_engagement_score(tweet.get('public_metrics', {}))
+            tweet_data['metrics_total'] = metrics_total(tweet.get('public_metrics', {}))
+            tweet_data['sentiment_score'] = self.sentiment_analyzer.score(clean_tweet(tweet).content)
+            quality_scores, quality_labels = self.engagement_classifier.classify([(tweet, user_data, tweet_data['created_at'])])
+            tweet_data['quality_score'] = float(quality_scores[0])
+            tweet_data['quality_label'] = quality_labels[0]
 
             # Insert tweet
-            tweet_id = await self.sql_db_manager.insert_tweet(tweet_data)
-
+            tweet_id = await self.persist_tweet(tweet, tweet_data)
             if not tweet_id:
-                logger.error(f"Failed to insert tweet: {tweet_data['id']}")
                 return
 
             # Log VectorDBManager presence without performing operations
             if self.vector_db_manager:
-                logger.info(f"VectorDBManager is available for tweet {tweet_id}")
+                logger.debug("VectorDBManager is available for tweet %s", tweet_id)
             else:
-                logger.info(f"VectorDBManager is not available for tweet {tweet_id}")
+                logger.debug("VectorDBManager is not available for tweet %s", tweet_id)
 
-            logger.info(f"Processed tweet {tweet_id} for user {user_data['username']}")
+            logger.info("Processed tweet %s for user %s", tweet_id, user_data['username'],
+                        extra={'tweet_id': tweet_id, 'username': user_data['username'], 'sample_every': LOG_SAMPLE_EVERY})
 
         except Exception as e:
             logger.error(f"Error processing tweet: {str(e)}")
 
-    async def process_accounts(self, account_ids):
-        all_tweets = []
-        for account_id in account_ids:
-            tweets = await self.fetch_user_tweets(str(account_id))  # Ensure account_id is a string for API call
-            if tweets and 'data' in tweets and 'includes' in tweets:
-                user = tweets['includes']['users'][0]
-                for tweet in tweets['data']:
-                    await self.process_tweet(tweet, user)
-                    all_tweets.append(tweet)
-            else:
-                logger.warning(f"No tweets found for account ID: {account_id}")
+    async def rescore_tweets(self, tweet_ids: List[str]):
+        """Recompute relevance for stored tweets; the stored engagement score is kept."""
+        rows = await self.sql_db_manager.get_tweets_by_ids(tweet_ids)
+        updates = [(row['id'], is_tweet_relevant(row['content']), row['engagement_score']) for row in rows]
+        if updates:
+            await self.sql_db_manager.update_tweet_scores(updates)
+        logger.info(f"Rescored {len(updates)} of {len(tweet_ids)} tweets")
 
-        # Log VectorDBManager presence without performing batch operations
-        if self.vector_db_manager:
-            logger.info(f"VectorDBManager is available for batch processing of {len(all_tweets)} tweets")
-        else:
-            logger.info(f"VectorDBManager is not available for batch processing of {len(all_tweets)} tweets")
+    async def embed_stored_tweets(self, tweet_ids: List[str]):
+        rows = await self.sql_db_manager.get_tweets_by_ids(tweet_ids)
+        tweets = [{'id': str(row['id']), 'text': row['content']} for row in rows]
+        if tweets and self.vector_db_manager:
+            await self._store_embeddings(tweets)
+
+    @profile_stage('embedding')
+    async def _store_embeddings(self, tweets: List[Dict], first_seen: Optional[List[bool]] = None):
+        """Embed and store a batch, then feed the embeddings to the topic modeler and user profiles."""
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(None, self.vector_db_manager.batch_store_tweet_embeddings, tweets)
+        if embeddings is None or not len(embeddings):
+            return
+        try:
+            await self.topic_modeler.observe([tweet['id'] for tweet in tweets], embeddings)
+        except Exception as e:
+            logger.error(f"Error assigning topics: {str(e)}")
+        if first_seen is not None:
+            rows = [index for index, (tweet, new) in enumerate(zip(tweets, first_seen)) if new and tweet.get('author_id')]
+            if rows:
+                self.user_profiler.observe_embeddings([tweets[index]['author_id'] for index in rows], embeddings[rows])
+
+    def create_pipeline(self, stage_configs: Optional[Dict[str, StageConfig]] = None) -> IngestionPipeline:
+        pipeline = IngestionPipeline(self, stage_configs)
+        self.pipelines.add(pipeline)
+        return pipeline
+
+    def stop(self):
+        """Let in-progress pipeline runs drain and return without starting new fetches."""
+        for pipeline in list(self.pipelines):
+            pipeline.stop()
+
+    @profile_stage('process_accounts')
+    async def process_accounts(self, account_ids):
+        pipeline = self.create_pipeline()
+        return await pipeline.run(account_ids=[str(account_id) for account_id in account_ids])  # Ensure account_id is a string for API call
 
     async def process_keywords(self, keywords: List[str]):
         query = " OR ".join(keywords)
-        tweets_data = await self.fetch_tweets_by_keywords(query)
-        
-        if tweets_data and 'data' in tweets_data:
-            users = {user['id']: user for user in tweets_data['includes']['users']}
-            for tweet in tweets_data['data']:
-                user = users.get(tweet['author_id'])
-                if user:
-                    await self.process_tweet(tweet, user)
-        
+        pipeline = self.create_pipeline()
+        metrics = await pipeline.run(queries=[query])
         logger.info(f"Processed tweets for keywords: {keywords}")
+        return metrics
 
-# This class is not meant to be run directly
\ No newline at end of file
+# This class is not meant to be run directly
@@ -0,0 +1,228 @@
+# src/database/bulk_loader.py
+
+import time
+import logging
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+from src.utils.validation import validate_tweet_data, validate_user_data
+from src.database.sql_db_manager import tweet_content_hash
+
+logger = logging.getLogger(__name__)
+
+USER_STAGING_COLUMNS = ('seq', 'twitter_id', 'twitter_username', 'registration_date', 'created_at', 'follower_count')
+TWEET_STAGING_COLUMNS = ('seq', 'id', 'user_id', 'content', 'created_at', 'is_relevant', 'engagement_score',
+                         'sentiment_score', 'quality_score', 'quality_label', 'content_hash', 'metrics_total')
+
+# Temporary tables are never WAL-logged (the same as UNLOGGED) and are private to the
+# session, so concurrent backfills can't see each other's staging rows
+CREATE_USER_STAGING = """
+    CREATE TEMP TABLE staging_user_accounts (
+        seq BIGINT NOT NULL,
+        twitter_id BIGINT NOT NULL,
+        twitter_username VARCHAR(255) NOT NULL,
+        registration_date TIMESTAMP,
+        created_at TIMESTAMP,
+        follower_count INTEGER
+    ) ON COMMIT DROP
+"""
+
+CREATE_TWEET_STAGING = """
+    CREATE TEMP TABLE staging_tweets (
+        seq BIGINT NOT NULL,
+        id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        is_relevant BOOLEAN NOT NULL,
+        engagement_score DOUBLE PRECISION NOT NULL,
+        sentiment_score REAL,
+        quality_score REAL,
+        quality_label VARCHAR(16),
+        content_hash BYTEA,
+        metrics_total BIGINT
+    ) ON COMMIT DROP
+"""
+
+# DISTINCT ON keeps the last staged copy of a key: ON CONFLICT can't touch the same row twice in one statement
+MERGE_USERS = """
+    WITH latest AS (
+        SELECT DISTINCT ON (twitter_id) *
+        FROM staging_user_accounts
+        ORDER BY twitter_id, seq DESC
+    ), merged AS (
+        INSERT INTO user_accounts (twitter_id, twitter_username, registration_date, created_at, follower_count, is_archived)
+        SELECT twitter_id, twitter_username, registration_date, created_at, follower_count, FALSE
+        FROM latest
+        ON CONFLICT (twitter_id) DO UPDATE
+        SET twitter_username = EXCLUDED.twitter_username,
+            created_at = EXCLUDED.created_at,
+            follower_count = EXCLUDED.follower_count,
+            is_archived = EXCLUDED.is_archived,
+            updated_at = NOW()
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted) AS inserted, COUNT(*) FILTER (WHERE NOT inserted) AS updated,
+           (SELECT COUNT(*) FROM latest) AS staged
+    FROM merged
+"""
+
+# Tweets whose author isn't in user_accounts are left out and counted as rejected; tweets whose
+# content_hash matches the stored one are eligible but not rewritten
+MERGE_TWEETS = """
+    WITH latest AS (
+        SELECT DISTINCT ON (id) *
+        FROM staging_tweets
+        ORDER BY id, seq DESC
+    ), eligible AS (
+        SELECT * FROM latest
+        WHERE EXISTS (SELECT 1 FROM user_accounts WHERE user_accounts.twitter_id = latest.user_id)
+    ), merged AS (
+        INSERT INTO tweets (id, user_id, content, created_at, is_relevant, engagement_score, sentiment_score,
+                            quality_score, quality_label, content_hash, metrics_total, metrics_refreshed_at)
+        SELECT id, user_id, content, created_at, is_relevant, engagement_score, sentiment_score, quality_score,
+               quality_label, content_hash, metrics_total, NOW()
+        FROM eligible
+        ON CONFLICT (id) DO UPDATE
+        SET content = EXCLUDED.content,
+            is_relevant = EXCLUDED.is_relevant,
+            engagement_score = EXCLUDED.engagement_score,
+            sentiment_score = COALESCE(EXCLUDED.sentiment_score, tweets.sentiment_score),
+            quality_score = COALESCE(EXCLUDED.quality_score, tweets.quality_score),
+            quality_label = COALESCE(EXCLUDED.quality_label, tweets.quality_label),
+            content_hash = EXCLUDED.content_hash,
+            metrics_total = COALESCE(EXCLUDED.metrics_total, tweets.metrics_total),
+            metrics_refreshed_at = CASE WHEN EXCLUDED.metrics_total IS NULL THEN tweets.metrics_refreshed_at ELSE NOW() END,
+            updated_at = NOW()
+        WHERE tweets.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted) AS inserted, COUNT(*) FILTER (WHERE NOT inserted) AS updated,
+           (SELECT COUNT(*) FROM latest) AS staged, (SELECT COUNT(*) FROM eligible) AS eligible
+    FROM merged
+"""
+
+
+def user_record(seq: int, user_data: Dict) -> Tuple:
+    return (seq, int(user_data['id']), user_data['username'], user_data.get('registration_date', user_data['created_at']),
+            user_data['created_at'], user_data['follower_count'])
+
+
+def tweet_record(seq: int, tweet_data: Dict) -> Tuple:
+    return (seq, int(tweet_data['id']), int(tweet_data['user_id']), tweet_data['content'], tweet_data['created_at'],
+            tweet_data['is_relevant'], float(tweet_data['engagement_score']), tweet_data.get('sentiment_score'),
+            tweet_data.get('quality_score'), tweet_data.get('quality_label'), tweet_content_hash(tweet_data),
+            tweet_data.get('metrics_total'))
+
+
+class LoadReport:
+    """
+    Row counts for one bulk load. Failed rows were in chunks whose transaction was rolled
+    back; unchanged tweets matched their stored content_hash and weren't rewritten.
+    """
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'rejected': self.rejected,
+            'duplicates': self.duplicates,
+            'failed': self.failed,
+            'seconds': round(self.seconds, 3),
+        }
+
+
+class BulkLoader:
+    """
+    Set-based backfill of user_accounts and tweets, for history too large for
+    the per-row upserts of SQLDBManager.
+
+    Records are validated with the same rules as insert_tweet and
+    insert_or_update_user, and invalid ones are counted as rejected. The
+    input iterables are consumed chunk_size records at a time. Each chunk is
+    one transaction with three steps:
+    - binary COPY into a temporary staging table;
+    - one INSERT ... ON CONFLICT merge, with the same update rules as the
+      per-row upserts;
+    - drop the staging table at commit.
+    Memory stays flat, and a failed chunk leaves earlier chunks committed.
+
+    Only the tables are written. Term counts, user profiles and embeddings
+    are not maintained by this path.
+    """
+
+    def __init__(self, db_manager, chunk_size: int = 100000):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+
+    async def load_users(self, users: Iterable[Dict]) -> LoadReport:
+        return await self._load(users, validate_user_data, user_record, CREATE_USER_STAGING, 'staging_user_accounts',
+                                USER_STAGING_COLUMNS, MERGE_USERS)
+
+    async def load_tweets(self, tweets: Iterable[Dict]) -> LoadReport:
+        """Load tweets as built by TwitterFetcher (user_id set). Authors must already be in user_accounts."""
+        return await self._load(tweets, validate_tweet_data, tweet_record, CREATE_TWEET_STAGING, 'staging_tweets',
+                                TWEET_STAGING_COLUMNS, MERGE_TWEETS)
+
+    async def load(self, users: Iterable[Dict], tweets: Iterable[Dict]) -> Dict[str, Dict]:
+        """Load authors first so their tweets pass the user_accounts check."""
+        user_report = await self.load_users(users)
+        tweet_report = await self.load_tweets(tweets)
+        return {'user_accounts': user_report.as_dict(), 'tweets': tweet_report.as_dict()}
+
+    async def _load(self, records: Iterable[Dict], validate, to_row, create_staging: str, staging: str,
+                    columns: Tuple[str, ...], merge: str) -> LoadReport:
+        report = LoadReport()
+        start = time.perf_counter()
+        iterator = iter(records)
+        seq = 0
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                break
+            rows = []
+            for record in chunk:
+                if validate(record):
+                    rows.append(to_row(seq, record))
+                    seq += 1
+                else:
+                    report.rejected += 1
+            if rows:
+                await self._load_chunk(rows, create_staging, staging, columns, merge, report)
+        report.seconds = time.perf_counter() - start
+        logger.info(f"Bulk loaded {staging.replace('staging_', '')}: {report.as_dict()}")
+        return report
+
+    async def _load_chunk(self, rows: List[Tuple], create_staging: str, staging: str, columns: Tuple[str, ...],
+                          merge: str, report: LoadReport):
+        try:
+            async with self.db_manager.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(create_staging)
+                    await conn.copy_records_to_table(staging, records=rows, columns=columns)
+                    result = await conn.fetchrow(merge)
+        except Exception as e:
+            report.failed += len(rows)
+            logger.error(f"Error bulk loading {len(rows)} rows into {staging}: {str(e)}")
+            return
+        merged = result['inserted'] + result['updated']
+        staged = result['staged']
+        # The user merge has no author check or hash, so everything staged is eligible there
+        eligible = result.get('eligible', merged)
+        report.inserted += result['inserted']
+        report.updated += result['updated']
+        report.unchanged += eligible - merged
+        report.duplicates += len(rows) - staged
+        report.rejected += staged - eligible
+
+# This file is not meant to be run directly
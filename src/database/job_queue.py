@@ -0,0 +1,281 @@
+# src/database/job_queue.py
+
+import json
+import random
+import socket
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_FETCH_TIMELINE = 'fetch_timeline'
+JOB_KEYWORD_SEARCH = 'keyword_search'
+JOB_RESCORE = 'rescore'
+JOB_EMBED = 'embed'
+
+JOB_TYPES = (JOB_FETCH_TIMELINE, JOB_KEYWORD_SEARCH, JOB_RESCORE, JOB_EMBED)
+
+
+def retry_delay(attempts: int, base: float = 30, cap: float = 3600) -> float:
+    """Exponential backoff with full jitter for the given attempt count (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempts - 1))))
+
+
+class JobQueue:
+    """
+    Job queue stored in the job_queue table. Workers claim jobs with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of fetcher nodes can share
+    it without a broker. Claimed jobs hold a lease; a job whose lease expires
+    becomes claimable again (visibility timeout). A dedup_key allows only one
+    pending or running job per key.
+    """
+
+    def __init__(self, db_manager, retry_base: float = 30, retry_cap: float = 3600):
+        self.db_manager = db_manager
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+
+    async def enqueue(self, job_type: str, payload: Optional[Dict] = None, priority: int = 0,
+                      dedup_key: Optional[str] = None, delay_seconds: float = 0, max_attempts: int = 5) -> Optional[int]:
+        """Add a job. Returns its id, or None if a live job with the same dedup_key exists."""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        query = """
+            INSERT INTO job_queue (job_type, payload, priority, dedup_key, run_at, max_attempts)
+            VALUES ($1, $2::jsonb, $3, $4, NOW() + make_interval(secs => $5), $6)
+            ON CONFLICT (dedup_key) WHERE status IN ('pending', 'running') DO NOTHING
+            RETURNING id
+        """
+        result = await self.db_manager.execute_query(query, job_type, json.dumps(payload or {}), priority,
+                                                     dedup_key, float(delay_seconds), max_attempts)
+        return result[0]['id'] if result else None
+
+    async def claim(self, worker_id: str, job_types: Iterable[str] = JOB_TYPES, limit: int = 1,
+                    lease_seconds: float = 300) -> List[Dict]:
+        """
+        Claim up to limit runnable jobs, highest priority first. Pending jobs whose
+        run_at has passed and running jobs whose lease expired are both eligible.
+        """
+        query = """
+            WITH next_jobs AS (
+                SELECT id
+                FROM job_queue
+                WHERE job_type = ANY($1::varchar[])
+                  AND attempts < max_attempts
+                  AND ((status = 'pending' AND run_at <= NOW())
+                       OR (status = 'running' AND lease_expires_at < NOW()))
+                ORDER BY priority DESC, run_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE job_queue j
+            SET status = 'running',
+                locked_by = $3,
+                lease_expires_at = NOW() + make_interval(secs => $4),
+                attempts = j.attempts + 1,
+                updated_at = NOW()
+            FROM next_jobs
+            WHERE j.id = next_jobs.id
+            RETURNING j.id, j.job_type, j.payload, j.priority, j.attempts, j.max_attempts, j.dedup_key
+        """
+        rows = await self.db_manager.execute_query(query, list(job_types), limit, worker_id, float(lease_seconds))
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            if isinstance(job['payload'], str):
+                job['payload'] = json.loads(job['payload'])
+            jobs.append(job)
+        return jobs
+
+    async def extend_lease(self, job_id: int, worker_id: str, lease_seconds: float = 300) -> bool:
+        query = """
+            UPDATE job_queue
+            SET lease_expires_at = NOW() + make_interval(secs => $3), updated_at = NOW()
+            WHERE id = $1 AND locked_by = $2 AND status = 'running'
+            RETURNING id
+        """
+        return bool(await self.db_manager.execute_query(query, job_id, worker_id, float(lease_seconds)))
+
+    async def complete(self, job_id: int, worker_id: str) -> bool:
+        query = """
+            UPDATE job_queue
+            SET status = 'done', lease_expires_at = NULL, updated_at = NOW()
+            WHERE id = $1 AND locked_by = $2 AND status = 'running'
+            RETURNING id
+        """
+        return bool(await self.db_manager.execute_query(query, job_id, worker_id))
+
+    async def fail(self, job_id: int, worker_id: str, error: str, attempts: int, max_attempts: int) -> bool:
+        """Schedule a retry with backoff, or mark the job dead once max_attempts is used up."""
+        if attempts >= max_attempts:
+            query = """
+                UPDATE job_queue
+                SET status = 'dead', last_error = $3, lease_expires_at = NULL, updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2
+                RETURNING id
+            """
+            args = (job_id, worker_id, error)
+        else:
+            query = """
+                UPDATE job_queue
+                SET status = 'pending', last_error = $3, locked_by = NULL, lease_expires_at = NULL,
+                    run_at = NOW() + make_interval(secs => $4), updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2
+                RETURNING id
+            """
+            args = (job_id, worker_id, error, retry_delay(attempts, self.retry_base, self.retry_cap))
+        return bool(await self.db_manager.execute_query(query, *args))
+
+    async def reap_expired(self) -> int:
+        """Mark running jobs whose lease expired on their last allowed attempt as dead."""
+        query = """
+            UPDATE job_queue
+            SET status = 'dead', last_error = COALESCE(last_error, 'lease expired'), updated_at = NOW()
+            WHERE status = 'running' AND lease_expires_at < NOW() AND attempts >= max_attempts
+            RETURNING id
+        """
+        return len(await self.db_manager.execute_query(query))
+
+    async def purge_finished(self, older_than_hours: float = 24) -> int:
+        query = """
+            DELETE FROM job_queue
+            WHERE status IN ('done', 'dead') AND updated_at < NOW() - make_interval(secs => $1)
+            RETURNING id
+        """
+        return len(await self.db_manager.execute_query(query, float(older_than_hours) * 3600))
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        query = "SELECT job_type, status, COUNT(*) AS count FROM job_queue GROUP BY job_type, status"
+        stats = {}
+        for row in await self.db_manager.execute_query(query):
+            stats.setdefault(row['job_type'], {})[row['status']] = row['count']
+        return stats
+
+
+class JobWorker:
+    """
+    Claims jobs from a JobQueue and runs them with the handler for their type,
+    keeping up to `concurrency` jobs in flight and heartbeating their leases.
+    Every maintenance_interval seconds it also marks jobs whose lease expired
+    on their last attempt as dead, which frees their dedup_key, and purges
+    finished jobs older than retention_hours.
+    """
+
+    def __init__(self, job_queue: JobQueue, handlers: Dict[str, Callable[[Dict], Awaitable]],
+                 worker_id: Optional[str] = None, concurrency: int = 4, lease_seconds: float = 300,
+                 poll_interval: float = 5, maintenance_interval: float = 60, retention_hours: float = 24):
+        self.job_queue = job_queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.maintenance_interval = maintenance_interval
+        self.retention_hours = retention_hours
+        self.counters = {'claimed': 0, 'completed': 0, 'failed': 0, 'reaped': 0, 'purged': 0}
+        self._in_flight = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def maintain(self):
+        """Reap expired last attempts and purge old finished jobs; errors are logged, not raised."""
+        try:
+            reaped = await self.job_queue.reap_expired()
+            purged = await self.job_queue.purge_finished(self.retention_hours)
+        except Exception as e:
+            logger.error(f"Error maintaining the job queue: {str(e)}")
+            return
+        self.counters['reaped'] += reaped
+        self.counters['purged'] += purged
+        if reaped or purged:
+            logger.info(f"Job queue maintenance: {reaped} expired jobs marked dead, {purged} finished jobs purged")
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_maintenance = loop.time()
+        while not self._stopping.is_set():
+            if loop.time() >= next_maintenance:
+                await self.maintain()
+                next_maintenance = loop.time() + self.maintenance_interval
+            capacity = self.concurrency - len(self._in_flight)
+            jobs = []
+            if capacity > 0:
+                try:
+                    jobs = await self.job_queue.claim(self.worker_id, self.handlers.keys(), capacity, self.lease_seconds)
+                except Exception as e:
+                    logger.error(f"Error claiming jobs: {str(e)}")
+            for job in jobs:
+                self.counters['claimed'] += 1
+                task = asyncio.create_task(self._run_job(job))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            elif len(self._in_flight) >= self.concurrency:
+                await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+        # Let claimed jobs finish rather than leaving them to lease expiry
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.job_queue.extend_lease(job_id, self.worker_id, self.lease_seconds)
+
+    async def _run_job(self, job: Dict):
+        heartbeat = asyncio.create_task(self._heartbeat(job['id']))
+        try:
+            await self.handlers[job['job_type']](job['payload'])
+        except Exception as e:
+            heartbeat.cancel()
+            self.counters['failed'] += 1
+            logger.error(f"Job {job['id']} ({job['job_type']}) failed on attempt {job['attempts']}: {str(e)}")
+            await self.job_queue.fail(job['id'], self.worker_id, str(e), job['attempts'], job['max_attempts'])
+            return
+        heartbeat.cancel()
+        self.counters['completed'] += 1
+        await self.job_queue.complete(job['id'], self.worker_id)
+
+
+def check_pipeline_run(metrics: Dict, work: str):
+    """
+    Raise if a pipeline run failed. The pipeline logs and swallows failed
+    fetches and writes, so a job reads its outcome from the stage metrics.
+    A run with no pages and no errors is a poll that found nothing new.
+    """
+    if metrics['fetch']['errors']:
+        raise RuntimeError(f"Fetching {work} failed: {metrics['fetch']['errors']} failed requests")
+    if metrics['persist']['errors']:
+        raise RuntimeError(f"Storing tweets for {work} failed: {metrics['persist']['errors']} not persisted")
+
+
+def build_fetcher_handlers(fetcher) -> Dict[str, Callable[[Dict], Awaitable]]:
+    """Job handlers backed by a TwitterFetcher."""
+
+    async def fetch_timeline(payload):
+        check_pipeline_run(await fetcher.process_accounts([payload['account_id']]), f"account {payload['account_id']}")
+
+    async def keyword_search(payload):
+        check_pipeline_run(await fetcher.process_keywords(payload['keywords']), f"keywords {payload['keywords']}")
+
+    async def rescore(payload):
+        await fetcher.rescore_tweets(payload['tweet_ids'])
+
+    async def embed(payload):
+        await fetcher.embed_stored_tweets(payload['tweet_ids'])
+
+    return {
+        JOB_FETCH_TIMELINE: fetch_timeline,
+        JOB_KEYWORD_SEARCH: keyword_search,
+        JOB_RESCORE: rescore,
+        JOB_EMBED: embed,
+    }
+
+# This file is not meant to be run directly
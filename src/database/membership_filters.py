@@ -0,0 +1,137 @@
+# src/database/membership_filters.py
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Iterable, List
+
+from src.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILTER_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'filters')
+
+
+class MembershipFilters:
+    """
+    In-memory "definitely new" checks for tweet ids and wallet addresses,
+    made before any database round-trip.
+
+    Both are Bloom filters, so a miss is certain and a hit only means "maybe
+    seen, ask Postgres". The tweet filter is saved to directory on close,
+    together with the database time it was last seeded at. On the next
+    start only tweets updated since then (minus lag_seconds for
+    transactions still in flight) are read back in. user_wallets is small
+    and an address can change in place, so the wallet filter is always
+    seeded in full.
+
+    A filter only knows what this process has seen or loaded. Rows written
+    by other processes after seeding come back as "definitely new". Callers
+    must still let the upsert or the unique constraint decide, and must not
+    rely on the filter alone.
+    """
+
+    def __init__(self, db_manager, directory: str = DEFAULT_FILTER_DIR, error_rate: float = 0.001,
+                 chunk_size: int = 100000, lag_seconds: int = 60):
+        self.db_manager = db_manager
+        self.directory = directory
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.lag_seconds = lag_seconds
+        self.tweets = None
+        self.wallets = None
+        self.seeded_at = None
+
+    @property
+    def tweets_path(self) -> str:
+        return os.path.join(self.directory, 'tweets.npz')
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.directory, 'filters.json')
+
+    async def seed(self):
+        start = time.perf_counter()
+        tweet_count = await self._count("SELECT COUNT(*) FROM tweets")
+        wallet_count = await self._count("SELECT COUNT(*) FROM user_wallets")
+        self.wallets = BloomFilter(max(wallet_count * 2, 10000), self.error_rate)
+        await self._scan("SELECT wallet_address FROM user_wallets", (), self.wallets)
+
+        self.tweets, since = self._load_tweets(tweet_count)
+        rows = await self.db_manager.execute_query("SELECT LOCALTIMESTAMP - $1::float8 * INTERVAL '1 second' AS seeded_at",
+                                                   float(self.lag_seconds))
+        seeded_at = rows[0]['seeded_at']
+        if since is None:
+            added = await self._scan("SELECT id FROM tweets", (), self.tweets)
+        else:
+            added = await self._scan("SELECT id FROM tweets WHERE updated_at >= $1", (since,), self.tweets)
+        self.seeded_at = seeded_at
+        logger.info(f"Seeded membership filters with {added} tweets ({'full' if since is None else 'since ' + since.isoformat()}) "
+                    f"and {wallet_count} wallets in {time.perf_counter() - start:.2f}s")
+
+    def _load_tweets(self, tweet_count: int):
+        """The saved tweet filter and the time to top it up from, or a new empty one and None."""
+        try:
+            with open(self.state_path, 'r') as file:
+                state = json.load(file)
+            tweets = BloomFilter.load(self.tweets_path)
+            if tweet_count > tweets.capacity:
+                logger.info(f"Saved tweet filter is too small for {tweet_count} tweets; rebuilding")
+            else:
+                return tweets, datetime.fromisoformat(state['seeded_at'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading tweet filter, rebuilding it: {str(e)}")
+        return BloomFilter(max(tweet_count * 2, 100000), self.error_rate), None
+
+    async def _count(self, query: str) -> int:
+        rows = await self.db_manager.execute_query(query)
+        return int(rows[0]['count'])
+
+    async def _scan(self, query: str, args: tuple, bloom: BloomFilter) -> int:
+        added = 0
+        async with self.db_manager.pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(query, *args)
+                while True:
+                    rows = await cursor.fetch(self.chunk_size)
+                    if not rows:
+                        break
+                    bloom.add_many(row[0] for row in rows)
+                    added += len(rows)
+        return added
+
+    def save(self):
+        if self.tweets is None or self.seeded_at is None:
+            return
+        try:
+            self.tweets.save(self.tweets_path)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump({'seeded_at': self.seeded_at.isoformat(), 'tweets': self.tweets.count}, file, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.error(f"Error saving membership filters: {str(e)}")
+
+    def new_tweets(self, tweet_ids: Iterable) -> List[bool]:
+        """For each id, True if it was definitely never stored."""
+        tweet_ids = list(tweet_ids)
+        if self.tweets is None:
+            return [False] * len(tweet_ids)
+        return (~self.tweets.contains_many(tweet_ids)).tolist()
+
+    def add_tweets(self, tweet_ids: Iterable):
+        if self.tweets is not None:
+            self.tweets.add_many(tweet_ids)
+
+    def wallet_is_new(self, wallet_address: str) -> bool:
+        return self.wallets is not None and wallet_address not in self.wallets
+
+    def add_wallet(self, wallet_address: str):
+        if self.wallets is not None:
+            self.wallets.add(wallet_address)
+
+# This file is not meant to be run directly
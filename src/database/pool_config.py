@@ -0,0 +1,183 @@
+# src/database/pool_config.py
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Mapping, Optional
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# Environment variable -> (setting, type, default)
+POOL_ENV = {
+    'DB_POOL_MIN_SIZE': ('min_size', int, 1),
+    'DB_POOL_MAX_SIZE': ('max_size', int, 10),
+    'DB_POOL_MAX_QUERIES': ('max_queries', int, 50000),
+    'DB_POOL_MAX_INACTIVE_SECONDS': ('max_inactive_connection_lifetime', float, 300.0),
+    'DB_POOL_WARMUP': ('warmup', bool, True),
+    'DB_COMMAND_TIMEOUT': ('command_timeout', float, None),
+    'DB_STATEMENT_TIMEOUT_MS': ('statement_timeout_ms', int, 30000),
+    'DB_IDLE_IN_TRANSACTION_TIMEOUT_MS': ('idle_in_transaction_timeout_ms', int, 60000),
+    'DB_APPLICATION_NAME': ('application_name', str, 'twitter-ingestion'),
+}
+
+
+def pool_settings_from_env(env: Optional[Mapping[str, str]] = None) -> Dict:
+    """Pool settings from DB_POOL_* / DB_* variables; unset or empty ones keep their defaults."""
+    env = os.environ if env is None else env
+    settings = {}
+    for name, (key, cast, default) in POOL_ENV.items():
+        raw = env.get(name, '').strip()
+        if not raw:
+            settings[key] = default
+        elif cast is bool:
+            settings[key] = raw.lower() in ('1', 'true', 'yes')
+        else:
+            try:
+                settings[key] = cast(raw)
+            except ValueError:
+                logger.warning(f"Ignoring {name}={raw!r}, using {default}")
+                settings[key] = default
+    settings['max_size'] = max(settings['max_size'], 1)
+    if settings['min_size'] > settings['max_size']:
+        logger.warning(f"DB_POOL_MIN_SIZE {settings['min_size']} exceeds DB_POOL_MAX_SIZE, using {settings['max_size']}")
+        settings['min_size'] = settings['max_size']
+    return settings
+
+
+def server_settings(settings: Dict) -> Dict[str, str]:
+    """Session settings sent with the startup packet, so they cost no extra round-trip per connection."""
+    values = {'application_name': settings['application_name']}
+    # 0 disables a timeout, the same as in postgresql.conf
+    if settings['statement_timeout_ms'] is not None:
+        values['statement_timeout'] = str(settings['statement_timeout_ms'])
+    if settings['idle_in_transaction_timeout_ms'] is not None:
+        values['idle_in_transaction_session_timeout'] = str(settings['idle_in_transaction_timeout_ms'])
+    return values
+
+
+class InstrumentedPool:
+    """
+    Wraps an asyncpg pool to measure how it is used.
+
+    acquire() counts the callers waiting for a connection and times each
+    wait. stats() combines these with the pool's own size and idle counts.
+    Everything else (close, release, get_size, ...) is passed through to
+    the pool.
+    """
+
+    def __init__(self, pool=None, init=None, latency_window: int = 1024):
+        self._pool = pool
+        self._init = init
+        self.waiters = 0
+        self.acquires = 0
+        self.acquire_timeouts = 0
+        self.connections_opened = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None):
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            raise
+        finally:
+            self.waiters -= 1
+        self.latencies.append(time.perf_counter() - start)
+        self.acquires += 1
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn)
+
+    async def init_connection(self, conn):
+        """asyncpg init hook, run once for every new physical connection (type codecs go in init)."""
+        self.connections_opened += 1
+        if self._init is not None:
+            await self._init(conn)
+
+    async def warmup(self, size: Optional[int] = None):
+        """Check out size (default min_size) connections at once so each is open and answering before traffic."""
+        size = self._pool.get_min_size() if size is None else size
+        start = time.perf_counter()
+        settled = 0
+        all_settled = asyncio.Event()
+
+        def settle():
+            nonlocal settled
+            settled += 1
+            if settled == size:
+                all_settled.set()
+
+        async def ping():
+            answered = False
+            try:
+                async with self.acquire() as conn:
+                    await conn.fetchval("SELECT 1")
+                    answered = True
+                    settle()
+                    # Hold on until every ping has its own connection, or they'd share one
+                    await all_settled.wait()
+            except Exception:
+                if not answered:
+                    settle()
+                raise
+
+        results = await asyncio.gather(*(ping() for _ in range(size)), return_exceptions=True)
+        failed = [result for result in results if isinstance(result, Exception)]
+        if failed:
+            logger.error(f"Pool warmup: {len(failed)} of {size} connections failed: {str(failed[0])}")
+        logger.info(f"Pool warmed up to {self._pool.get_size()} connections in {time.perf_counter() - start:.2f} seconds")
+
+    def stats(self) -> Dict:
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000, 3) if latencies else None
+
+        return {
+            'size': size,
+            'in_use': size - idle,
+            'idle': idle,
+            'min_size': self._pool.get_min_size(),
+            'max_size': self._pool.get_max_size(),
+            'waiters': self.waiters,
+            'acquires': self.acquires,
+            'acquire_timeouts': self.acquire_timeouts,
+            'connections_opened': self.connections_opened,
+            'acquire_ms_p50': percentile(0.5),
+            'acquire_ms_p95': percentile(0.95),
+            'acquire_ms_max': round(latencies[-1] * 1000, 3) if latencies else None,
+        }
+
+
+async def create_instrumented_pool(settings: Optional[Dict] = None, init=None, **connect_kwargs) -> InstrumentedPool:
+    settings = settings or pool_settings_from_env()
+    instrumented = InstrumentedPool(init=init)
+    instrumented._pool = await asyncpg.create_pool(
+        min_size=settings['min_size'],
+        max_size=settings['max_size'],
+        max_queries=settings['max_queries'],
+        max_inactive_connection_lifetime=settings['max_inactive_connection_lifetime'],
+        command_timeout=settings['command_timeout'],
+        server_settings=server_settings(settings),
+        init=instrumented.init_connection,
+        **connect_kwargs
+    )
+    if settings['warmup']:
+        await instrumented.warmup()
+    return instrumented
+
+# This file is not meant to be run directly
@@ -5,9 +5,9 @@ from psycopg2 import sql
 from dotenv import load_dotenv
 import os
 import logging
+from src.utils.logging_config import configure_logging
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def update_schema():
@@ -49,6 +49,118 @@ def update_schema():
                 last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 PRIMARY KEY (twitter_id)
             )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS term_counts (
+                term_type VARCHAR(20) NOT NULL,
+                term VARCHAR(255) NOT NULL,
+                bucket_start TIMESTAMP NOT NULL,
+                count BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (term_type, term, bucket_start)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_term_counts_bucket_start ON term_counts (bucket_start);",
+            """
+            CREATE OR REPLACE VIEW term_counts_24h AS
+            SELECT term_type, term, SUM(count) AS count
+            FROM term_counts
+            WHERE bucket_start >= (NOW() AT TIME ZONE 'UTC') - INTERVAL '24 hours'
+            GROUP BY term_type, term
+            """,
+            """
+            CREATE OR REPLACE VIEW term_counts_7d AS
+            SELECT term_type, term, SUM(count) AS count
+            FROM term_counts
+            WHERE bucket_start >= (NOW() AT TIME ZONE 'UTC') - INTERVAL '7 days'
+            GROUP BY term_type, term
+            """,
+            """
+            CREATE OR REPLACE VIEW term_counts_daily AS
+            SELECT term_type, term, date_trunc('day', bucket_start) AS day, SUM(count) AS count
+            FROM term_counts
+            GROUP BY term_type, term, date_trunc('day', bucket_start)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS job_queue (
+                id BIGSERIAL PRIMARY KEY,
+                job_type VARCHAR(50) NOT NULL,
+                payload JSONB NOT NULL DEFAULT '{}',
+                priority INTEGER NOT NULL DEFAULT 0,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                dedup_key VARCHAR(255),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 5,
+                run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                locked_by VARCHAR(255),
+                lease_expires_at TIMESTAMP,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_job_queue_dedup_key
+            ON job_queue (dedup_key) WHERE status IN ('pending', 'running')
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_job_queue_claim
+            ON job_queue (priority DESC, run_at) WHERE status IN ('pending', 'running')
+            """,
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS sentiment_score REAL;",
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS quality_score REAL;",
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS quality_label VARCHAR(16);",
+            # Bumped on every upsert that changes the row; the watermark for incremental Parquet exports
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;",
+            "ALTER TABLE user_accounts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;",
+            "CREATE INDEX IF NOT EXISTS idx_tweets_updated_at ON tweets (updated_at);",
+            "CREATE INDEX IF NOT EXISTS idx_user_accounts_updated_at ON user_accounts (updated_at);",
+            # Hash of the upserted fields; re-fetches of an unchanged tweet skip the write
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS content_hash BYTEA;",
+            # Interaction total from public_metrics and when it was last captured, for the metrics refresher
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS metrics_total BIGINT;",
+            "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS metrics_refreshed_at TIMESTAMP;",
+            """
+            CREATE TABLE IF NOT EXISTS topic_centroids (
+                topic_id INTEGER PRIMARY KEY,
+                centroid REAL[] NOT NULL,
+                member_count DOUBLE PRECISION NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tweet_topics (
+                tweet_id BIGINT PRIMARY KEY,
+                topic_id INTEGER NOT NULL,
+                distance REAL,
+                assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tweet_topics_topic_id ON tweet_topics (topic_id);",
+            """
+            CREATE TABLE IF NOT EXISTS user_profiles (
+                user_id BIGINT PRIMARY KEY,
+                tweet_count BIGINT NOT NULL DEFAULT 0,
+                relevant_count BIGINT NOT NULL DEFAULT 0,
+                score_count BIGINT[] NOT NULL,
+                score_sum DOUBLE PRECISION[] NOT NULL,
+                score_sumsq DOUBLE PRECISION[] NOT NULL,
+                hour_histogram INTEGER[] NOT NULL,
+                first_seen TIMESTAMP,
+                last_seen TIMESTAMP,
+                embedding_sum REAL[],
+                embedding_count BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            # Tracked project accounts; the sharded runner re-reads the active ones on every rebalance
+            """
+            CREATE TABLE IF NOT EXISTS project_accounts (
+                twitter_id BIGINT PRIMARY KEY,
+                twitter_username VARCHAR(255) UNIQUE NOT NULL,
+                is_archived BOOLEAN NOT NULL DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
             """
         ]
 
@@ -79,4 +191,5 @@ def update_schema():
             conn.close()
 
 if __name__ == "__main__":
+    configure_logging()
     update_schema()
\ No newline at end of file
@@ -6,31 +6,98 @@ from dotenv import load_dotenv
 import os
 import logging
 import time
-from functools import wraps
+import hashlib
 # from cachetools import TTLCache, cached
 from src.utils.validation import validate_tweet_data, validate_user_data
+from src.database.membership_filters import MembershipFilters, DEFAULT_FILTER_DIR
+from src.database.pool_config import create_instrumented_pool, pool_settings_from_env
+from src.utils.resilience import FAIL, RETRY, guarded, resilience_stats
+from src.utils.profiling import profile_stage
 from functools import lru_cache
 from datetime import datetime
 
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def retry_on_error(max_retries=3, delay=1):
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            for attempt in range(max_retries):
-                try:
-                    return await func(*args, **kwargs)
-                except asyncpg.exceptions.PostgresError as e:
-                    if attempt == max_retries - 1:
-                        raise
-                    logger.warning(f"Database operation failed. Retrying in {delay} seconds. Error: {e}")
-                    await asyncio.sleep(delay)
-        return wrapper
-    return decorator
+# Transient failures worth another attempt: lost or refused connections, serialization and
+# deadlock aborts. Constraint, syntax and data errors, and statement timeouts, would only fail again.
+RETRYABLE_PG_ERRORS = (
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.InterfaceError,
+    asyncpg.exceptions.TransactionRollbackError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    asyncpg.exceptions.CannotConnectNowError,
+    asyncio.TimeoutError,
+    OSError,
+)
+
+
+def classify_postgres_error(exc):
+    return RETRY if isinstance(exc, RETRYABLE_PG_ERRORS) else FAIL
+
+
+# Unchanged re-fetches match the stored content_hash, so the WHERE skips the update and no
+# new row version (WAL, bloat, vacuum work) is written; such upserts return no row
+TWEET_CONFLICT = """
+    ON CONFLICT (id) DO UPDATE
+    SET content = EXCLUDED.content,
+        is_relevant = EXCLUDED.is_relevant,
+        engagement_score = EXCLUDED.engagement_score,
+        sentiment_score = COALESCE(EXCLUDED.sentiment_score, tweets.sentiment_score),
+        quality_score = COALESCE(EXCLUDED.quality_score, tweets.quality_score),
+        quality_label = COALESCE(EXCLUDED.quality_label, tweets.quality_label),
+        content_hash = EXCLUDED.content_hash,
+        metrics_total = COALESCE(EXCLUDED.metrics_total, tweets.metrics_total),
+        metrics_refreshed_at = CASE WHEN EXCLUDED.metrics_total IS NULL THEN tweets.metrics_refreshed_at ELSE NOW() END,
+        updated_at = NOW()
+    WHERE tweets.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+"""
+
+UPSERT_TWEET = """
+    INSERT INTO tweets (id, user_id, content, created_at, is_relevant, engagement_score, sentiment_score,
+                        quality_score, quality_label, content_hash, metrics_total, metrics_refreshed_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, NOW())
+""" + TWEET_CONFLICT
+
+# One statement for a whole batch: each argument is a column array in tweet_args order
+UPSERT_TWEETS_BATCH = """
+    INSERT INTO tweets (id, user_id, content, created_at, is_relevant, engagement_score, sentiment_score,
+                        quality_score, quality_label, content_hash, metrics_total, metrics_refreshed_at)
+    SELECT id, user_id, content, created_at, is_relevant, engagement_score, sentiment_score,
+           quality_score, quality_label, content_hash, metrics_total, NOW()
+    FROM unnest($1::bigint[], $2::bigint[], $3::text[], $4::timestamp[], $5::boolean[], $6::double precision[],
+                $7::real[], $8::real[], $9::varchar[], $10::bytea[], $11::bigint[])
+        AS batch (id, user_id, content, created_at, is_relevant, engagement_score, sentiment_score,
+                  quality_score, quality_label, content_hash, metrics_total)
+""" + TWEET_CONFLICT + "RETURNING id, (xmax = 0) AS inserted"
+
+
+def tweet_content_hash(tweet_data):
+    """
+    16-byte digest of the fetched inputs: text, relevance and metrics. The
+    model scores (sentiment, quality) are left out because they are
+    recomputed on every fetch; they are written whenever the inputs change.
+    """
+    fields = (tweet_data['content'], bool(tweet_data['is_relevant']), float(tweet_data['engagement_score']),
+              tweet_data.get('metrics_total'))
+    return hashlib.blake2b(repr(fields).encode('utf-8'), digest_size=16).digest()
+
+
+def tweet_args(tweet_data):
+    return (
+        int(tweet_data['id']),  # Convert to int here
+        int(tweet_data['user_id']),  # Convert to int here
+        tweet_data['content'],
+        tweet_data['created_at'],
+        tweet_data['is_relevant'],
+        tweet_data['engagement_score'],
+        tweet_data.get('sentiment_score'),
+        tweet_data.get('quality_score'),
+        tweet_data.get('quality_label'),
+        tweet_content_hash(tweet_data),
+        tweet_data.get('metrics_total')
+    )
 
 
 def normalize_twitter_id(twitter_id):
@@ -40,22 +107,40 @@ def normalize_twitter_id(twitter_id):
 class SQLDBManager:
     def __init__(self):
         self.pool = None
+        # Bloom filters of stored tweet ids and wallets, set up by initialize()
+        self.membership = None
+        # Outcomes of tweet upserts; 'unchanged' ones matched the stored hash and wrote nothing
+        self.tweet_writes = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'batched': 0}
 #        self.cache = TTLCache(maxsize=100, ttl=300)  # Cache up to 1000 items for 5 minutes
 
 
 
     async def initialize(self):
-        self.pool = await asyncpg.create_pool(
+        # Sizing, timeouts, recycling and warmup come from DB_POOL_* / DB_* (see pool_config.POOL_ENV)
+        settings = pool_settings_from_env()
+        self.pool = await create_instrumented_pool(
+            settings,
             database=os.getenv("DB_NAME"),
             user=os.getenv("DB_USER"),
             password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST"),
-            min_size=1,
-            max_size=10
+            host=os.getenv("DB_HOST")
         )
+        logger.info(f"Connection pool ready: {self.pool_stats()}")
         await self.check_and_create_indexes()
+        if os.getenv("MEMBERSHIP_FILTERS", "true").lower() == "true":
+            await self.load_membership_filters(os.getenv("MEMBERSHIP_FILTER_DIR", DEFAULT_FILTER_DIR))
 
-    @retry_on_error()
+    async def load_membership_filters(self, directory=DEFAULT_FILTER_DIR):
+        membership = MembershipFilters(self, directory)
+        try:
+            await membership.seed()
+            self.membership = membership
+        except Exception as e:
+            # Without filters every check simply goes to Postgres
+            logger.error(f"Error seeding membership filters: {str(e)}")
+
+    @guarded('postgres', classify_postgres_error)
+    @profile_stage('db')
     async def execute_query(self, query, *args, fetch=True):
         async with self.pool.acquire() as conn:
             async with conn.transaction():
@@ -65,10 +150,19 @@ class SQLDBManager:
                 else:
                     result = await conn.execute(query, *args)
                 execution_time = time.time() - start_time
-                logger.info(f"Query executed in {execution_time:.2f} seconds")
+                logger.debug("Query executed in %.3f seconds", execution_time)
                 return result
 
-    @retry_on_error()
+    @guarded('postgres', classify_postgres_error)
+    @profile_stage('db')
+    async def execute_many(self, query, args):
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                start_time = time.time()
+                await conn.executemany(query, args)
+                execution_time = time.time() - start_time
+                logger.debug("Batch of %d executed in %.3f seconds", len(args), execution_time)
+
     async def insert_or_update_user(self, user_data):
         query = """
             INSERT INTO user_accounts (twitter_id, twitter_username, registration_date, created_at, follower_count, is_archived)
@@ -77,7 +171,8 @@ class SQLDBManager:
             SET twitter_username = EXCLUDED.twitter_username,
                 created_at = EXCLUDED.created_at,
                 follower_count = EXCLUDED.follower_count,
-                is_archived = EXCLUDED.is_archived
+                is_archived = EXCLUDED.is_archived,
+                updated_at = NOW()
             RETURNING twitter_id
         """
         result = await self.execute_query(query,
@@ -90,36 +185,79 @@ class SQLDBManager:
         )
         return str(result[0]['twitter_id']) if result else None  # Return as string
     
-    @retry_on_error()
-    async def insert_tweet(self, tweet_data):
+    async def insert_tweet(self, tweet_data, with_status=False):
+        """
+        Upsert a tweet and return its id as a string.
+        With with_status=True, return (id, inserted) where inserted is False
+        when the row already existed, whether it was updated or left alone
+        because nothing changed.
+        """
         if not validate_tweet_data(tweet_data):
             logger.error(f"Invalid tweet data: {tweet_data}")
-            return None
+            return (None, False) if with_status else None
 
-        query = """
-            INSERT INTO tweets (id, user_id, content, created_at, is_relevant, engagement_score)
-            VALUES ($1, $2, $3, $4, $5, $6)
-            ON CONFLICT (id) DO UPDATE
-            SET content = EXCLUDED.content,
-                is_relevant = EXCLUDED.is_relevant,
-                engagement_score = EXCLUDED.engagement_score
-            RETURNING id
-        """
+        query = UPSERT_TWEET + "RETURNING id, (xmax = 0) AS inserted"
         try:
-            result = await self.execute_query(query,
-                int(tweet_data['id']),  # Convert to int here
-                int(tweet_data['user_id']),  # Convert to int here
-                tweet_data['content'],
-                tweet_data['created_at'],
-                tweet_data['is_relevant'],
-                tweet_data['engagement_score']
-            )
-            return str(result[0]['id']) if result else None  # Return as string
+            result = await self.execute_query(query, *tweet_args(tweet_data))
+            inserted = bool(result and result[0]['inserted'])
+            if not result:
+                # The row exists and its hash matched, so the update was skipped
+                self.tweet_writes['unchanged'] += 1
+            else:
+                self.tweet_writes['inserted' if inserted else 'updated'] += 1
+            tweet_id = str(int(tweet_data['id']))  # Return as string
+            if self.membership:
+                self.membership.add_tweets([tweet_id])
+            if with_status:
+                return tweet_id, inserted
+            return tweet_id
         except Exception as e:
             logger.error(f"Error inserting tweet: {e}")
-            return None
+            return (None, False) if with_status else None
+
+    def tweet_write_stats(self):
+        """Tweet upsert outcomes so far (batched counts rows that went through insert_new_tweets), with the share skipped as unchanged."""
+        per_row = self.tweet_writes['inserted'] + self.tweet_writes['updated'] + self.tweet_writes['unchanged']
+        return dict(self.tweet_writes, unchanged_ratio=round(self.tweet_writes['unchanged'] / per_row, 4) if per_row else 0.0)
+
+    def new_tweet_flags(self, tweet_ids):
+        """For each id, True if the membership filter says it was definitely never stored."""
+        if not self.membership:
+            return [False] * len(tweet_ids)
+        return self.membership.new_tweets(tweet_ids)
+
+    async def insert_new_tweets(self, tweets):
+        """
+        Upsert tweets the membership filter reported as new in one statement.
+        Returns {id: inserted} for every tweet stored, or {} if the batch failed.
+        inserted is False for rows that already existed (written by another
+        process after the filter was seeded), whether they were updated or
+        left alone as unchanged. Invalid tweets are left out.
+        """
+        # A statement can't upsert the same row twice; the last copy of a tweet wins
+        valid = {str(int(tweet_data['id'])): tweet_data for tweet_data in tweets if validate_tweet_data(tweet_data)}
+        if len(valid) < len(tweets):
+            logger.error(f"Skipping {len(tweets) - len(valid)} invalid or repeated tweets in batch")
+        if not valid:
+            return {}
+        columns = [list(column) for column in zip(*(tweet_args(tweet_data) for tweet_data in valid.values()))]
+        try:
+            result = await self.execute_query(UPSERT_TWEETS_BATCH, *columns)
+        except Exception as e:
+            logger.error(f"Error inserting batch of {len(valid)} tweets: {e}")
+            return {}
+        # Rows whose hash matched weren't written and aren't returned
+        stored = dict.fromkeys(valid, False)
+        stored.update((str(row['id']), bool(row['inserted'])) for row in result or ())
+        inserted = sum(stored.values())
+        self.tweet_writes['batched'] += len(stored)
+        self.tweet_writes['inserted'] += inserted
+        self.tweet_writes['updated'] += len(result or ()) - inserted
+        self.tweet_writes['unchanged'] += len(stored) - len(result or ())
+        if self.membership:
+            self.membership.add_tweets(list(stored))
+        return stored
 
-    @retry_on_error()
     # @lru_cache(maxsize=100)
     async def get_user_tweets(self, user_id, limit=100):
         query = """
@@ -131,7 +269,6 @@ class SQLDBManager:
         """
         return await self.execute_query(query, normalize_twitter_id(user_id), limit)
     
-    @retry_on_error()
     # @lru_cache(maxsize=100)
     async def get_relevant_tweets(self, limit=100):
         query = """
@@ -144,12 +281,234 @@ class SQLDBManager:
         """
         return await self.execute_query(query, limit)
     
+    async def get_tweets_by_ids(self, tweet_ids):
+        query = """
+            SELECT id, user_id, content, created_at, is_relevant, engagement_score
+            FROM tweets
+            WHERE id = ANY($1::bigint[])
+        """
+        return await self.execute_query(query, [int(tweet_id) for tweet_id in tweet_ids])
+
+    async def update_tweet_scores(self, rows):
+        """
+        Update (id, is_relevant, engagement_score) rows in one batch. The stored hash is
+        cleared, so the next upsert of each tweet writes even if the fetched data is unchanged.
+        """
+        query = """
+            UPDATE tweets
+            SET is_relevant = $2, engagement_score = $3, content_hash = NULL, updated_at = NOW()
+            WHERE id = $1
+        """
+        await self.execute_many(query, [(int(tweet_id), is_relevant, score) for tweet_id, is_relevant, score in rows])
+
+    async def get_posting_stats(self, user_ids, since):
+        """Per author: tweets stored with created_at >= since, and their newest created_at."""
+        query = """
+            SELECT user_id, COUNT(*) AS tweet_count, MAX(created_at) AS last_tweet_at
+            FROM tweets
+            WHERE user_id = ANY($1::bigint[]) AND created_at >= $2
+            GROUP BY user_id
+        """
+        return await self.execute_query(query, [normalize_twitter_id(user_id) for user_id in user_ids], since)
+
+    async def get_refresh_candidates(self, created_since):
+        """Tweets created at or after created_since, newest first, with their last captured interaction total."""
+        query = """
+            SELECT id, created_at, metrics_total, metrics_refreshed_at
+            FROM tweets
+            WHERE created_at >= $1
+            ORDER BY created_at DESC
+        """
+        return await self.execute_query(query, created_since)
+
+    async def update_tweet_metrics(self, rows):
+        """
+        Store refreshed (id, engagement_score, metrics_total) rows in one batch. Rows whose
+        total didn't change are skipped, and the hash is cleared as in update_tweet_scores.
+        """
+        query = """
+            UPDATE tweets
+            SET engagement_score = $2, metrics_total = $3, metrics_refreshed_at = NOW(), content_hash = NULL,
+                updated_at = NOW()
+            WHERE id = $1 AND metrics_total IS DISTINCT FROM $3
+        """
+        await self.execute_many(query, [(int(tweet_id), score, total) for tweet_id, score, total in rows])
+
+    async def upsert_term_counts(self, rows):
+        """Add (term_type, term, bucket_start, count) rows onto the stored bucket counts."""
+        query = """
+            INSERT INTO term_counts (term_type, term, bucket_start, count)
+            VALUES ($1, $2, $3, $4)
+            ON CONFLICT (term_type, term, bucket_start) DO UPDATE
+            SET count = term_counts.count + EXCLUDED.count
+        """
+        await self.execute_many(query, rows)
+
+    async def get_term_counts(self, since=None, until=None):
+        """Sum term counts over the buckets in [since, until). Both bounds are optional."""
+        query = """
+            SELECT term_type, term, SUM(count) AS count
+            FROM term_counts
+            WHERE ($1::timestamp IS NULL OR bucket_start >= $1)
+              AND ($2::timestamp IS NULL OR bucket_start < $2)
+            GROUP BY term_type, term
+        """
+        return await self.execute_query(query, since, until)
+
+    async def save_topic_centroids(self, rows):
+        """Replace the stored (topic_id, centroid, member_count) rows of the topic model."""
+        query = """
+            INSERT INTO topic_centroids (topic_id, centroid, member_count, updated_at)
+            VALUES ($1, $2, $3, NOW())
+            ON CONFLICT (topic_id) DO UPDATE
+            SET centroid = EXCLUDED.centroid,
+                member_count = EXCLUDED.member_count,
+                updated_at = EXCLUDED.updated_at
+        """
+        await self.execute_many(query, rows)
+
+    async def get_topic_centroids(self):
+        query = "SELECT topic_id, centroid, member_count FROM topic_centroids ORDER BY topic_id"
+        return await self.execute_query(query)
+
+    async def upsert_topic_assignments(self, rows):
+        """Store (tweet_id, topic_id, distance) rows; a re-embedded tweet takes its latest topic."""
+        query = """
+            INSERT INTO tweet_topics (tweet_id, topic_id, distance, assigned_at)
+            VALUES ($1, $2, $3, NOW())
+            ON CONFLICT (tweet_id) DO UPDATE
+            SET topic_id = EXCLUDED.topic_id,
+                distance = EXCLUDED.distance,
+                assigned_at = EXCLUDED.assigned_at
+        """
+        await self.execute_many(query, rows)
+
+    async def get_topic_breakdown(self, since=None, until=None, relevant_only=True):
+        """Tweet count and engagement per topic for tweets created in [since, until)."""
+        query = """
+            SELECT tt.topic_id, COUNT(*) AS tweets, SUM(t.engagement_score) AS engagement,
+                   AVG(t.sentiment_score) AS avg_sentiment
+            FROM tweet_topics tt
+            JOIN tweets t ON t.id = tt.tweet_id
+            WHERE ($1::timestamp IS NULL OR t.created_at >= $1)
+              AND ($2::timestamp IS NULL OR t.created_at < $2)
+              AND (NOT $3 OR t.is_relevant)
+            GROUP BY tt.topic_id
+            ORDER BY tweets DESC
+        """
+        return await self.execute_query(query, since, until, relevant_only)
+
+    async def upsert_user_profiles(self, rows):
+        """
+        Add per-user profile deltas onto user_profiles. Rows are (user_id, tweet_count,
+        relevant_count, score_count[], score_sum[], score_sumsq[], hour_histogram[],
+        first_seen, last_seen, embedding_sum[], embedding_count); arrays add element-wise.
+        """
+        def add_arrays(column):
+            return f"""ARRAY(SELECT a + b FROM unnest(user_profiles.{column}, EXCLUDED.{column})
+                         WITH ORDINALITY AS t(a, b, i) ORDER BY i)"""
+
+        query = f"""
+            INSERT INTO user_profiles (user_id, tweet_count, relevant_count, score_count, score_sum, score_sumsq,
+                                       hour_histogram, first_seen, last_seen, embedding_sum, embedding_count, updated_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, NOW())
+            ON CONFLICT (user_id) DO UPDATE
+            SET tweet_count = user_profiles.tweet_count + EXCLUDED.tweet_count,
+                relevant_count = user_profiles.relevant_count + EXCLUDED.relevant_count,
+                score_count = {add_arrays('score_count')},
+                score_sum = {add_arrays('score_sum')},
+                score_sumsq = {add_arrays('score_sumsq')},
+                hour_histogram = {add_arrays('hour_histogram')},
+                first_seen = LEAST(user_profiles.first_seen, EXCLUDED.first_seen),
+                last_seen = GREATEST(user_profiles.last_seen, EXCLUDED.last_seen),
+                embedding_sum = CASE
+                    WHEN EXCLUDED.embedding_sum IS NULL THEN user_profiles.embedding_sum
+                    WHEN user_profiles.embedding_sum IS NULL THEN EXCLUDED.embedding_sum
+                    ELSE {add_arrays('embedding_sum')}
+                END,
+                embedding_count = user_profiles.embedding_count + EXCLUDED.embedding_count,
+                updated_at = EXCLUDED.updated_at
+        """
+        await self.execute_many(query, rows)
+
+    async def get_user_profiles(self):
+        query = """
+            SELECT user_id, tweet_count, relevant_count, score_count, score_sum, score_sumsq,
+                   hour_histogram, first_seen, last_seen, embedding_sum, embedding_count
+            FROM user_profiles
+        """
+        return await self.execute_query(query)
+
+    async def get_user_score(self, user_id):
+        query = """
+            SELECT COUNT(*) AS tweet_count,
+                   COUNT(*) FILTER (WHERE is_relevant) AS relevant_count,
+                   COALESCE(SUM(engagement_score), 0) AS total_engagement,
+                   AVG(sentiment_score) AS avg_sentiment,
+                   MAX(created_at) AS last_seen
+            FROM tweets
+            WHERE user_id = $1
+        """
+        result = await self.execute_query(query, normalize_twitter_id(user_id))
+        return result[0] if result else None
+
+    async def get_leaderboard(self, offset=0, limit=50, since=None, until=None):
+        """Users ranked by total engagement score over tweets created in [since, until)."""
+        query = """
+            SELECT t.user_id, u.twitter_username, SUM(t.engagement_score) AS total, COUNT(*) AS tweet_count
+            FROM tweets t
+            LEFT JOIN user_accounts u ON u.twitter_id = t.user_id
+            WHERE ($3::timestamp IS NULL OR t.created_at >= $3)
+              AND ($4::timestamp IS NULL OR t.created_at < $4)
+            GROUP BY t.user_id, u.twitter_username
+            ORDER BY total DESC NULLS LAST, t.user_id
+            OFFSET $1 LIMIT $2
+        """
+        return await self.execute_query(query, offset, limit, since, until)
+
+    async def get_tweet_rollup(self, since, until, granularity='day'):
+        """Tweet count, engagement and sentiment per hour/day/week bucket in [since, until)."""
+        query = """
+            SELECT date_trunc($3, created_at) AS bucket,
+                   COUNT(*) AS tweets,
+                   COUNT(*) FILTER (WHERE is_relevant) AS relevant_tweets,
+                   COALESCE(SUM(engagement_score), 0) AS engagement,
+                   AVG(sentiment_score) AS avg_sentiment
+            FROM tweets
+            WHERE created_at >= $1 AND created_at < $2
+            GROUP BY 1
+            ORDER BY 1
+        """
+        return await self.execute_query(query, since, until, granularity)
+
+    async def get_wallet_engagement(self, since=None, until=None):
+        """
+        Total engagement of relevant tweets created in [since, until) per primary wallet
+        of a non-archived user. Tweets the classifier labelled 'farm' don't count.
+        """
+        query = """
+            SELECT w.wallet_address, SUM(t.engagement_score)::float8 AS score
+            FROM tweets t
+            JOIN user_accounts u ON u.twitter_id = t.user_id AND NOT COALESCE(u.is_archived, FALSE)
+            JOIN user_wallets w ON w.twitter_id = t.user_id AND w.is_primary
+            WHERE t.is_relevant
+              AND t.quality_label IS DISTINCT FROM 'farm'
+              AND ($1::timestamp IS NULL OR t.created_at >= $1)
+              AND ($2::timestamp IS NULL OR t.created_at < $2)
+            GROUP BY w.wallet_address
+            HAVING SUM(t.engagement_score) > 0
+        """
+        return await self.execute_query(query, since, until)
+
     async def check_username_exists(self, twitter_username):
         query = "SELECT EXISTS(SELECT 1 FROM user_accounts WHERE twitter_username = $1)"
         result = await self.execute_query(query, twitter_username)
         return result[0]['exists']
 
     async def check_wallet_exists(self, wallet_address):
+        # A filter miss is certain; only possible hits go to Postgres
+        if self.membership and self.membership.wallet_is_new(wallet_address):
+            return False
         query = "SELECT EXISTS(SELECT 1 FROM user_wallets WHERE wallet_address = $1)"
         result = await self.execute_query(query, wallet_address)
         return result[0]['exists']
@@ -168,38 +527,45 @@ class SQLDBManager:
         for column in columns:
             logger.info(f"Column: {column['column_name']}, Type: {column['data_type']}, Nullable: {column['is_nullable']}")
 
-    @retry_on_error()
+    @guarded('postgres', classify_postgres_error)
+    @profile_stage('db')
+    async def _write_user_and_wallet(self, user_data):
+        """Upsert the user and their wallet in one transaction; returns the twitter_id."""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                
+                
+                user_query = """
+                INSERT INTO user_accounts (twitter_id, twitter_username, registration_date, is_archived)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (twitter_id) DO UPDATE
+                SET twitter_username = EXCLUDED.twitter_username,
+                    registration_date = COALESCE(user_accounts.registration_date, EXCLUDED.registration_date),
+                    is_archived = EXCLUDED.is_archived
+                RETURNING twitter_id
+                """
+                twitter_id = normalize_twitter_id(user_data['twitter_id'])
+                registration_date = user_data.get('registration_date', datetime.now())
+                is_archived = user_data.get('is_archived', False)
+                twitter_id = await conn.fetchval(user_query, twitter_id, user_data['twitter_username'], registration_date, is_archived)
+
+
+
+                wallet_query = """
+                INSERT INTO user_wallets (twitter_id, wallet_address, is_primary)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (twitter_id) DO UPDATE
+                SET wallet_address = EXCLUDED.wallet_address, is_primary = EXCLUDED.is_primary
+                """
+                await conn.execute(wallet_query, twitter_id, user_data['wallet_address'], user_data.get('is_primary', True))
+        return twitter_id
+
     async def insert_user_and_wallet(self, user_data):
         try:
-            async with self.pool.acquire() as conn:
-                async with conn.transaction():
-                    
-                    
-                    user_query = """
-                    INSERT INTO user_accounts (twitter_id, twitter_username, registration_date, is_archived)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (twitter_id) DO UPDATE
-                    SET twitter_username = EXCLUDED.twitter_username,
-                        registration_date = COALESCE(user_accounts.registration_date, EXCLUDED.registration_date),
-                        is_archived = EXCLUDED.is_archived
-                    RETURNING twitter_id
-                    """
-                    twitter_id = normalize_twitter_id(user_data['twitter_id'])
-                    registration_date = user_data.get('registration_date', datetime.now())
-                    is_archived = user_data.get('is_archived', False)
-                    twitter_id = await conn.fetchval(user_query, twitter_id, user_data['twitter_username'], registration_date, is_archived)
-
-
-
-                    wallet_query = """
-                    INSERT INTO user_wallets (twitter_id, wallet_address, is_primary)
-                    VALUES ($1, $2, $3)
-                    ON CONFLICT (twitter_id) DO UPDATE
-                    SET wallet_address = EXCLUDED.wallet_address, is_primary = EXCLUDED.is_primary
-                    """
-                    await conn.execute(wallet_query, twitter_id, user_data['wallet_address'], user_data.get('is_primary', True))
-
-            logger.info(f"Successfully inserted/updated user and wallet for Twitter ID: {twitter_id}")
+            twitter_id = await self._write_user_and_wallet(user_data)
+            if self.membership:
+                self.membership.add_wallet(user_data['wallet_address'])
+            logger.debug("Inserted/updated user and wallet for Twitter ID: %s", twitter_id)
             return True
         except ValueError as e:
             logger.error(f"Invalid Twitter ID format: {str(e)}")
@@ -221,7 +587,6 @@ class SQLDBManager:
             logging.error(f"Error fetching Twitter IDs: {str(e)}")
             return []
 
-    @retry_on_error()
     async def get_user(self, twitter_username):
         query = """
         SELECT twitter_id, twitter_username, registration_date, is_archived
@@ -231,6 +596,44 @@ class SQLDBManager:
         result = await self.execute_query(query, twitter_username)
         return result[0] if result else None
 
+    async def insert_project_account(self, twitter_id, twitter_username):
+        """Track a project account, or bring an archived one back."""
+        query = """
+            INSERT INTO project_accounts (twitter_id, twitter_username, is_archived)
+            VALUES ($1, $2, FALSE)
+            ON CONFLICT (twitter_id) DO UPDATE
+            SET twitter_username = EXCLUDED.twitter_username, is_archived = FALSE, updated_at = NOW()
+        """
+        await self.execute_query(query, normalize_twitter_id(twitter_id), twitter_username, fetch=False)
+
+    async def archive_project_account(self, twitter_username):
+        """Stop tracking a project account; returns False if no active account has that username."""
+        query = """
+            UPDATE project_accounts
+            SET is_archived = TRUE, updated_at = NOW()
+            WHERE twitter_username = $1 AND NOT is_archived
+            RETURNING twitter_id
+        """
+        return bool(await self.execute_query(query, twitter_username))
+
+    async def get_all_project_accounts(self, include_archived=False):
+        query = """
+            SELECT twitter_id, twitter_username, is_archived, created_at, updated_at
+            FROM project_accounts
+            WHERE $1 OR NOT is_archived
+            ORDER BY twitter_username
+        """
+        return await self.execute_query(query, include_archived)
+
+    async def get_archived_project_accounts(self):
+        query = """
+            SELECT twitter_id, twitter_username, is_archived, created_at, updated_at
+            FROM project_accounts
+            WHERE is_archived
+            ORDER BY twitter_username
+        """
+        return await self.execute_query(query)
+
     def invalidate_cache(self, key):
         if key in self.cache:
             del self.cache[key]
@@ -241,6 +644,9 @@ class SQLDBManager:
             ("tweets", "created_at"),
             ("tweets", "is_relevant"),
             ("user_accounts", "twitter_username"),
+            # Watermark columns for incremental exports
+            ("tweets", "updated_at"),
+            ("user_accounts", "updated_at"),
         ]
         
         for table, column in indexes:
@@ -334,5 +740,14 @@ class SQLDBManager:
         except Exception as e:
             logger.error(f"Error checking schema: {str(e)}")
             return False    
+    def pool_stats(self):
+        """Live pool usage: connections in use and idle, waiters and acquire latency."""
+        return self.pool.stats() if hasattr(self.pool, 'stats') else {}
+
     async def close(self):
+        logger.info(f"Tweet upserts: {self.tweet_write_stats()}")
+        logger.info(f"Connection pool: {self.pool_stats()}")
+        logger.info(f"Dependency guards: {resilience_stats()}")
+        if self.membership:
+            self.membership.save()
         await self.pool.close()
\ No newline at end of file
@@ -0,0 +1,106 @@
+# src/preprocessing/data_cleaner.py
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+URL_RE = re.compile(r"https?://\S+")
+MENTION_RE = re.compile(r"(?<![\w@])@(\w{1,15})")
+# Zero-width characters and the emoji variation selectors (U+FE0E/U+FE0F), which NFKC leaves in place
+INVISIBLE_RE = re.compile("[\u200b-\u200f\u2060\ufeff\ufe0e\ufe0f]")
+
+# Cleaned text is memoized on the tweet dict under this key, so later stages reuse it
+CLEAN_KEY = '_clean'
+
+
+class CleanedText:
+    """
+    Normalized views of one tweet's text.
+
+    text: NFKC-folded, case-folded, URLs removed, mentions kept. Used for
+        relevance and term matching.
+    content: text with mentions removed as well. Used for dedup keys,
+        sentiment and embeddings.
+    urls: the expanded URLs that were removed.
+    mentions: the case-folded usernames that were removed.
+    """
+
+    __slots__ = ('text', 'content', 'urls', 'mentions')
+
+    def __init__(self, text: str, content: str, urls: List[str], mentions: List[str]):
+        self.text = text
+        self.content = content
+        self.urls = urls
+        self.mentions = mentions
+
+
+def normalize_text(text: str) -> str:
+    """NFKC folding (full-width and styled look-alikes to plain letters), then case folding and whitespace collapsing."""
+    if not text.isascii():
+        # ASCII is already NFKC-normal, which is the common case
+        text = INVISIBLE_RE.sub('', unicodedata.normalize('NFKC', text))
+    return ' '.join(text.casefold().split())
+
+
+def _entity_spans(text: str, entities: Dict, kind: str, expected) -> Optional[List[Tuple[int, int]]]:
+    """
+    (start, end) spans of one entity kind, or None if the offsets don't line up
+    with the text. That happens when the API reports offsets against
+    unescaped text, so the caller falls back to the regex instead.
+    """
+    spans = []
+    for entity in entities.get(kind) or ():
+        start, end = entity.get('start'), entity.get('end')
+        if start is None or end is None or text[start:end].lower() != expected(entity).lower():
+            return None
+        spans.append((start, end))
+    return spans
+
+
+def _strip_spans(text: str, spans: List[Tuple[int, int]]) -> str:
+    pieces = []
+    position = 0
+    for start, end in sorted(spans):
+        if start >= position:
+            pieces.append(text[position:start])
+            position = end
+    pieces.append(text[position:])
+    return ' '.join(pieces)
+
+
+def clean_text(text: str, entities: Optional[Dict] = None) -> CleanedText:
+    """
+    Clean one raw tweet text. URL and mention spans are taken from the v2
+    entities offsets when they are present and consistent. Otherwise they
+    are found with the precompiled patterns.
+    """
+    entities = entities or {}
+    url_spans = _entity_spans(text, entities, 'urls', lambda entity: entity.get('url', ''))
+    if url_spans is None or not entities.get('urls'):
+        url_spans = [match.span() for match in URL_RE.finditer(text)]
+        urls = [text[start:end] for start, end in url_spans]
+    else:
+        urls = [entity.get('expanded_url') or entity['url'] for entity in entities['urls']]
+
+    mention_spans = _entity_spans(text, entities, 'mentions', lambda entity: '@' + entity.get('username', ''))
+    if mention_spans is None or not entities.get('mentions'):
+        matches = list(MENTION_RE.finditer(text))
+        mention_spans = [match.span() for match in matches]
+        mentions = [match.group(1).casefold() for match in matches]
+    else:
+        mentions = [entity['username'].casefold() for entity in entities['mentions']]
+
+    without_urls = _strip_spans(text, url_spans) if url_spans else text
+    content = _strip_spans(text, url_spans + mention_spans) if mention_spans else without_urls
+    normalized = normalize_text(without_urls)
+    return CleanedText(normalized, normalize_text(content) if mention_spans else normalized, urls, mentions)
+
+
+def clean_tweet(tweet: Dict) -> CleanedText:
+    """Clean an API tweet once; repeated calls for the same tweet dict return the memoized result."""
+    cleaned = tweet.get(CLEAN_KEY)
+    if cleaned is None:
+        cleaned = tweet[CLEAN_KEY] = clean_text(tweet.get('text', ''), tweet.get('entities'))
+    return cleaned
+
+# This file is not meant to be run directly
@@ -0,0 +1,331 @@
+# src/router/query_router.py
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('hour', 'day', 'week')
+
+
+class AnalyticsRequest:
+    """
+    Base class for typed router requests. Subclasses set route and ttl
+    and list the data they read in dependencies(), so a cached answer can be
+    dropped as soon as that data changes.
+    """
+
+    route = None
+    ttl = 60.0
+
+    def cache_key(self) -> Tuple:
+        return (self.route,) + tuple(sorted(vars(self).items()))
+
+    def dependencies(self) -> Tuple[str, ...]:
+        return ()
+
+
+class UserScoreRequest(AnalyticsRequest):
+    route = 'user_score'
+    ttl = 30.0
+
+    def __init__(self, user_id):
+        self.user_id = str(user_id)
+
+    def dependencies(self):
+        return ('tweets', f"user:{self.user_id}")
+
+
+class LeaderboardRequest(AnalyticsRequest):
+    route = 'leaderboard'
+
+    def __init__(self, offset: int = 0, limit: int = 50, since: Optional[datetime] = None, until: Optional[datetime] = None):
+        self.offset = offset
+        self.limit = limit
+        self.since = since
+        self.until = until
+
+    def dependencies(self):
+        return ('tweets',)
+
+
+class SimilarTweetsRequest(AnalyticsRequest):
+    route = 'similar_tweets'
+    ttl = 300.0
+
+    def __init__(self, text: str, top_k: int = 5):
+        self.text = text
+        self.top_k = top_k
+
+    def dependencies(self):
+        return ('vectors',)
+
+
+class KeywordCountsRequest(AnalyticsRequest):
+    route = 'keyword_counts'
+
+    def __init__(self, since: Optional[datetime] = None, until: Optional[datetime] = None):
+        self.since = since
+        self.until = until
+
+    def dependencies(self):
+        return ('term_counts',)
+
+
+class RollupRequest(AnalyticsRequest):
+    route = 'rollup'
+    ttl = 120.0
+
+    def __init__(self, since: datetime, until: datetime, granularity: str = 'day'):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        self.since = since
+        self.until = until
+        self.granularity = granularity
+
+    def dependencies(self):
+        return ('tweets',)
+
+
+class TTLCache:
+    """Result cache with per-entry TTLs and a dependency -> keys index for invalidation."""
+
+    def __init__(self, max_entries: int = 10000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._by_dependency = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the live (expires_at, value, dependencies) entry for key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= self.clock():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value, ttl: float, dependencies: Iterable[str] = ()):
+        self._discard(key)
+        dependencies = tuple(dependencies)
+        self._entries[key] = (self.clock() + ttl, value, dependencies)
+        for dependency in dependencies:
+            self._by_dependency.setdefault(dependency, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, *dependencies: str) -> int:
+        """Drop every entry that depends on any of dependencies. Returns the number dropped."""
+        dropped = 0
+        for dependency in dependencies:
+            for key in self._by_dependency.pop(dependency, ()):
+                if key in self._entries:
+                    self._discard(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self):
+        self._entries.clear()
+        self._by_dependency.clear()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for dependency in entry[2]:
+            keys = self._by_dependency.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_dependency[dependency]
+
+
+class RouteStats:
+    """Call count and recent latencies for one route/backend pair."""
+
+    def __init__(self, window: int = 1024):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, seconds: float, error: bool = False):
+        self.calls += 1
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.recent.append(seconds)
+
+    def as_dict(self) -> Dict:
+        latencies = sorted(self.recent)
+        def percentile(fraction):
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3) if latencies else 0.0
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'mean_ms': round(self.total_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+        }
+
+
+class Backend:
+    """A data source the router can send requests to. Lower cost is tried first."""
+
+    name = None
+    cost = 0
+
+    def can_answer(self, request: AnalyticsRequest) -> bool:
+        raise NotImplementedError
+
+    async def answer(self, request: AnalyticsRequest):
+        raise NotImplementedError
+
+
+class MemoryBackend(Backend):
+    """
+    Answers leaderboards from the in-process UserProfiler, once it has loaded
+    the stored profiles and only without a time range, because the profiler
+    keeps all-time totals.
+
+    Per-user scores always go to Postgres. The profiler's engagement sums are
+    fixed when a tweet is first seen, while MetricsRefresher (often in another
+    process) keeps rewriting engagement_score, so a single user's totals from
+    memory would drift from the stored ones.
+    """
+
+    name = 'memory'
+    cost = 1
+
+    def __init__(self, user_profiler):
+        self.user_profiler = user_profiler
+
+    def can_answer(self, request):
+        if isinstance(request, LeaderboardRequest):
+            return self.user_profiler.loaded and request.since is None and request.until is None
+        return False
+
+    async def answer(self, request):
+        return self.user_profiler.top_users('engagement_score', request.offset, request.limit)
+
+
+class PostgresBackend(Backend):
+    name = 'postgres'
+    cost = 10
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def can_answer(self, request):
+        return isinstance(request, (UserScoreRequest, LeaderboardRequest, KeywordCountsRequest, RollupRequest))
+
+    async def answer(self, request):
+        if isinstance(request, UserScoreRequest):
+            row = await self.db_manager.get_user_score(request.user_id)
+            return dict(row) if row else None
+        if isinstance(request, LeaderboardRequest):
+            rows = await self.db_manager.get_leaderboard(request.offset, request.limit, request.since, request.until)
+            return [{'user_id': str(row['user_id']), 'total': float(row['total'] or 0), 'tweet_count': row['tweet_count']} for row in rows]
+        if isinstance(request, KeywordCountsRequest):
+            rows = await self.db_manager.get_term_counts(since=request.since, until=request.until)
+            return [dict(row) for row in rows]
+        rows = await self.db_manager.get_tweet_rollup(request.since, request.until, request.granularity)
+        return [dict(row) for row in rows]
+
+
+class VectorBackend(Backend):
+    """Similarity search on the vector index; the blocking client call runs in an executor."""
+
+    name = 'vector'
+    cost = 20
+
+    def __init__(self, vector_db_manager):
+        self.vector_db_manager = vector_db_manager
+
+    def can_answer(self, request):
+        return isinstance(request, SimilarTweetsRequest)
+
+    async def answer(self, request):
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, self.vector_db_manager.find_similar_tweets, request.text, request.top_k)
+        return [{'id': match['id'], 'score': match['score']} for match in results['matches']]
+
+
+class QueryRouter:
+    """
+    Single entry point for analytics reads.
+
+    query() serves a request from the cache when it can. Otherwise it tries
+    the backends that can answer it, cheapest first, falling back to the next
+    on error. Results are cached with the request's TTL and dropped early
+    when one of its dependencies is invalidated. Latency is recorded per
+    route and backend.
+    """
+
+    def __init__(self, backends: Iterable[Backend], cache: Optional[TTLCache] = None):
+        self.backends = sorted(backends, key=lambda backend: backend.cost)
+        self.cache = cache if cache is not None else TTLCache()
+        self.stats = {}
+
+    @classmethod
+    def for_fetcher(cls, fetcher, vector_db_manager=None) -> 'QueryRouter':
+        """Router over a TwitterFetcher's profiler and database, invalidated by their flushes."""
+        backends = [MemoryBackend(fetcher.user_profiler), PostgresBackend(fetcher.sql_db_manager)]
+        vector_db_manager = vector_db_manager or fetcher.vector_db_manager
+        if vector_db_manager is not None:
+            backends.append(VectorBackend(vector_db_manager))
+        router = cls(backends)
+        fetcher.term_counter.add_listener(lambda: router.invalidate('term_counts'))
+        fetcher.user_profiler.add_listener(lambda user_ids: router.invalidate('tweets', *(f"user:{user_id}" for user_id in user_ids)))
+        return router
+
+    def invalidate(self, *dependencies: str) -> int:
+        return self.cache.invalidate(*dependencies)
+
+    def _record(self, route: str, backend: str, seconds: float, error: bool = False):
+        key = f"{route}:{backend}"
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = RouteStats()
+        stats.record(seconds, error)
+
+    async def query(self, request: AnalyticsRequest):
+        start = time.perf_counter()
+        key = request.cache_key()
+        entry = self.cache.get(key)
+        if entry is not None:
+            self._record(request.route, 'cache', time.perf_counter() - start)
+            return entry[1]
+
+        candidates = [backend for backend in self.backends if backend.can_answer(request)]
+        if not candidates:
+            raise ValueError(f"No backend can answer {type(request).__name__}")
+
+        last_error = None
+        for backend in candidates:
+            backend_start = time.perf_counter()
+            try:
+                result = await backend.answer(request)
+            except Exception as e:
+                self._record(request.route, backend.name, time.perf_counter() - backend_start, error=True)
+                logger.error(f"Backend {backend.name} failed on {request.route}: {str(e)}")
+                last_error = e
+                continue
+            self._record(request.route, backend.name, time.perf_counter() - backend_start)
+            self.cache.set(key, result, request.ttl, request.dependencies())
+            return result
+        raise last_error
+
+    def latency_summary(self) -> Dict[str, Dict]:
+        return {key: stats.as_dict() for key, stats in sorted(self.stats.items())}
+
+# This file is not meant to be run directly
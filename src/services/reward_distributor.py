@@ -0,0 +1,307 @@
+# src/services/reward_distributor.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+import binascii
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_DIGITS = np.full(256, -1, dtype=np.int16)
+_BASE58_DIGITS[np.frombuffer(BASE58_ALPHABET, dtype=np.uint8)] = np.arange(58)
+
+# Domain separation keeps a leaf from ever being passed off as an internal node
+LEAF_PREFIX = 0
+NODE_PREFIX = 1
+
+
+def decode_base58_batch(addresses: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode Solana addresses to 32-byte public keys, all at once.
+
+    The base conversion runs over the whole batch on nine 32-bit limbs per
+    address, five characters (58^5 < 2^30) per multiply-and-carry step.
+    Returns the (n, 32) uint8 keys and a mask of the addresses that were
+    valid base58 and fit in 32 bytes.
+    """
+    n = len(addresses)
+    # Right-aligned and left-padded with digit 0 ('1') to a multiple of five, which doesn't change the value
+    width = -(-max((len(address) for address in addresses), default=0) // 5) * 5
+    chars = np.frombuffer(''.join(address.rjust(width, '1') for address in addresses).encode('ascii', 'replace'),
+                          dtype=np.uint8).reshape(n, width)
+    digits = _BASE58_DIGITS[chars]
+    valid = (digits >= 0).all(axis=1) & np.array([32 <= len(address) <= 44 for address in addresses], dtype=bool)
+    # Position-major so every step reads contiguous rows
+    digits = np.ascontiguousarray(np.maximum(digits, 0).astype(np.uint64).T)
+
+    limbs = np.zeros((9, n), dtype=np.uint64)  # little-endian base 2^32; the ninth limb catches overflow
+    mask = np.uint64(0xFFFFFFFF)
+    shift = np.uint64(32)
+    step = np.uint64(58 ** 5)
+    for position in range(0, width, 5):
+        carry = digits[position]
+        for offset in range(1, 5):
+            carry = carry * np.uint64(58) + digits[position + offset]
+        for limb in range(9):
+            value = limbs[limb] * step + carry
+            limbs[limb] = value & mask
+            carry = value >> shift
+    valid &= limbs[8] == 0
+
+    keys = np.ascontiguousarray(limbs[7::-1].T).astype('>u4').view(np.uint8).reshape(n, 32)
+    return keys, valid
+
+
+def allocate(scores: np.ndarray, budget: int, max_per_wallet: Optional[int] = None) -> np.ndarray:
+    """
+    Split an integer budget over wallets in proportion to their scores, with
+    an optional per-wallet cap and deterministic largest-remainder rounding.
+
+    Capped wallets get exactly the cap. What the caps free up is spread over
+    the remaining wallets, again in proportion to their scores. The caps are
+    solved in one pass over the scores sorted in descending order. Integer
+    amounts sum exactly to the budget, or to the total of all caps if that
+    is smaller. Ties in remainder go to the lower index, so the same inputs
+    always give the same amounts.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    amounts = np.zeros(len(scores), dtype=np.int64)
+    positive = np.flatnonzero(scores > 0)
+    if budget <= 0 or not len(positive):
+        return amounts
+
+    distributable = budget if max_per_wallet is None else min(budget, max_per_wallet * len(positive))
+    shares = np.zeros(len(scores))
+    capped = np.zeros(len(scores), dtype=bool)
+    if max_per_wallet is None:
+        shares[positive] = distributable * scores[positive] / scores[positive].sum()
+    else:
+        order = positive[np.argsort(-scores[positive], kind='stable')]
+        sorted_scores = scores[order]
+        # Wallet k is uncapped if, after capping the k above it, its share of the rest is within the cap
+        suffix = np.cumsum(sorted_scores[::-1])[::-1]
+        k = np.arange(len(order))
+        fits = (distributable - k * max_per_wallet) * sorted_scores <= max_per_wallet * suffix
+        first_uncapped = int(np.argmax(fits)) if fits.any() else len(order)
+        capped[order[:first_uncapped]] = True
+        shares[order[:first_uncapped]] = max_per_wallet
+        rest = order[first_uncapped:]
+        if len(rest):
+            remaining = distributable - first_uncapped * max_per_wallet
+            shares[rest] = remaining * scores[rest] / scores[rest].sum()
+
+    amounts[:] = np.floor(shares)
+    leftover = int(distributable - amounts.sum())
+    if leftover > 0:
+        candidates = np.flatnonzero((shares > 0) & ~capped)
+        remainders = shares[candidates] - amounts[candidates]
+        winners = candidates[np.argsort(-remainders, kind='stable')[:leftover]]
+        amounts[winners] += 1
+    return amounts
+
+
+def leaf_hashes(keys: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """sha256(0x00 || pubkey || amount as u64 big-endian) for every wallet; (n, 32) uint8."""
+    n = len(keys)
+    buffer = np.empty((n, 41), dtype=np.uint8)
+    buffer[:, 0] = LEAF_PREFIX
+    buffer[:, 1:33] = keys
+    buffer[:, 33:] = np.asarray(amounts, dtype='>u8').view(np.uint8).reshape(n, 8)
+    return _hash_rows(buffer)
+
+
+def _hash_rows(buffer: np.ndarray) -> np.ndarray:
+    """sha256 of every row of a contiguous uint8 matrix, reading the rows straight out of one buffer."""
+    width = buffer.shape[1]
+    view = memoryview(np.ascontiguousarray(buffer)).cast('B')
+    sha256 = hashlib.sha256
+    digests = b''.join([sha256(view[start:start + width]).digest() for start in range(0, len(view), width)])
+    return np.frombuffer(digests, dtype=np.uint8).reshape(len(buffer), 32)
+
+
+class MerkleTree:
+    """
+    Binary sha256 Merkle tree over leaf hashes, built one level at a time.
+
+    Each pair is ordered (smaller hash first) before hashing, so a proof is
+    just the list of sibling hashes with no left/right flags. The last node
+    of an odd-sized level is promoted unchanged. Every level is kept, so
+    proofs for all leaves are read from the arrays rather than recomputed.
+    """
+
+    def __init__(self, leaves: np.ndarray):
+        self.levels = [np.asarray(leaves, dtype=np.uint8).reshape(-1, 32)]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(self._parent_level(self.levels[-1]))
+
+    @staticmethod
+    def _parent_level(level: np.ndarray) -> np.ndarray:
+        pairs = len(level) // 2
+        left, right = level[0:2 * pairs:2], level[1:2 * pairs:2]
+        # Lexicographic comparison of the 32-byte hashes at their first differing byte
+        differs = left != right
+        first = differs.argmax(axis=1)
+        rows = np.arange(pairs)
+        swap = left[rows, first] > right[rows, first]
+        buffer = np.empty((pairs, 65), dtype=np.uint8)
+        buffer[:, 0] = NODE_PREFIX
+        buffer[:, 1:33] = np.where(swap[:, None], right, left)
+        buffer[:, 33:] = np.where(swap[:, None], left, right)
+        parents = _hash_rows(buffer)
+        if len(level) % 2:
+            parents = np.vstack([parents, level[-1:]])
+        return parents
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0].tobytes() if len(self.levels[0]) else hashlib.sha256(b'').digest()
+
+    def proof(self, index: int) -> List[bytes]:
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling].tobytes())
+            index >>= 1
+        return proof
+
+    def encoded_proofs(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Yield every leaf's proof as a JSON array of hex strings, in leaf order.
+
+        Sibling hashes are gathered for a chunk of leaves at a time into a
+        fixed-width matrix, so each leaf's bytes come out ready to write.
+        """
+        n = len(self.levels[0])
+        depth = len(self.levels) - 1
+        if not depth:
+            yield from [b'[]'] * n
+            return
+        # Every node once as '"<64 hex chars>",'
+        quoted = []
+        for level in self.levels[:-1]:
+            entries = np.empty((len(level), 67), dtype=np.uint8)
+            entries[:, 0] = entries[:, 65] = ord('"')
+            entries[:, 1:65] = np.frombuffer(binascii.hexlify(level.tobytes()), dtype=np.uint8).reshape(len(level), 64)
+            entries[:, 66] = ord(',')
+            quoted.append(entries)
+        for start in range(0, n, chunk_size):
+            index = np.arange(start, min(start + chunk_size, n))
+            # Level-major, so every gather writes one contiguous block
+            entries = np.empty((depth, len(index), 67), dtype=np.uint8)
+            present = np.ones((depth, len(index)), dtype=bool)
+            for height, level in enumerate(quoted):
+                sibling = index ^ 1
+                present[height] = sibling < len(level)
+                np.take(level, np.minimum(sibling, len(level) - 1), axis=0, out=entries[height])
+                index = index >> 1
+            entries[~present] = 0
+            proofs = np.empty((len(index), 1 + depth * 67), dtype=np.uint8)
+            proofs[:, 0] = ord('[')
+            proofs[:, 1:].reshape(len(index), depth, 67)[:] = entries.transpose(1, 0, 2)
+            # Missing siblings only occur on the right edge of the tree, so few rows need their
+            # entries shifted left over the gaps; the zero bytes then trail and are dropped
+            ragged = np.flatnonzero(~present.all(axis=0))
+            if len(ragged):
+                order = np.argsort(~present[:, ragged].T, axis=1, kind='stable')
+                rows = proofs[ragged, 1:].reshape(len(ragged), depth, 67)
+                proofs[ragged, 1:] = np.take_along_axis(rows, order[:, :, None], axis=1).reshape(len(ragged), -1)
+            # The last comma of each proof closes the array
+            proofs[np.arange(len(index)), present.sum(axis=0) * 67] = ord(']')
+            yield from proofs.view(f'S{1 + depth * 67}').ravel().tolist()
+
+    @staticmethod
+    def verify(leaf: bytes, proof: Sequence[bytes], root: bytes) -> bool:
+        node = leaf
+        for sibling in proof:
+            left, right = (node, sibling) if node <= sibling else (sibling, node)
+            node = hashlib.sha256(bytes([NODE_PREFIX]) + left + right).digest()
+        return node == root
+
+
+class RewardDistributor:
+    """
+    Snapshot job that turns engagement into a claimable token distribution
+    paid from PROJECT_WALLET.
+
+    Wallet engagement for the campaign window comes from Postgres. It is
+    filtered to the WalletValidator eligibility set and to addresses that
+    decode as valid public keys. The wallets are sorted so the output
+    doesn't depend on query order. The budget is then allocated and a
+    Merkle tree of (wallet, amount) leaves is built. The root and summary
+    go to distribution.json. proofs.jsonl has one claim per line: wallet,
+    amount, leaf index and proof.
+    """
+
+    def __init__(self, db_manager, wallet_validator):
+        self.db_manager = db_manager
+        self.wallet_validator = wallet_validator
+
+    def build(self, wallets: Sequence[str], scores: Sequence[float], budget: int,
+              max_per_wallet: Optional[int] = None) -> Dict:
+        start = time.perf_counter()
+        eligible = self.wallet_validator.eligible_wallets
+        pairs = sorted((wallet, score) for wallet, score in zip(wallets, scores) if wallet in eligible)
+        ineligible = len(wallets) - len(pairs)
+        wallets = [wallet for wallet, _ in pairs]
+        keys, valid = decode_base58_batch(wallets)
+        if not valid.all():
+            logger.warning(f"Skipping {int((~valid).sum())} wallets that are not valid public keys")
+        wallets = [wallet for wallet, ok in zip(wallets, valid.tolist()) if ok]
+        keys = keys[valid]
+        score_array = np.fromiter((score for (_, score), ok in zip(pairs, valid.tolist()) if ok), dtype=np.float64, count=len(wallets))
+
+        amounts = allocate(score_array, budget, max_per_wallet)
+        paid = np.flatnonzero(amounts > 0)
+        wallets = [wallets[index] for index in paid.tolist()]
+        amounts = amounts[paid]
+        tree = MerkleTree(leaf_hashes(keys[paid], amounts))
+        logger.info(f"Built distribution of {int(amounts.sum())} over {len(wallets)} wallets in {time.perf_counter() - start:.2f}s")
+        return {
+            'wallets': wallets,
+            'amounts': amounts,
+            'tree': tree,
+            'ineligible': ineligible,
+            'invalid': int((~valid).sum()),
+        }
+
+    async def snapshot(self, budget: int, output_dir: str, since: Optional[datetime] = None,
+                       until: Optional[datetime] = None, max_per_wallet: Optional[int] = None) -> Optional[Dict]:
+        try:
+            rows = await self.db_manager.get_wallet_engagement(since, until)
+        except Exception as e:
+            logger.error(f"Error reading wallet engagement: {str(e)}")
+            return None
+        result = self.build([row['wallet_address'] for row in rows], [row['score'] for row in rows], budget, max_per_wallet)
+        summary = {
+            'root': result['tree'].root.hex(),
+            'budget': budget,
+            'total': int(result['amounts'].sum()),
+            'wallets': len(result['wallets']),
+            'max_per_wallet': max_per_wallet,
+            'since': since.isoformat() if since else None,
+            'until': until.isoformat() if until else None,
+            'ineligible': result['ineligible'],
+            'invalid': result['invalid'],
+        }
+        write_distribution(output_dir, summary, result['wallets'], result['amounts'], result['tree'])
+        return summary
+
+
+def write_distribution(output_dir: str, summary: Dict, wallets: Sequence[str], amounts: np.ndarray, tree: MerkleTree):
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'proofs.jsonl'), 'wb') as file:
+        for index, (wallet, amount, proof) in enumerate(zip(wallets, amounts.tolist(), tree.encoded_proofs())):
+            file.write(b'{"index": %d, "wallet": "%s", "amount": %d, "proof": %s}\n' % (index, wallet.encode('ascii'), amount, proof))
+    with open(os.path.join(output_dir, 'distribution.json'), 'w') as file:
+        json.dump(summary, file, indent=2)
+    logger.info(f"Wrote distribution with root {summary['root']} to {output_dir}")
+
+# This file is not meant to be run directly
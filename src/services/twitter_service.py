@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 class TwitterService:
     def __init__(self):
         self.bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
-        self.base_url = "https://api.twitter.com/2"
+        self.base_url = os.getenv("TWITTER_API_BASE_URL", "https://api.twitter.com/2").rstrip('/')
 
     def get_user_id(self, username):
         # Remove '@' symbol if present
@@ -0,0 +1,21 @@
+# src/utils/agent_config.py
+
+import os
+import yaml
+from functools import lru_cache
+from typing import Dict
+
+AGENT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'configs', 'agent_configs.yaml')
+
+
+@lru_cache(maxsize=1)
+def _load_all(path: str = AGENT_CONFIG_PATH) -> Dict:
+    with open(path, 'r') as file:
+        return yaml.safe_load(file) or {}
+
+
+def load_agent_config(agent_name: str) -> Dict:
+    """Return the settings block for one agent from configs/agent_configs.yaml ({} if absent)."""
+    return dict(_load_all().get(agent_name) or {})
+
+# This file is not meant to be run directly
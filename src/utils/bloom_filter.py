@@ -0,0 +1,95 @@
+# src/utils/bloom_filter.py
+
+import os
+import math
+import hashlib
+import logging
+from typing import Iterable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys.
+
+    A miss means the key was definitely never added. A hit means it
+    probably was, with a false positive rate near error_rate as long as no
+    more than capacity keys are added. Each key is hashed once with
+    blake2b, and its num_hashes bit positions come from double hashing of
+    the two 64-bit halves of the digest. Batches are set and tested with
+    numpy.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)), 64)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, keys: List[str]) -> np.ndarray:
+        digests = b''.join([hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest() for key in keys])
+        halves = np.frombuffer(digests, dtype='<u8').reshape(len(keys), 2)
+        # Double hashing: h1 + i * h2 (mod num_bits) for i < num_hashes; h2 is odd so the probes differ
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))) % np.uint64(self.num_bits)
+
+    def add_many(self, keys: Iterable) -> None:
+        keys = [str(key) for key in keys]
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        if len(positions) > self.num_bits // 64:
+            # Large batches (seeding): one boolean scatter and a repack beat bitwise_or.at
+            flags = np.zeros(len(self.bits) * 8, dtype=bool)
+            flags[positions] = True
+            self.bits |= np.packbits(flags, bitorder='little')
+        else:
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(keys)
+
+    def add(self, key) -> None:
+        self.add_many([key])
+
+    def contains_many(self, keys: Iterable) -> np.ndarray:
+        keys = [str(key) for key in keys]
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        hits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def __contains__(self, key) -> bool:
+        return bool(self.contains_many([key])[0])
+
+    @property
+    def saturated(self) -> bool:
+        """More keys than it was sized for; the false positive rate is climbing."""
+        return self.count > self.capacity
+
+    def save(self, path: str):
+        """Write atomically, so a crash mid-save leaves the previous file intact."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, bits=self.bits, params=np.array([self.capacity, self.count], dtype=np.int64),
+                     error_rate=np.array([self.error_rate]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BloomFilter':
+        with np.load(path) as data:
+            capacity, count = (int(value) for value in data['params'])
+            bloom = cls(capacity, float(data['error_rate'][0]))
+            if len(data['bits']) != len(bloom.bits):
+                raise ValueError(f"Bloom filter file {path} doesn't match its parameters")
+            bloom.bits = data['bits'].copy()
+            bloom.count = count
+        return bloom
+
+# This file is not meant to be run directly
@@ -13,5 +13,12 @@ def calculate_engagement_score(public_metrics):
     
     return 0  # Placeholder return value
 
+METRIC_FIELDS = ('like_count', 'retweet_count', 'reply_count', 'quote_count')
+
+
+def metrics_total(public_metrics):
+    """Total interactions in public_metrics; what the metrics refresher tracks the change of."""
+    return sum(int(public_metrics.get(field, 0) or 0) for field in METRIC_FIELDS)
+
 # TODO: Consider factors like retweets, likes, replies, and potentially
 # the user's follower count when calculating the actual engagement score.
\ No newline at end of file
@@ -0,0 +1,38 @@
+# src/utils/fast_decode.py
+
+import json
+from datetime import datetime
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    orjson = None
+
+
+def loads(payload):
+    """Decode a JSON payload (bytes or str), using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+@lru_cache(maxsize=4096)
+def parse_twitter_timestamp(value: str) -> datetime:
+    """
+    Parse a Twitter API v2 timestamp such as "2024-07-03T03:05:34.000Z".
+
+    Slices the fixed-width fields directly instead of going through strptime;
+    anything not in that shape falls back to strptime. Results are cached since
+    the same author created_at shows up on every tweet of a page.
+    """
+    if len(value) >= 21 and value[4] == '-' and value[10] == 'T' and value[19] == '.' and value[-1] == 'Z':
+        fraction = value[20:-1]
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19]),
+            int(fraction[:6].ljust(6, '0'))
+        )
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+# This file is not meant to be run directly
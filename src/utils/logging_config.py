@@ -0,0 +1,165 @@
+# src/utils/logging_config.py
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else on a record came in through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'sample_every'}
+
+# Default 1-in-N sampling for per-item INFO lines (extra={'sample_every': LOG_SAMPLE_EVERY})
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_listener: Optional[QueueListener] = None
+_listener_pid = None
+
+
+def record_fields(record: logging.LogRecord) -> Dict:
+    """The extra= fields of a record (tweet_id, stage, ...)."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS and not key.startswith('_')}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, the extra= fields and any traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(record_fields(record))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """TEXT_FORMAT, plus the sampled/suppressed counts RateLimitFilter adds. Other extra= fields are JSON only."""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        for key in ('sampled', 'suppressed'):
+            if hasattr(record, key):
+                text += f" {key}={getattr(record, key)}"
+        return text
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (logger, file, line), so f-string and
+    %-style messages are limited alike. A call site may emit burst records
+    at once and rate per second after that. The next record that gets
+    through carries suppressed=N for the ones dropped in between.
+
+    A record logged with extra={'sample_every': N} is also sampled: one in
+    N from its call site is kept and carries sampled=N.
+
+    Call sites idle for idle_seconds are forgotten (checked at most every
+    idle_seconds), so the state stays bounded by the call sites in use.
+    """
+
+    def __init__(self, rate: float = 20.0, burst: int = 100, idle_seconds: float = 300.0, clock=time.monotonic):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        # call site -> [tokens, last seen, records seen (for sampling), suppressed since the last one kept]
+        self.sites: Dict = {}
+        self.dropped = 0
+        self._next_sweep = clock() + idle_seconds
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: float):
+        idle_since = now - self.idle_seconds
+        for key in [key for key, site in self.sites.items() if site[1] < idle_since]:
+            del self.sites[key]
+        self._next_sweep = now + self.idle_seconds
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            now = self.clock()
+            if now >= self._next_sweep:
+                self._sweep(now)
+            site = self.sites.setdefault(key, [float(self.burst), now, 0, 0])
+            site[0] = min(self.burst, site[0] + (now - site[1]) * self.rate)
+            site[1] = now
+            sample_every = getattr(record, 'sample_every', None)
+            if sample_every and sample_every > 1:
+                site[2] += 1
+                if (site[2] - 1) % sample_every:
+                    return False
+                record.sampled = sample_every
+            if self.rate > 0:
+                if site[0] < 1:
+                    site[3] += 1
+                    self.dropped += 1
+                    return False
+                site[0] -= 1
+            suppressed, site[3] = site[3], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> QueueListener:
+    """
+    Route all logging through one QueueHandler on the root logger. A
+    QueueListener thread does the formatting and the stream writes, so a
+    log call on the event loop only filters the record and enqueues it.
+
+    LOG_LEVEL (INFO), LOG_FORMAT (text or json), LOG_RATE_LIMIT (records per
+    second per call site, 0 disables) and LOG_BURST set the defaults.
+    Safe to call more than once: a process keeps its first setup, and a
+    forked child replaces the handlers it inherited with its own.
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(float(os.getenv("LOG_RATE_LIMIT", "20")), int(os.getenv("LOG_BURST", "100"))))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+    _listener_pid = None
+
+# This file is not meant to be run directly
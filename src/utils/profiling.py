@@ -0,0 +1,204 @@
+# src/utils/profiling.py
+
+import os
+import sys
+import time
+import threading
+import tracemalloc
+import logging
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Code object of every function tagged with profile_stage -> stage name
+STAGE_CODES: Dict = {}
+
+_active: Optional['Profiler'] = None
+
+
+def profile_stage(name: str):
+    """
+    Tag a function (sync or async) as a profiling stage. It is not wrapped.
+    The sampler recognises its frames on the stack, so a tagged function
+    costs nothing extra, whether or not profiling is on. Put it below any
+    wrapping decorator, so the function's own code object is tagged.
+    """
+    def decorator(func):
+        STAGE_CODES[func.__code__] = name
+        return func
+    return decorator
+
+
+def mark(label: str):
+    """Stage boundary: takes a tracemalloc snapshot while profiling, otherwise does nothing."""
+    if _active is not None:
+        _active.snapshot(label)
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """
+    Statistical profiler for a whole process. A daemon thread samples the
+    stacks of the main thread (always) and of other threads while they are
+    inside a tagged stage (the embedding executor, for example), every
+    interval seconds. It reads the stacks with sys._current_frames, so the
+    profiled code runs untouched. A sample is attributed to the innermost
+    profile_stage on its stack.
+
+    stop() writes to output_dir:
+    - all.folded and <stage>.folded: collapsed stacks ("a;b;c count"),
+      readable by flamegraph.pl and speedscope
+    - memory.txt: the top tracemalloc allocation growth between stage
+      boundaries (see mark())
+    - summary.txt: samples per stage and the top_n functions by self and
+      total samples
+    """
+
+    def __init__(self, output_dir: str, interval: float = 0.005, memory: bool = True, top_n: int = 25,
+                 memory_frames: int = 1):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.memory = memory
+        self.top_n = top_n
+        self.memory_frames = memory_frames
+        self.samples = Counter()
+        self.sample_count = 0
+        self.snapshots: List = []
+        self.memory_report: List[str] = []
+        self._main_thread_id = threading.main_thread().ident
+        self._stopping = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    def start(self):
+        global _active
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.memory_frames)
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+        self._thread.start()
+        _active = self
+        self.snapshot('start')
+        logger.info(f"Profiling to {self.output_dir} every {self.interval * 1000:.1f} ms")
+        return self
+
+    def stop(self) -> Optional[str]:
+        """Stop sampling and write the reports; returns the summary text."""
+        global _active
+        if self._thread is None:
+            return None
+        self.snapshot('end')
+        _active = None
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self.write()
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stopping.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._record(thread_id, frame)
+
+    def _record(self, thread_id: int, frame):
+        names = []
+        stage = None
+        while frame is not None:
+            code = frame.f_code
+            if stage is None:
+                stage = STAGE_CODES.get(code)
+            names.append(_frame_name(code))
+            frame = frame.f_back
+        if stage is None and thread_id != self._main_thread_id:
+            # Idle pool threads and the like
+            return
+        names.reverse()
+        self.samples[(stage or 'other', ';'.join(names))] += 1
+        self.sample_count += 1
+
+    @profile_stage('profiler')
+    def snapshot(self, label: str):
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        # No filter_traces: it runs in Python over every trace and would dominate the run
+        snapshot = tracemalloc.take_snapshot()
+        if self.snapshots:
+            previous_label, previous = self.snapshots[-1]
+            current, peak = tracemalloc.get_traced_memory()
+            self.memory_report.append(f"== {previous_label} -> {label}: traced {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+            stats = [stat for stat in snapshot.compare_to(previous, 'lineno')
+                     if stat.size_diff and stat.traceback[0].filename not in (tracemalloc.__file__, __file__)]
+            for stat in stats[:self.top_n]:
+                self.memory_report.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  {stat.traceback[0]}")
+        # Only the latest snapshot is kept; each one holds every live trace
+        self.snapshots = [(label, snapshot)]
+
+    def stage_totals(self) -> Counter:
+        totals = Counter()
+        for (stage, _), count in self.samples.items():
+            totals[stage] += count
+        return totals
+
+    def top_functions(self, stage: Optional[str] = None):
+        """(self, total) sample counts per function, over one stage or all of them."""
+        own, total = Counter(), Counter()
+        for (sample_stage, stack), count in self.samples.items():
+            if stage is not None and sample_stage != stage:
+                continue
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return own, total
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        lines = [f"{self.sample_count} samples over {elapsed:.1f} seconds ({self.interval * 1000:.1f} ms interval)", "",
+                 "Samples per stage:"]
+        for stage, count in self.stage_totals().most_common():
+            lines.append(f"  {count:8d}  {count / max(self.sample_count, 1):6.1%}  {stage}")
+        own, total = self.top_functions()
+        lines += ["", f"Top {self.top_n} by self samples:"]
+        lines += [f"  {count:8d}  {name}" for name, count in own.most_common(self.top_n)]
+        lines += ["", f"Top {self.top_n} by total samples:"]
+        lines += [f"  {count:8d}  {name}" for name, count in total.most_common(self.top_n)]
+        return '\n'.join(lines)
+
+    def write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        per_stage: Dict[str, List[str]] = {}
+        combined = Counter()
+        for (stage, stack), count in self.samples.items():
+            per_stage.setdefault(stage, []).append(f"{stack} {count}")
+            combined[f"{stage};{stack}"] += count
+        with open(os.path.join(self.output_dir, 'all.folded'), 'w') as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in sorted(combined.items()))
+        for stage, lines in per_stage.items():
+            with open(os.path.join(self.output_dir, f"{stage}.folded"), 'w') as file:
+                file.writelines(f"{line}\n" for line in sorted(lines))
+        if self.memory_report:
+            with open(os.path.join(self.output_dir, 'memory.txt'), 'w') as file:
+                file.write('\n'.join(self.memory_report) + '\n')
+        summary = self.summary()
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w') as file:
+            file.write(summary + '\n')
+        logger.info(f"Profile written to {self.output_dir}\n{summary}")
+        return summary
+
+
+def profiler_from_env(output_dir: Optional[str] = None) -> Optional[Profiler]:
+    """A Profiler if output_dir or PROFILE_DIR is set; PROFILE_INTERVAL_MS and PROFILE_MEMORY tune it."""
+    output_dir = output_dir or os.getenv("PROFILE_DIR")
+    if not output_dir:
+        return None
+    return Profiler(output_dir, interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000,
+                    memory=os.getenv("PROFILE_MEMORY", "true").lower() == "true")
+
+# This file is not meant to be run directly
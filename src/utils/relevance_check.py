@@ -2,15 +2,55 @@
 
 import json
 import os
+import time
+from src.preprocessing.data_cleaner import normalize_text
+
+CRITERIA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'tweet_analysis.json')
+
+# Seconds between checks of the criteria file's mtime
+CRITERIA_CHECK_SECONDS = float(os.getenv("CRITERIA_CHECK_SECONDS", "5"))
+
+# (mtime_ns, case-folded mentions, monotonic time of the next mtime check) of the last criteria file read
+_mentions_cache = None
 
 def load_relevance_criteria():
     """
     Load relevance criteria from tweet_analysis.json file.
+    The file is regenerated from stored term counts by TermCounter.export_snapshot.
     """
-    file_path = os.path.join(os.path.dirname(__file__), '..', '..', 'tweet_analysis.json')
-    with open(file_path, 'r') as file:
+    with open(CRITERIA_PATH, 'r') as file:
         return json.load(file)
 
+def _folded_mentions():
+    """
+    Case-folded mention criteria, re-read only when tweet_analysis.json changes
+    rather than on every tweet. The mtime itself is checked at most every
+    CRITERIA_CHECK_SECONDS, so a rewrite is picked up within that long.
+    """
+    global _mentions_cache
+    now = time.monotonic()
+    if _mentions_cache is not None and now < _mentions_cache[2]:
+        return _mentions_cache[1]
+    mtime = os.stat(CRITERIA_PATH).st_mtime_ns
+    if _mentions_cache is None or _mentions_cache[0] != mtime:
+        mentions = tuple(mention.casefold() for mention in load_relevance_criteria()['mentions'])
+    else:
+        mentions = _mentions_cache[1]
+    _mentions_cache = (mtime, mentions, now + CRITERIA_CHECK_SECONDS)
+    return mentions
+
+def is_text_relevant(normalized_text):
+    """
+    Check text already normalized by src.preprocessing.data_cleaner (NFKC and
+    case folded) against the criteria, which are case folded the same way.
+    """
+    # Simple check for mentions (placeholder logic)
+    for mention in _folded_mentions():
+        if mention in normalized_text:
+            return True
+
+    return False
+
 def is_tweet_relevant(tweet_text):
     """
     Check if a tweet is relevant based on criteria from tweet_analysis.json.
@@ -19,14 +59,7 @@ def is_tweet_relevant(tweet_text):
     should be implemented here in the future. Currently, it only checks for the presence
     of mentions and returns True if any mention is found.
     """
-    criteria = load_relevance_criteria()
-    
-    # Simple check for mentions (placeholder logic)
-    for mention in criteria['mentions']:
-        if mention in tweet_text:
-            return True
-    
-    return False
+    return is_text_relevant(normalize_text(tweet_text))
 
 # TODO: Implement more sophisticated relevance checking logic
 # This should include checks for keywords, hashtags, and other relevant criteria
@@ -0,0 +1,295 @@
+# src/utils/resilience.py
+
+import time
+import random
+import asyncio
+import inspect
+import logging
+import contextvars
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from src.utils.agent_config import load_agent_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'max_attempts': 3,
+    'base_delay': 0.5,        # seconds before the first retry; doubles each attempt
+    'max_delay': 30.0,
+    'budget_ratio': 0.2,      # retries allowed per first attempt, on average
+    'budget_reserve': 10,     # retries always available, so a quiet dependency can still retry
+    'failure_threshold': 5,   # consecutive transient failures that open the circuit
+    'reset_timeout': 30.0,    # seconds the circuit stays open before one trial call
+}
+
+# Error classes a classifier returns
+RETRY = 'retry'  # transient: back off and try again; counts against the circuit
+FAIL = 'fail'    # the caller's fault (bad input, constraint violation): raise at once, circuit untouched
+
+# Set on exceptions a guard has finished with, so enclosing guards pass them straight through
+_HANDLED = '_resilience_handled'
+
+# Names of the guards the current task is already inside
+_active_guards = contextvars.ContextVar('active_guards', default=frozenset())
+
+
+class RetryableError(Exception):
+    """Raised by guarded calls for transient failures that aren't exceptions, such as HTTP 429 or 5xx."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, trips_circuit: bool = True):
+        super().__init__(message)
+        self.retry_after = retry_after
+        # A 429 means the dependency is up and pacing us; it shouldn't open the circuit
+        self.trips_circuit = trips_circuit
+
+
+class CircuitOpenError(Exception):
+    """The dependency's circuit is open; the call was not attempted."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given retry (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempt - 1))))
+
+
+def default_classifier(exc: BaseException) -> str:
+    if isinstance(exc, (RetryableError, asyncio.TimeoutError, ConnectionError, OSError)):
+        return RETRY
+    return FAIL
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of first attempts. Every first attempt adds
+    ratio tokens, up to reserve, and every retry takes one. When a
+    dependency is down and every call fails, the reserve drains and retries
+    settle at about ratio extra load instead of multiplying it by
+    max_attempts.
+    """
+
+    def __init__(self, ratio: float, reserve: int):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.tokens = float(reserve)
+
+    def deposit(self):
+        self.tokens = min(self.tokens + self.ratio, float(self.reserve))
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures; after reset_timeout one trial call decides."""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a transient failure; returns True if this opened the circuit."""
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            return True
+        return False
+
+
+class DependencyGuard:
+    """
+    Retry policy, retry budget and circuit breaker for one dependency
+    (postgres, twitter_api, pinecone), shared by every call to it.
+
+    The classifier decides per exception whether to retry. Guards don't
+    stack. A guarded call made inside another call to the same guard runs
+    unguarded, so the outer call owns the retries. Once a guard gives up,
+    the exception is marked, and guards of other dependencies further up
+    re-raise it without retrying or counting it again. A failing call
+    costs at most max_attempts, not max_attempts squared.
+    """
+
+    def __init__(self, name: str, config: Optional[Dict] = None, classifier: Callable = default_classifier,
+                 clock=time.monotonic):
+        settings = dict(DEFAULT_CONFIG, **config) if config else dict(DEFAULT_CONFIG)
+        self.name = name
+        self.classifier = classifier
+        self.max_attempts = max(int(settings['max_attempts']), 1)
+        self.base_delay = float(settings['base_delay'])
+        self.max_delay = float(settings['max_delay'])
+        self.budget = RetryBudget(float(settings['budget_ratio']), int(settings['budget_reserve']))
+        self.breaker = CircuitBreaker(int(settings['failure_threshold']), float(settings['reset_timeout']), clock)
+        self.counters = {'calls': 0, 'successes': 0, 'failures': 0, 'retries': 0, 'retries_denied': 0,
+                         'short_circuited': 0, 'circuit_opened': 0}
+
+    def stats(self) -> Dict:
+        return dict(self.counters, state=self.breaker.state)
+
+    def _admit(self):
+        self.counters['calls'] += 1
+        self.budget.deposit()
+        if not self.breaker.allow():
+            self.counters['short_circuited'] += 1
+            raise self._handled(CircuitOpenError(f"{self.name} circuit is open"))
+
+    def _handled(self, exc: BaseException) -> BaseException:
+        try:
+            setattr(exc, _HANDLED, True)
+        except AttributeError:
+            pass
+        return exc
+
+    def _on_failure(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if getattr(exc, _HANDLED, False):
+            return None
+        if self.classifier(exc) != RETRY:
+            # Not the dependency's fault, so the circuit doesn't count it
+            self.breaker.record_success()
+            return None
+        if not getattr(exc, 'trips_circuit', True):
+            # The dependency answered (e.g. a 429), so it is up
+            self.breaker.record_success()
+        elif self.breaker.record_failure():
+            self.counters['circuit_opened'] += 1
+            logger.error(f"{self.name} circuit opened after {self.breaker.failures} consecutive failures")
+            return None
+        if attempt >= self.max_attempts or self.breaker.state != CircuitBreaker.CLOSED:
+            return None
+        if not self.budget.withdraw():
+            self.counters['retries_denied'] += 1
+            return None
+        self.counters['retries'] += 1
+        retry_after = getattr(exc, 'retry_after', None)
+        delay = retry_after if retry_after is not None else backoff_delay(attempt, self.base_delay, self.max_delay)
+        logger.warning(f"{self.name} call failed (attempt {attempt}/{self.max_attempts}), retrying in {delay:.2f} seconds: {exc}")
+        return delay
+
+    def _on_success(self):
+        self.counters['successes'] += 1
+        self.breaker.record_success()
+
+    def _give_up(self, exc: BaseException) -> BaseException:
+        if not getattr(exc, _HANDLED, False):
+            self.counters['failures'] += 1
+        return self._handled(exc)
+
+    async def call(self, func, *args, **kwargs):
+        active = _active_guards.get()
+        if self.name in active:
+            return await func(*args, **kwargs)
+        self._admit()
+        token = _active_guards.set(active | {self.name})
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._on_failure(e, attempt)
+                    if delay is None:
+                        raise self._give_up(e)
+                    await asyncio.sleep(delay)
+                    continue
+                self._on_success()
+                return result
+        finally:
+            _active_guards.reset(token)
+
+    def call_sync(self, func, *args, **kwargs):
+        active = _active_guards.get()
+        if self.name in active:
+            return func(*args, **kwargs)
+        self._admit()
+        token = _active_guards.set(active | {self.name})
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._on_failure(e, attempt)
+                    if delay is None:
+                        raise self._give_up(e)
+                    time.sleep(delay)
+                    continue
+                self._on_success()
+                return result
+        finally:
+            _active_guards.reset(token)
+
+
+_GUARDS: Dict[str, DependencyGuard] = {}
+
+
+def create_guard(name: str, classifier: Callable = default_classifier) -> DependencyGuard:
+    """
+    A new guard for a dependency, configured from the resilience block of
+    agent_configs.yaml (top-level defaults, then the dependency's own block).
+    It replaces any earlier guard of that name in get_guard() and
+    resilience_stats().
+    """
+    settings = load_agent_config('resilience')
+    config = {key: value for key, value in settings.items() if key in DEFAULT_CONFIG}
+    config.update(settings.get(name) or {})
+    guard = _GUARDS[name] = DependencyGuard(name, config, classifier)
+    return guard
+
+
+def get_guard(name: str, classifier: Callable = default_classifier) -> DependencyGuard:
+    """The shared guard for a dependency, created on first use."""
+    guard = _GUARDS.get(name)
+    return guard if guard is not None else create_guard(name, classifier)
+
+
+def resilience_stats() -> Dict[str, Dict]:
+    """Counters and circuit state of every guard created so far."""
+    return {name: guard.stats() for name, guard in _GUARDS.items()}
+
+
+def guarded(name: str, classifier: Callable = default_classifier):
+    """Decorator running a function (sync or async) through the named dependency's guard."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await get_guard(name, classifier).call(func, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_guard(name, classifier).call_sync(func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# This file is not meant to be run directly
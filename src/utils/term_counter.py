@@ -0,0 +1,163 @@
+# src/utils/term_counter.py
+
+import os
+import sys
+import json
+import time
+import calendar
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from configs.project_config import PROJECT_ACCOUNTS, KEYWORDS, HASHTAGS
+from src.preprocessing.data_cleaner import clean_tweet
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'tweet_analysis.json')
+
+# term_type used for the per-bucket relevant tweet total
+TOTAL_TERM_TYPE = 'total'
+TOTAL_TERM = 'relevant_tweets'
+
+
+def bucket_start(created_at: datetime, bucket_seconds: int) -> datetime:
+    """Truncate a timestamp to the start of its counting bucket."""
+    epoch = calendar.timegm(created_at.utctimetuple())
+    return datetime(1970, 1, 1) + timedelta(seconds=epoch - epoch % bucket_seconds)
+
+
+def build_snapshot(rows: Iterable) -> Dict:
+    """
+    Build a dict in the tweet_analysis.json shape from (term_type, term, count) rows.
+    Every configured term is present, with 0 when it was never seen.
+    """
+    snapshot = {
+        'total_relevant_tweets': 0,
+        'mentions': {account: 0 for account in PROJECT_ACCOUNTS},
+        'keywords': {keyword: 0 for keyword in KEYWORDS},
+        'hashtags': {hashtag.lstrip('#'): 0 for hashtag in HASHTAGS},
+    }
+    for term_type, term, count in rows:
+        if term_type == TOTAL_TERM_TYPE:
+            snapshot['total_relevant_tweets'] += int(count)
+        elif term_type in snapshot:
+            snapshot[term_type][term] = snapshot[term_type].get(term, 0) + int(count)
+    return snapshot
+
+
+class TermCounter:
+    """
+    In-process mention, keyword and hashtag counters updated during ingestion.
+
+    Counts are kept per time bucket (by tweet created_at) and batch-flushed to
+    the term_counts table, so tweet_analysis.json can be regenerated from the
+    stored buckets instead of rescanning every tweet.
+    """
+
+    def __init__(self, db_manager=None, flush_interval: Optional[float] = None, bucket_seconds: Optional[int] = None):
+        self.db_manager = db_manager
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("TERM_COUNTER_FLUSH_INTERVAL", 30))
+        self.bucket_seconds = bucket_seconds or int(os.getenv("TERM_COUNTER_BUCKET_SECONDS", 3600))
+        self._pending = defaultdict(int)
+        self._listeners = []
+        self._last_flush = time.monotonic()
+
+        # Case-folded matchers are built once instead of per tweet, folded the same way as the cleaned text
+        self._mentions = [(account, account.lstrip('@').casefold()) for account in PROJECT_ACCOUNTS]
+        self._keywords = [(keyword, keyword.casefold()) for keyword in KEYWORDS]
+        self._hashtags = [(hashtag.lstrip('#'), hashtag.lstrip('#').casefold()) for hashtag in HASHTAGS]
+
+    def add_listener(self, callback):
+        """Register a callback run after each successful flush (e.g. to invalidate cached counts)."""
+        self._listeners.append(callback)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def observe(self, tweet: Dict, created_at: datetime):
+        """Count the configured terms of one relevant tweet."""
+        bucket = bucket_start(created_at, self.bucket_seconds)
+        cleaned = clean_tweet(tweet)
+        text = cleaned.text
+        entities = tweet.get('entities') or {}
+        pending = self._pending
+
+        pending[(TOTAL_TERM_TYPE, TOTAL_TERM, bucket)] += 1
+
+        if 'mentions' in entities:
+            mentioned = set(cleaned.mentions)
+            for account, username in self._mentions:
+                if username in mentioned:
+                    pending[('mentions', account, bucket)] += 1
+        else:
+            for account, username in self._mentions:
+                if '@' + username in text:
+                    pending[('mentions', account, bucket)] += 1
+
+        for keyword, lowered in self._keywords:
+            if lowered in text:
+                pending[('keywords', keyword, bucket)] += 1
+
+        if 'hashtags' in entities:
+            tags = {hashtag['tag'].casefold() for hashtag in entities['hashtags']}
+            for hashtag, lowered in self._hashtags:
+                if lowered in tags:
+                    pending[('hashtags', hashtag, bucket)] += 1
+        else:
+            for hashtag, lowered in self._hashtags:
+                if '#' + lowered in text:
+                    pending[('hashtags', hashtag, bucket)] += 1
+
+    def pending_snapshot(self) -> Dict:
+        """Snapshot of the counts not yet flushed, in the tweet_analysis.json shape."""
+        return build_snapshot((term_type, term, count) for (term_type, term, _), count in self._pending.items())
+
+    async def flush(self) -> int:
+        """Write pending counts to Postgres. Returns the number of bucket rows written."""
+        if not self._pending or self.db_manager is None:
+            self._last_flush = time.monotonic()
+            return 0
+
+        # Swap before awaiting so observations made during the flush land in the next batch
+        pending, self._pending = self._pending, defaultdict(int)
+        self._last_flush = time.monotonic()
+        rows = [(term_type, term, bucket, count) for (term_type, term, bucket), count in pending.items()]
+        try:
+            await self.db_manager.upsert_term_counts(rows)
+        except Exception as e:
+            logger.error(f"Error flushing term counts: {str(e)}")
+            for key, count in pending.items():
+                self._pending[key] += count
+            return 0
+        logger.info(f"Flushed {len(rows)} term count buckets")
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in term counter listener: {str(e)}")
+        return len(rows)
+
+    async def flush_if_due(self) -> int:
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            return await self.flush()
+        return 0
+
+    async def export_snapshot(self, path: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict:
+        """
+        Flush, then write the stored counts for [since, until) to a JSON file
+        in the tweet_analysis.json shape. Both bounds are optional.
+        """
+        await self.flush()
+        rows = await self.db_manager.get_term_counts(since=since, until=until)
+        snapshot = build_snapshot((row['term_type'], row['term'], row['count']) for row in rows)
+        with open(path or SNAPSHOT_PATH, 'w') as file:
+            json.dump(snapshot, file, indent=2)
+        logger.info(f"Exported term count snapshot to {path or SNAPSHOT_PATH}")
+        return snapshot
+
+# This file is not meant to be run directly
@@ -5,27 +5,16 @@ from dotenv import load_dotenv
 from pinecone import Pinecone
 from sentence_transformers import SentenceTransformer
 import logging
-import time
-from functools import wraps
+from src.preprocessing.data_cleaner import clean_tweet
+from src.utils.resilience import FAIL, RETRY, guarded
+from src.utils.profiling import profile_stage
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def retry_on_error(max_retries=3, delay=1):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise
-                    logger.warning(f"Vector DB operation failed. Retrying in {delay} seconds. Error: {e}")
-                    time.sleep(delay)
-        return wrapper
-    return decorator
+def classify_vector_error(exc):
+    """Pinecone and network failures are retried; programming errors are not."""
+    return FAIL if isinstance(exc, (ValueError, TypeError, KeyError, AttributeError)) else RETRY
 
 class VectorDBManager:
     def __init__(self):
@@ -62,17 +51,19 @@ class VectorDBManager:
     def generate_embedding(self, text):
         return self.model.encode(text).tolist()
 
-    @retry_on_error()
+    @guarded('pinecone', classify_vector_error)
+    @profile_stage('embedding')
     def store_tweet_embedding(self, tweet_id, tweet_text):
         try:
             embedding = self.generate_embedding(tweet_text)
             self.index.upsert(vectors=[(tweet_id, embedding)])
-            logger.info(f"Stored embedding for tweet {tweet_id}")
+            logger.debug("Stored embedding for tweet %s", tweet_id)
         except Exception as e:
             logger.error(f"Error storing embedding for tweet {tweet_id}: {e}")
             raise
 
-    @retry_on_error()
+    @guarded('pinecone', classify_vector_error)
+    @profile_stage('embedding')
     def find_similar_tweets(self, query_text, top_k=5):
         try:
             query_embedding = self.generate_embedding(query_text)
@@ -83,17 +74,22 @@ class VectorDBManager:
             logger.error(f"Error finding similar tweets: {e}")
             raise
 
-    @retry_on_error()
+    @guarded('pinecone', classify_vector_error)
+    @profile_stage('embedding')
     def batch_store_tweet_embeddings(self, tweets):
         try:
-            batch = [(tweet['id'], self.generate_embedding(tweet['text'])) for tweet in tweets]
+            # One encode call for the whole batch; the embeddings are returned for the topic modeler
+            embeddings = self.model.encode([clean_tweet(tweet).content or tweet['text'] for tweet in tweets])
+            batch = [(tweet['id'], embedding) for tweet, embedding in zip(tweets, embeddings.tolist())]
             self.index.upsert(vectors=batch)
             logger.info(f"Stored embeddings for {len(tweets)} tweets in batch")
+            return embeddings
         except Exception as e:
             logger.error(f"Error batch storing tweet embeddings: {e}")
             raise
 
-    @retry_on_error()
+    @guarded('pinecone', classify_vector_error)
+    @profile_stage('embedding')
     def batch_find_similar_tweets(self, query_texts, top_k=5):
         try:
             query_embeddings = [self.generate_embedding(text) for text in query_texts]
@@ -107,7 +103,7 @@ class VectorDBManager:
     def delete_tweet_embedding(self, tweet_id):
         try:
             self.index.delete(ids=[tweet_id])
-            logger.info(f"Deleted embedding for tweet {tweet_id}")
+            logger.debug("Deleted embedding for tweet %s", tweet_id)
         except Exception as e:
             logger.error(f"Error deleting embedding for tweet {tweet_id}: {e}")
             raise
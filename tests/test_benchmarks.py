@@ -0,0 +1,33 @@
+# tests/test_benchmarks.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from benchmarks.synthetic_tweets import SyntheticTweetGenerator
+from benchmarks.bench_ingestion import check_regressions, summarize
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generator_is_deterministic(self):
+        first = SyntheticTweetGenerator(seed=7).tweets(50)
+        second = SyntheticTweetGenerator(seed=7).tweets(50)
+        self.assertEqual(first, second)
+        tweet, user = first[0]
+        self.assertEqual(tweet['author_id'], user['id'])
+        self.assertIn('public_metrics', tweet)
+
+    def test_timeline_pages_shape(self):
+        pages = SyntheticTweetGenerator(seed=7, user_count=10).timeline_pages(95)
+        self.assertEqual(sum(len(page['data']) for page in pages.values()), 95)
+        for user_id, page in pages.items():
+            self.assertEqual(page['includes']['users'][0]['id'], user_id)
+
+    def test_check_regressions(self):
+        baseline = {'results': {'scoring': summarize([1000, 2000], 1.0, 1000)}}
+        self.assertEqual(check_regressions({'scoring': summarize([1000, 2000], 1.1, 1000)}, baseline, 0.25), [])
+        failures = check_regressions({'scoring': summarize([1000, 9000], 2.0, 1000)}, baseline, 0.25)
+        self.assertEqual(len(failures), 2)
+
+if __name__ == '__main__':
+    unittest.main()
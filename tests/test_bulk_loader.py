@@ -0,0 +1,105 @@
+# tests/test_bulk_loader.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from src.database.bulk_loader import BulkLoader, TWEET_STAGING_COLUMNS
+from src.database.sql_db_manager import tweet_content_hash
+
+class FakeConnection:
+    """Emulates the staging merge: keeps the last copy of each id and skips tweets of unknown authors."""
+
+    def __init__(self, existing_ids=(), known_users=('7',), fail_on_chunk=None):
+        self.existing_ids = set(existing_ids)
+        self.known_users = {int(user_id) for user_id in known_users}
+        self.fail_on_chunk = fail_on_chunk
+        self.copies = []
+        self.statements = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query):
+        self.statements.append(query)
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies.append((table, records, columns))
+        if self.fail_on_chunk == len(self.copies):
+            raise ConnectionError("connection reset")
+
+    async def fetchrow(self, query):
+        _, records, columns = self.copies[-1]
+        latest = {}
+        for record in records:
+            row = dict(zip(columns, record))
+            latest[record[1]] = row
+        merged = [key for key, row in latest.items() if row.get('user_id', 7) in self.known_users]
+        inserted = sum(1 for key in merged if key not in self.existing_ids)
+        self.existing_ids.update(merged)
+        return {'inserted': inserted, 'updated': len(merged) - inserted, 'staged': len(latest)}
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+class FakeDBManager:
+    def __init__(self, conn):
+        self.pool = FakePool(conn)
+
+def tweet_data(tweet_id, user_id='7', engagement=1.0):
+    return {'id': str(tweet_id), 'user_id': user_id, 'content': f"gm {tweet_id}", 'created_at': datetime(2024, 7, 3),
+            'is_relevant': True, 'engagement_score': engagement}
+
+class TestBulkLoader(unittest.IsolatedAsyncioTestCase):
+    async def test_counts_inserted_updated_rejected(self):
+        conn = FakeConnection(existing_ids={2})
+        tweets = [tweet_data(1), tweet_data(2), tweet_data(1, engagement=5.0), tweet_data(3, user_id='8'),
+                  tweet_data(4, engagement=-1), {'id': '5'}]
+        report = await BulkLoader(FakeDBManager(conn), chunk_size=100).load_tweets(iter(tweets))
+
+        self.assertEqual(report.as_dict()['inserted'], 1)
+        self.assertEqual(report.updated, 1)
+        # Two fail validation and one has an unknown author
+        self.assertEqual(report.rejected, 3)
+        self.assertEqual(report.duplicates, 1)
+        table, records, columns = conn.copies[0]
+        self.assertEqual((table, columns), ('staging_tweets', TWEET_STAGING_COLUMNS))
+        self.assertEqual(records[2][:3], (2, 1, 7))
+        self.assertEqual(len(records[0]), len(TWEET_STAGING_COLUMNS))
+        self.assertIn('CREATE TEMP TABLE staging_tweets', conn.statements[0])
+
+    async def test_metrics_total_is_staged_with_the_hash_that_covers_it(self):
+        conn = FakeConnection()
+        tweet = dict(tweet_data(1), metrics_total=42)
+        await BulkLoader(FakeDBManager(conn)).load_tweets([tweet])
+        _, records, columns = conn.copies[0]
+        row = dict(zip(columns, records[0]))
+        self.assertEqual((row['metrics_total'], row['content_hash']), (42, tweet_content_hash(tweet)))
+
+    async def test_chunks_commit_independently(self):
+        conn = FakeConnection(fail_on_chunk=2)
+        report = await BulkLoader(FakeDBManager(conn), chunk_size=2).load_tweets(tweet_data(index) for index in range(5))
+        self.assertEqual(len(conn.copies), 3)
+        self.assertEqual(report.inserted, 3)
+        self.assertEqual(report.failed, 2)
+
+    async def test_users_are_loaded_before_tweets(self):
+        conn = FakeConnection()
+        users = [{'id': '7', 'username': 'alice', 'follower_count': 3, 'created_at': datetime(2020, 1, 1)}]
+        result = await BulkLoader(FakeDBManager(conn)).load(users, [tweet_data(1)])
+        self.assertEqual([copy[0] for copy in conn.copies], ['staging_user_accounts', 'staging_tweets'])
+        self.assertEqual(conn.copies[0][1], [(0, 7, 'alice', datetime(2020, 1, 1), datetime(2020, 1, 1), 3)])
+        self.assertEqual(result['user_accounts']['inserted'], 1)
+        self.assertEqual(result['tweets']['inserted'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
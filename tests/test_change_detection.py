@@ -0,0 +1,58 @@
+# tests/test_change_detection.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from src.database.sql_db_manager import SQLDBManager, UPSERT_TWEET, tweet_content_hash
+from src.data_ingestion.twitter_fetcher import TwitterFetcher
+
+def tweet_data(engagement=1.5):
+    return {'id': '42', 'user_id': '7', 'content': 'gm', 'created_at': datetime(2024, 7, 3), 'is_relevant': True,
+            'engagement_score': engagement, 'sentiment_score': 0.25, 'quality_score': 0.1, 'quality_label': 'organic'}
+
+def api_page(count):
+    return {
+        'data': [{'id': f"9{i:04d}", 'text': f"gm {i} @weremeow", 'created_at': "2024-07-03T03:05:34.000Z",
+                  'author_id': '7', 'public_metrics': {'like_count': i, 'retweet_count': 1}} for i in range(count)],
+        'includes': {'users': [{'id': '7', 'username': 'user7', 'created_at': "2020-01-01T00:00:00.000Z",
+                                'public_metrics': {'followers_count': 10}}]},
+    }
+
+class TestChangeDetection(unittest.IsolatedAsyncioTestCase):
+    def test_hash_covers_the_fetched_inputs(self):
+        self.assertEqual(tweet_content_hash(tweet_data()), tweet_content_hash(dict(tweet_data(), created_at=None)))
+        self.assertNotEqual(tweet_content_hash(tweet_data()), tweet_content_hash(tweet_data(engagement=2.0)))
+        self.assertEqual(tweet_content_hash(tweet_data()), tweet_content_hash(dict(tweet_data(), quality_score=0.4)))
+        self.assertIn('WHERE tweets.content_hash IS DISTINCT FROM EXCLUDED.content_hash', UPSERT_TWEET)
+
+    @patch('src.data_ingestion.twitter_fetcher.VectorDBManager')
+    async def test_refetched_page_hashes_the_same(self, mock_vector_db):
+        pipeline = TwitterFetcher(SQLDBManager()).create_pipeline()
+        hashes = []
+        for _ in range(3):
+            items = await pipeline._score(await pipeline._relevance(await pipeline._parse([('7', api_page(20))])))
+            hashes.append([tweet_content_hash(item['tweet_data']) for item in items])
+        self.assertEqual(len(hashes[0]), 20)
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertEqual(hashes[0], hashes[2])
+
+    async def test_skipped_upsert_is_not_a_failure(self):
+        db = SQLDBManager()
+        db.execute_query = AsyncMock(side_effect=[[{'id': 42, 'inserted': True}], [], [{'id': 42, 'inserted': False}]])
+
+        self.assertEqual(await db.insert_tweet(tweet_data(), with_status=True), ('42', True))
+        # No row back: the hash matched and nothing was written
+        self.assertEqual(await db.insert_tweet(tweet_data(), with_status=True), ('42', False))
+        self.assertEqual(await db.insert_tweet(tweet_data(engagement=3.0)), '42')
+
+        self.assertEqual(db.execute_query.call_args.args[10], tweet_content_hash(tweet_data(engagement=3.0)))
+        stats = db.tweet_write_stats()
+        self.assertEqual((stats['inserted'], stats['updated'], stats['unchanged']), (1, 1, 1))
+        self.assertEqual(stats['unchanged_ratio'], 0.3333)
+
+if __name__ == '__main__':
+    unittest.main()
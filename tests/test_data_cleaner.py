@@ -0,0 +1,59 @@
+# tests/test_data_cleaner.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+from src.preprocessing.data_cleaner import clean_text, clean_tweet, normalize_text, CLEAN_KEY
+from src.utils import relevance_check
+from src.utils.relevance_check import is_tweet_relevant
+
+class TestDataCleaner(unittest.TestCase):
+    def test_normalize_folds_look_alikes_and_case(self):
+        self.assertEqual(normalize_text("ＧＭ  𝐉𝐮𝐩𝐢𝐭𝐞𝐫\n"), "gm jupiter")
+        self.assertEqual(normalize_text("LFG 🚀️"), normalize_text("lfg 🚀"))
+        self.assertEqual(normalize_text("Straße"), "strasse")
+
+    def test_entity_offsets_strip_urls_and_mentions(self):
+        text = "Big news @WereMeow https://t.co/abc123 wow"
+        entities = {
+            'mentions': [{'start': 9, 'end': 18, 'username': 'weremeow'}],
+            'urls': [{'start': 19, 'end': 38, 'url': 'https://t.co/abc123', 'expanded_url': 'https://jup.ag/blog'}],
+        }
+        cleaned = clean_text(text, entities)
+        self.assertEqual(cleaned.text, "big news @weremeow wow")
+        self.assertEqual(cleaned.content, "big news wow")
+        self.assertEqual(cleaned.urls, ['https://jup.ag/blog'])
+        self.assertEqual(cleaned.mentions, ['weremeow'])
+
+    def test_regex_fallback_when_offsets_missing_or_wrong(self):
+        text = "gm @Alice see https://t.co/x1 &amp; more"
+        wrong = {'mentions': [{'start': 0, 'end': 6, 'username': 'alice'}]}
+        for entities in (None, wrong):
+            cleaned = clean_text(text, entities)
+            self.assertEqual(cleaned.content, "gm see &amp; more")
+            self.assertEqual(cleaned.mentions, ['alice'])
+            self.assertEqual(cleaned.urls, ['https://t.co/x1'])
+
+    def test_clean_tweet_is_memoized(self):
+        tweet = {'id': '1', 'text': "GM @weremeow"}
+        cleaned = clean_tweet(tweet)
+        self.assertIs(tweet[CLEAN_KEY], cleaned)
+        self.assertIs(clean_tweet(tweet), cleaned)
+
+    def test_relevance_is_case_and_width_insensitive(self):
+        self.assertTrue(is_tweet_relevant("thanks @WEREMEOW"))
+        self.assertTrue(is_tweet_relevant("thanks ＠ｗｅｒｅｍｅｏｗ"))
+        self.assertFalse(is_tweet_relevant("nothing to see"))
+
+    def test_criteria_mtime_is_not_checked_per_tweet(self):
+        relevance_check._mentions_cache = None
+        with patch.object(relevance_check.os, 'stat', wraps=os.stat) as stat:
+            for _ in range(100):
+                is_tweet_relevant("thanks @weremeow")
+        self.assertEqual(stat.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# tests/test_engagement_classifier.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from src.agents.engagement_classifier import EngagementClassifier, FEATURES
+
+NOW = datetime(2024, 7, 3, 12, 0, 0)
+
+def organic_row(index):
+    tweet = {
+        'text': f"Thoughts on the roadmap, part {index}",
+        'public_metrics': {'like_count': 12, 'retweet_count': 1, 'reply_count': 2, 'quote_count': 0},
+        'entities': {'hashtags': [{'tag': 'J4J'}]},
+    }
+    user = {'id': f"organic{index}", 'created_at': NOW - timedelta(days=1500), 'follower_count': 800}
+    return tweet, user, NOW - timedelta(hours=index)
+
+def farm_row(index):
+    tweet = {
+        'text': f"@friend{index} LFG airdrop now https://t.co/x{index} #J4J #PPP #airdrop #free",
+        'public_metrics': {'like_count': 3, 'retweet_count': 40, 'reply_count': 5, 'quote_count': 2},
+        'entities': {'mentions': [{'username': 'a'}, {'username': 'b'}, {'username': 'c'}],
+                     'hashtags': [{'tag': 'J4J'}, {'tag': 'PPP'}, {'tag': 'airdrop'}, {'tag': 'free'}]},
+    }
+    user = {'id': 'farm', 'created_at': NOW - timedelta(days=5), 'follower_count': 12}
+    return tweet, user, NOW - timedelta(seconds=30 * index)
+
+class TestEngagementClassifier(unittest.TestCase):
+    def setUp(self):
+        self.classifier = EngagementClassifier({})
+
+    def test_features_shape_and_history(self):
+        features = self.classifier.build_features([farm_row(i) for i in range(4)])
+        self.assertEqual(features.shape, (4, len(FEATURES)))
+        duplicates = features[:, FEATURES.index('log_duplicate_count')]
+        # URLs and mentions are ignored, so the copies count up 0, 1, 2, 3
+        np.testing.assert_allclose(np.expm1(duplicates), [0, 1, 2, 3])
+        gaps = np.expm1(features[:, FEATURES.index('log_seconds_since_prev')])
+        np.testing.assert_allclose(gaps[1:], [30, 30, 30], rtol=1e-6)
+
+    def test_classify_separates_farm_from_organic(self):
+        rows = [organic_row(i) for i in range(5)] + [farm_row(i) for i in range(5)]
+        probabilities, labels = self.classifier.classify(rows)
+        self.assertTrue((probabilities[:5] < 0.5).all())
+        self.assertTrue((probabilities[5:] >= 0.8).all())
+        self.assertEqual(labels[:5], ['organic'] * 5)
+        self.assertEqual(labels[5:], ['farm'] * 5)
+        self.assertEqual(self.classifier.classify([])[1], [])
+
+    def test_refetched_tweet_keeps_its_score(self):
+        rows = []
+        for index in range(3):
+            tweet, user, created_at = organic_row(index)
+            tweet['id'] = str(1000 + index)
+            rows.append((tweet, dict(user, id='organic'), created_at))
+        first, first_labels = self.classifier.classify(rows)
+        second, second_labels = self.classifier.classify(rows)
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first_labels, second_labels)
+
+    def test_fit_learns_from_labels(self):
+        rows = [organic_row(i) for i in range(20)] + [farm_row(i) for i in range(20)]
+        features = EngagementClassifier({}).build_features(rows)
+        targets = np.array([0] * 20 + [1] * 20)
+        model = self.classifier.fit(features, targets)
+        self.assertEqual(set(model['weights']), set(FEATURES))
+        predictions = self.classifier.predict_proba(features) >= 0.5
+        np.testing.assert_array_equal(predictions, targets.astype(bool))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+# tests/test_fast_decode.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from datetime import datetime
+from src.utils.fast_decode import loads, parse_twitter_timestamp
+
+class TestFastDecode(unittest.TestCase):
+    def test_parse_twitter_timestamp(self):
+        for value in ["2024-07-03T03:05:34.000Z", "2024-07-03T03:05:34.123Z", "2024-07-03T03:05:34.123456Z"]:
+            self.assertEqual(parse_twitter_timestamp(value), datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ"))
+
+    def test_parse_twitter_timestamp_rejects_other_formats(self):
+        with self.assertRaises(ValueError):
+            parse_twitter_timestamp("2024-07-03 03:05:34")
+
+    def test_loads_bytes_and_str(self):
+        self.assertEqual(loads(b'{"data": [{"id": "1"}]}'), {'data': [{'id': '1'}]})
+        self.assertEqual(loads('{"meta": {"result_count": 0}}'), {'meta': {'result_count': 0}})
+
+if __name__ == '__main__':
+    unittest.main()
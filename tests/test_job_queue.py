@@ -0,0 +1,109 @@
+# tests/test_job_queue.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from src.database.job_queue import JobWorker, build_fetcher_handlers, retry_delay, JOB_FETCH_TIMELINE, JOB_EMBED
+
+class FakeJobQueue:
+    """In-memory queue with the JobQueue claim/complete/fail contract."""
+
+    def __init__(self, jobs):
+        self.pending = list(jobs)
+        self.done = []
+        self.failed = []
+        self.maintenance = 0
+
+    async def claim(self, worker_id, job_types, limit, lease_seconds):
+        job_types = list(job_types)
+        claimed = [job for job in self.pending if job['job_type'] in job_types][:limit]
+        for job in claimed:
+            self.pending.remove(job)
+            job['attempts'] += 1
+        return claimed
+
+    async def extend_lease(self, job_id, worker_id, lease_seconds):
+        return True
+
+    async def complete(self, job_id, worker_id):
+        self.done.append(job_id)
+        return True
+
+    async def fail(self, job_id, worker_id, error, attempts, max_attempts):
+        self.failed.append((job_id, error))
+        return True
+
+    async def reap_expired(self):
+        self.maintenance += 1
+        return 1
+
+    async def purge_finished(self, older_than_hours):
+        return 0
+
+def make_job(job_id, job_type, payload):
+    return {'id': job_id, 'job_type': job_type, 'payload': payload, 'attempts': 0, 'max_attempts': 3}
+
+class TestJobWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_runs_handlers_and_records_failures(self):
+        seen = []
+
+        async def fetch_timeline(payload):
+            seen.append(payload['account_id'])
+
+        async def embed(payload):
+            raise RuntimeError("vector db down")
+
+        queue = FakeJobQueue([make_job(i, JOB_FETCH_TIMELINE, {'account_id': str(i)}) for i in range(5)]
+                             + [make_job(99, JOB_EMBED, {'tweet_ids': ['1']})])
+        worker = JobWorker(queue, {JOB_FETCH_TIMELINE: fetch_timeline, JOB_EMBED: embed}, concurrency=2, poll_interval=0.01)
+        task = asyncio.create_task(worker.run())
+        while queue.pending or worker._in_flight:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await task
+
+        self.assertEqual(sorted(seen), ['0', '1', '2', '3', '4'])
+        self.assertEqual(sorted(queue.done), [0, 1, 2, 3, 4])
+        self.assertEqual(queue.failed, [(99, "vector db down")])
+        self.assertEqual(worker.counters, {'claimed': 6, 'completed': 5, 'failed': 1, 'reaped': 1, 'purged': 0})
+
+    async def test_maintenance_runs_periodically(self):
+        queue = FakeJobQueue([])
+        worker = JobWorker(queue, {}, poll_interval=0.01, maintenance_interval=0.05)
+        task = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.2)
+        worker.stop()
+        await task
+
+        self.assertGreaterEqual(queue.maintenance, 2)
+        self.assertEqual(worker.counters['reaped'], queue.maintenance)
+
+def run_metrics(fetch_errors=0, pages=1, persist_errors=0):
+    return {'fetch': {'errors': fetch_errors, 'items_out': pages}, 'persist': {'errors': persist_errors}}
+
+class TestFetcherHandlers(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_fetches_fail_the_job(self):
+        fetcher = AsyncMock()
+        handler = build_fetcher_handlers(fetcher)[JOB_FETCH_TIMELINE]
+        # Nothing new since the last poll is not a failure
+        for metrics in (run_metrics(), run_metrics(pages=0)):
+            fetcher.process_accounts.return_value = metrics
+            await handler({'account_id': '1'})
+        for metrics in (run_metrics(fetch_errors=1, pages=0), run_metrics(persist_errors=3)):
+            fetcher.process_accounts.return_value = metrics
+            with self.assertRaises(RuntimeError):
+                await handler({'account_id': '1'})
+
+class TestRetryDelay(unittest.TestCase):
+    def test_retry_delay_is_capped_exponential(self):
+        for attempts in range(1, 12):
+            delay = retry_delay(attempts, base=10, cap=300)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(300, 10 * 2 ** (attempts - 1)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# tests/test_logging_config.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import json
+import logging
+import unittest
+from src.utils.logging_config import RateLimitFilter, configure_logging, shutdown_logging
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_record(msg, *args, lineno=1, **extra):
+    record = logging.LogRecord('test', logging.INFO, __file__, lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+class TestRateLimitFilter(unittest.TestCase):
+    def test_burst_then_rate_with_suppressed_count(self):
+        clock = FakeClock()
+        limiter = RateLimitFilter(rate=1, burst=2, clock=clock)
+        passed = [limiter.filter(make_record("Processed tweet %s", i)) for i in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        # Another call site has its own bucket
+        self.assertTrue(limiter.filter(make_record("Rescored %d tweets", 1, lineno=2)))
+
+        clock.now += 1
+        record = make_record("Processed tweet %s", 5)
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual((record.suppressed, limiter.dropped), (3, 3))
+
+    def test_sampling_keeps_one_in_n(self):
+        limiter = RateLimitFilter(rate=0)
+        records = [make_record("Processed tweet %s", i, sample_every=3) for i in range(7)]
+        kept = [record for record in records if limiter.filter(record)]
+        self.assertEqual(len(kept), 3)
+        self.assertEqual(kept[0].sampled, 3)
+
+    def test_formatted_messages_share_their_call_site_bucket(self):
+        clock = FakeClock()
+        limiter = RateLimitFilter(rate=1, burst=2, idle_seconds=60, clock=clock)
+        passed = [limiter.filter(make_record(f"Processed tweet {i}")) for i in range(1000)]
+        self.assertEqual((passed.count(True), len(limiter.sites)), (2, 1))
+
+    def test_idle_call_sites_are_evicted(self):
+        clock = FakeClock()
+        limiter = RateLimitFilter(rate=1, burst=2, idle_seconds=60, clock=clock)
+        for lineno in range(1, 101):
+            limiter.filter(make_record("Fetched page", lineno=lineno))
+        self.assertEqual(len(limiter.sites), 100)
+
+        clock.now += 30
+        limiter.filter(make_record("Fetched page", lineno=1))
+        clock.now += 31
+        limiter.filter(make_record("Fetched page", lineno=1))
+        self.assertEqual(list(limiter.sites), [('test', __file__, 1)])
+
+class TestConfigureLogging(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = (list(root.handlers), root.level)
+
+    def tearDown(self):
+        shutdown_logging()
+        root = logging.getLogger()
+        root.handlers[:] = self.saved[0]
+        root.setLevel(self.saved[1])
+
+    def test_json_records_carry_extra_fields(self):
+        stream = io.StringIO()
+        listener = configure_logging(level='INFO', fmt='json', stream=stream)
+        self.assertIs(configure_logging(), listener)
+        logger = logging.getLogger('test.logging_config')
+        logger.debug("Query executed in %.3f seconds", 0.5)
+        logger.info("Processed tweet %s", '42', extra={'tweet_id': '42', 'username': 'alice'})
+        shutdown_logging()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        entry = json.loads(lines[0])
+        self.assertEqual((entry['level'], entry['logger'], entry['message']), ('INFO', 'test.logging_config', 'Processed tweet 42'))
+        self.assertEqual((entry['tweet_id'], entry['username']), ('42', 'alice'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_membership_filters.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock
+from src.utils.bloom_filter import BloomFilter
+from src.database.membership_filters import MembershipFilters
+from src.database.sql_db_manager import SQLDBManager
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, count):
+        chunk, self.rows = self.rows[:count], self.rows[count:]
+        return chunk
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        yield
+
+    async def cursor(self, query, *args):
+        self.db.scans.append((query, args))
+        if 'user_wallets' in query:
+            return FakeCursor([(wallet,) for wallet in self.db.wallets])
+        return FakeCursor([(tweet_id,) for tweet_id, updated_at in self.db.tweets.items() if not args or updated_at >= args[0]])
+
+class FakePool:
+    def __init__(self, db):
+        self.db = db
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self.db)
+
+class FakeDBManager:
+    def __init__(self, tweets, wallets, now):
+        self.tweets = tweets
+        self.wallets = wallets
+        self.now = now
+        self.scans = []
+        self.pool = FakePool(self)
+
+    async def execute_query(self, query, *args):
+        if 'COUNT' in query:
+            return [{'count': len(self.wallets if 'user_wallets' in query else self.tweets)}]
+        return [{'seeded_at': self.now}]
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(10000, error_rate=0.01)
+        bloom.add_many(range(10000))
+        self.assertTrue(bloom.contains_many(range(10000)).all())
+        false_positives = bloom.contains_many(range(10000, 30000)).mean()
+        self.assertLess(false_positives, 0.02)
+        self.assertIn('42', bloom)
+
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), 'bloom.npz')
+        bloom = BloomFilter(1000)
+        bloom.add_many(['a', 'b'])
+        bloom.save(path)
+        loaded = BloomFilter.load(path)
+        self.assertEqual((loaded.count, loaded.num_hashes), (2, bloom.num_hashes))
+        self.assertEqual(loaded.contains_many(['a', 'b', 'c']).tolist(), [True, True, False])
+
+class TestMembershipFilters(unittest.IsolatedAsyncioTestCase):
+    async def test_saved_filter_is_topped_up_incrementally(self):
+        directory = tempfile.mkdtemp()
+        db = FakeDBManager({1: datetime(2024, 7, 1), 2: datetime(2024, 7, 2)}, ['walletA'], now=datetime(2024, 7, 3))
+        filters = MembershipFilters(db, directory)
+        await filters.seed()
+        self.assertEqual(filters.new_tweets(['1', '2', '3']), [False, False, True])
+        filters.save()
+
+        db.tweets[3] = datetime(2024, 7, 4)
+        restarted = MembershipFilters(db, directory)
+        await restarted.seed()
+        self.assertEqual(db.scans[-1][1], (datetime(2024, 7, 3),))
+        self.assertEqual(restarted.new_tweets(['1', '3', '4']), [False, False, True])
+
+    async def test_wallet_check_skips_postgres_on_filter_miss(self):
+        db = SQLDBManager()
+        db.execute_query = AsyncMock(return_value=[{'exists': True}])
+        db.membership = MembershipFilters(FakeDBManager({}, ['walletA'], now=datetime(2024, 7, 3)), tempfile.mkdtemp())
+        await db.membership.seed()
+
+        self.assertFalse(await db.check_wallet_exists('walletB'))
+        db.execute_query.assert_not_called()
+        self.assertTrue(await db.check_wallet_exists('walletA'))
+        db.execute_query.assert_called_once()
+
+    async def test_batch_reports_which_new_looking_tweets_were_inserted(self):
+        db = SQLDBManager()
+        # 2 was written by another process since seeding; 3 was too, and is unchanged
+        db.execute_query = AsyncMock(return_value=[{'id': 1, 'inserted': True}, {'id': 2, 'inserted': False}])
+        tweets = [{'id': str(tweet_id), 'user_id': '7', 'content': 'gm', 'created_at': datetime(2024, 7, 3),
+                   'is_relevant': True, 'engagement_score': 1.0} for tweet_id in (1, 2, 3, 1)]
+
+        self.assertEqual(await db.insert_new_tweets(tweets), {'1': True, '2': False, '3': False})
+        columns = db.execute_query.call_args.args[1:]
+        self.assertEqual((len(columns), columns[0]), (11, [1, 2, 3]))
+        stats = db.tweet_write_stats()
+        self.assertEqual((stats['inserted'], stats['updated'], stats['unchanged']), (1, 1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
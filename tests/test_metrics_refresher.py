@@ -0,0 +1,98 @@
+# tests/test_metrics_refresher.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from src.data_ingestion.metrics_refresher import MetricsRefresher
+
+NOW = datetime(2024, 7, 10, 12, tzinfo=timezone.utc).timestamp()
+
+def naive(hours_ago):
+    return datetime(2024, 7, 10, 12) - timedelta(hours=hours_ago)
+
+class FakeClock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+class FakeFetcher:
+    def __init__(self, totals):
+        self.totals = totals
+        self.calls = []
+
+    async def fetch_tweets_by_ids(self, tweet_ids):
+        self.calls.append(list(tweet_ids))
+        return {'data': [{'id': tweet_id, 'public_metrics': {'like_count': self.totals[tweet_id]}}
+                         for tweet_id in tweet_ids if tweet_id in self.totals]}
+
+class FakeDBManager:
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+
+    async def get_refresh_candidates(self, created_since):
+        return [row for row in self.rows if row['created_at'] >= created_since]
+
+    async def update_tweet_metrics(self, rows):
+        self.updates.extend(rows)
+
+def row(tweet_id, hours_ago, total=None, checked_hours_ago=None):
+    return {'id': tweet_id, 'created_at': naive(hours_ago), 'metrics_total': total,
+            'metrics_refreshed_at': naive(checked_hours_ago) if checked_hours_ago is not None else None}
+
+CONFIG = {'calls_per_window': 2, 'window_seconds': 900, 'batch_size': 2, 'min_change': 5, 'decay_hours': 24}
+
+class TestMetricsRefresher(unittest.IsolatedAsyncioTestCase):
+    async def test_most_overdue_tweets_go_first_within_budget(self):
+        rows = [row('old_quiet', 100, total=10, checked_hours_ago=1), row('young_busy', 2, total=500, checked_hours_ago=0.5),
+                row('unseen', 1), row('mid', 20, total=300, checked_hours_ago=2), row('ancient', 200, total=5)]
+        clock = FakeClock()
+        fetcher = FakeFetcher({'old_quiet': 10, 'young_busy': 900, 'unseen': 3, 'mid': 320})
+        db = FakeDBManager(rows)
+        refresher = MetricsRefresher(fetcher, db, CONFIG, clock=clock)
+
+        stats = await refresher.run_once()
+
+        # Busy tweets checked a while ago are overdue, tweets without a baseline are due now, and the
+        # quiet old one isn't due but fills the last call; ancient is out of range
+        self.assertEqual(fetcher.calls, [['mid', 'young_busy'], ['unseen', 'old_quiet']])
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(sorted(update[0] for update in db.updates), ['mid', 'unseen', 'young_busy'])
+        self.assertNotIn('ancient', refresher.tracked)
+
+        # Budget spent for this window
+        self.assertEqual((await refresher.run_once())['calls'], 0)
+
+    async def test_velocity_sets_the_next_refresh(self):
+        clock = FakeClock()
+        fetcher = FakeFetcher({'fast': 100, 'slow': 100})
+        refresher = MetricsRefresher(fetcher, FakeDBManager([row('fast', 3, total=50, checked_hours_ago=1),
+                                                             row('slow', 3, total=99, checked_hours_ago=1)]),
+                                     CONFIG, clock=clock)
+        await refresher.run_once()
+        fast, slow = refresher.tracked['fast'], refresher.tracked['slow']
+        self.assertGreater(fast.rate, slow.rate)
+        self.assertLess(fast.due, slow.due)
+        self.assertLessEqual(slow.due - NOW, 24 * 3600)
+
+    async def test_failed_lookup_keeps_tweets_due_and_missing_ones_are_dropped(self):
+        clock = FakeClock()
+        fetcher = FakeFetcher({'a': 1})
+        refresher = MetricsRefresher(fetcher, FakeDBManager([row('a', 1), row('deleted', 1)]), CONFIG, clock=clock)
+
+        async def unavailable(tweet_ids):
+            return None
+        fetcher.fetch_tweets_by_ids, working = unavailable, fetcher.fetch_tweets_by_ids
+        self.assertEqual((await refresher.run_once())['refreshed'], 0)
+        fetcher.fetch_tweets_by_ids = working
+        stats = await refresher.run_once()
+        self.assertEqual((stats['refreshed'], stats['missing']), (1, 1))
+        self.assertIn('deleted', refresher.gone)
+
+if __name__ == '__main__':
+    unittest.main()
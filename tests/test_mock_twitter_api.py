@@ -0,0 +1,59 @@
+# tests/test_mock_twitter_api.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+from benchmarks.mock_twitter_api import MockTwitterAPI, start_server
+from benchmarks.in_memory_db import InMemoryDBManager, NullVectorDBManager
+from src.data_ingestion.twitter_fetcher import TwitterFetcher
+
+class TestMockTwitterAPI(unittest.IsolatedAsyncioTestCase):
+    async def start(self, **kwargs):
+        self.api = MockTwitterAPI(timeline_length=30, **kwargs)
+        self.runner, base_url = await start_server(self.api)
+        self.addAsyncCleanup(self.runner.cleanup)
+        self.fetcher = TwitterFetcher(InMemoryDBManager(), vector_db_manager=NullVectorDBManager(), base_url=base_url)
+
+    async def test_paginated_timeline(self):
+        await self.start()
+        first = await self.fetcher.fetch_user_tweets('42', max_results=20)
+        self.assertEqual(len(first['data']), 20)
+        self.assertEqual(first['includes']['users'][0]['id'], '42')
+        self.assertEqual(first['meta']['next_token'], '20')
+
+        again = await self.fetcher.fetch_user_tweets('42', max_results=20)
+        self.assertEqual(first, again)
+
+    async def test_rate_limit_waits_until_reset(self):
+        await self.start(rate_limits={'user_tweets': 1}, window_seconds=1)
+        await self.fetcher.fetch_user_tweets('1')
+        with patch('src.data_ingestion.twitter_fetcher.asyncio.sleep') as mock_sleep:
+            mock_sleep.return_value = None
+            result = await self.fetcher.fetch_user_tweets('1')
+        self.assertIsNone(result)
+        self.assertEqual(self.api.stats['rate_limited'], 3)
+        self.assertTrue(all(1 <= call.args[0] <= 2 for call in mock_sleep.call_args_list))
+
+    async def test_error_injection(self):
+        await self.start(error_rate=1.0)
+        with patch('src.utils.resilience.asyncio.sleep') as mock_sleep:
+            mock_sleep.return_value = None
+            self.assertIsNone(await self.fetcher.fetch_user_tweets('1'))
+        # 5xx is transient: retried with backoff until the circuit opens
+        self.assertEqual(self.api.stats['errors'], 3)
+        self.assertEqual(self.fetcher.api_guard.stats()['state'], 'open')
+        self.assertIsNone(await self.fetcher.fetch_user_tweets('1'))
+        self.assertEqual(self.api.stats['errors'], 3)
+        self.assertEqual(self.fetcher.api_guard.stats()['short_circuited'], 1)
+
+    async def test_process_accounts_against_mock(self):
+        await self.start()
+        metrics = await self.fetcher.process_accounts(['1', '2', '3'])
+        self.assertEqual(len(self.fetcher.sql_db_manager.tweets), 90)
+        self.assertEqual(metrics['persist']['items_out'], 90)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_parquet_exporter.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from src.database import parquet_exporter
+from src.database.parquet_exporter import ParquetExporter, EXPORT_TABLES, load_watermarks
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, count):
+        chunk, self.rows = self.rows[:count], self.rows[count:]
+        return chunk
+
+class FakeConnection:
+    """Serves tweets rows, applying the watermark bounds of the exporter's queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        self.transaction_args = kwargs
+        yield
+
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        return max((row[-1] for row in self.rows), default=None)
+
+    async def cursor(self, query, *args):
+        self.queries.append(query)
+        upper, lower = args[0], args[1] if len(args) > 1 else None
+        return FakeCursor([row for row in self.rows if row[-1] <= upper and (lower is None or row[-1] > lower)])
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+class FakeDBManager:
+    def __init__(self, rows):
+        self.pool = FakePool(FakeConnection(rows))
+
+def tweet_row(tweet_id, day, updated_minute):
+    return (tweet_id, 7, f"gm {tweet_id}", datetime(2024, 7, day, 12), True, 1.5, 0.25, 0.1, 'organic',
+            datetime(2024, 7, 5, 0, updated_minute))
+
+@unittest.skipIf(parquet_exporter.pa is None, "pyarrow is not installed")
+class TestParquetExporter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    async def test_partitioned_export_with_explicit_schema(self):
+        import pyarrow.parquet as pq
+        db = FakeDBManager([tweet_row(1, 3, 0), tweet_row(2, 4, 1), tweet_row(3, 3, 2)])
+        summary = await ParquetExporter(db, self.output_dir, chunk_size=2).export(['tweets'])
+
+        self.assertEqual(summary['tweets']['rows'], 3)
+        self.assertEqual([os.path.basename(os.path.dirname(path)) for path in summary['tweets']['files']],
+                         ['created_date=2024-07-03', 'created_date=2024-07-04'])
+        table = pq.read_table(summary['tweets']['files'][0])
+        self.assertEqual(table.schema, EXPORT_TABLES['tweets'].schema())
+        self.assertEqual(table.column('id').to_pylist(), [1, 3])
+        # One row group per cursor chunk
+        self.assertEqual(pq.ParquetFile(summary['tweets']['files'][0]).num_row_groups, 2)
+        self.assertEqual(db.pool.conn.transaction_args, {'isolation': 'repeatable_read', 'readonly': True})
+
+    async def test_incremental_export_resumes_from_watermark(self):
+        db = FakeDBManager([tweet_row(1, 3, 0), tweet_row(2, 3, 1)])
+        exporter = ParquetExporter(db, self.output_dir)
+        await exporter.export(['tweets'])
+        self.assertEqual(load_watermarks(self.output_dir)['tweets'], datetime(2024, 7, 5, 0, 1))
+
+        # Nothing new: no files and the watermark stays put
+        summary = await exporter.export(['tweets'])
+        self.assertEqual(summary['tweets']['rows'], 0)
+
+        db.pool.conn.rows.append(tweet_row(1, 3, 5))
+        summary = await exporter.export(['tweets'])
+        self.assertEqual(summary['tweets']['rows'], 1)
+        self.assertIn('updated_at > $2', db.pool.conn.queries[-1])
+        self.assertEqual(load_watermarks(self.output_dir)['tweets'], datetime(2024, 7, 5, 0, 5))
+
+        summary = await exporter.export(['tweets'], full=True)
+        self.assertEqual(summary['tweets']['rows'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+# tests/test_pipeline.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch, AsyncMock
+from src.data_ingestion.twitter_fetcher import TwitterFetcher
+from src.data_ingestion.pipeline import StageConfig
+
+class FakeDBManager:
+    def __init__(self):
+        self.users = {}
+        self.tweets = {}
+
+    async def insert_or_update_user(self, user_data):
+        self.users[user_data['id']] = user_data
+        return user_data['id']
+
+    async def insert_tweet(self, tweet_data, with_status=False):
+        inserted = tweet_data['id'] not in self.tweets
+        self.tweets[tweet_data['id']] = tweet_data
+        return (tweet_data['id'], inserted) if with_status else tweet_data['id']
+
+    def new_tweet_flags(self, tweet_ids):
+        return [False] * len(tweet_ids)
+
+    async def upsert_term_counts(self, rows):
+        pass
+
+    async def upsert_user_profiles(self, rows):
+        self.profile_rows = rows
+
+    async def get_user_profiles(self):
+        return []
+
+def make_page(user_id, count):
+    return {
+        'data': [{
+            'id': f"{user_id}{i:04d}",
+            'text': f"tweet {i} from {user_id} @weremeow",
+            'created_at': "2024-07-03T03:05:34.000Z",
+            'author_id': user_id,
+            'public_metrics': {'like_count': i}
+        } for i in range(count)],
+        'includes': {'users': [{
+            'id': user_id,
+            'username': f"user{user_id}",
+            'created_at': "2020-01-01T00:00:00.000Z",
+            'public_metrics': {'followers_count': 10}
+        }]}
+    }
+
+class TestIngestionPipeline(unittest.IsolatedAsyncioTestCase):
+    @patch('src.data_ingestion.twitter_fetcher.VectorDBManager')
+    def setUp(self, mock_vector_db):
+        self.db = FakeDBManager()
+        self.fetcher = TwitterFetcher(self.db)
+
+    async def test_accounts_flow_through_all_stages(self):
+        pages = {'1': make_page('1', 30), '2': make_page('2', 20), '3': None}
+        self.fetcher.fetch_user_tweets = AsyncMock(side_effect=lambda account_id: pages[account_id])
+        self.fetcher.embed_tweets = AsyncMock()
+
+        pipeline = self.fetcher.create_pipeline({
+            'persist': StageConfig(workers=2, batch_size=7, queue_size=5),
+            'relevance': StageConfig(workers=3, batch_size=4, queue_size=2),
+        })
+        metrics = await pipeline.run(account_ids=['1', '2', '3'])
+
+        self.assertEqual(len(self.db.tweets), 50)
+        self.assertEqual(set(self.db.users), {'1', '2'})
+        self.assertTrue(all(tweet['is_relevant'] for tweet in self.db.tweets.values()))
+        self.assertEqual(metrics['fetch']['items_in'], 3)
+        self.assertEqual(metrics['persist']['items_out'], 50)
+        self.assertEqual(metrics['embed']['items_in'], 50)
+        self.assertLessEqual(metrics['relevance']['max_queue_depth'], 2)
+        self.assertEqual(self.fetcher.term_counter.pending_count, 0)
+        self.assertEqual(sorted((row[0], row[1]) for row in self.db.profile_rows), [(1, 30), (2, 20)])
+
+    async def test_stop_drains_without_new_fetches(self):
+        self.fetcher.fetch_user_tweets = AsyncMock(side_effect=lambda account_id: make_page(account_id, 5))
+        self.fetcher.embed_tweets = AsyncMock()
+        # Concurrent jobs each run their own pipeline; stop() reaches all of them
+        pipelines = [self.fetcher.create_pipeline(), self.fetcher.create_pipeline()]
+        self.fetcher.stop()
+        for pipeline in pipelines:
+            metrics = await pipeline.run(account_ids=['1', '2'])
+            self.assertEqual(metrics['fetch']['items_in'], 0)
+        self.assertEqual(self.db.tweets, {})
+
+    async def test_overflowing_page_is_followed_back_to_since_id(self):
+        newer, older = make_page('1', 10), make_page('1', 25)
+        older['data'] = older['data'][10:]
+        newer['meta'] = {'newest_id': newer['data'][0]['id'], 'next_token': 'p2'}
+        older['meta'] = {'newest_id': older['data'][0]['id']}
+        self.fetcher.fetch_user_tweets = AsyncMock(side_effect=[newer, older])
+        self.fetcher.embed_tweets = AsyncMock()
+        self.fetcher.since_ids = {'1': '900'}
+        self.fetcher.page_sizes = {'1': 10}
+
+        pipeline = self.fetcher.create_pipeline()
+        await pipeline.run(account_ids=['1'])
+
+        self.assertEqual(len(self.db.tweets), 25)
+        self.assertEqual(pipeline.fetch_counts['1'], 25)
+        self.assertEqual(self.fetcher.since_ids['1'], newer['data'][0]['id'])
+        self.assertEqual(self.fetcher.fetch_user_tweets.call_args_list[1].kwargs,
+                         {'since_id': '900', 'max_results': 100, 'pagination_token': 'p2'})
+
+    async def test_failed_follow_up_page_keeps_since_id(self):
+        newer = make_page('1', 10)
+        newer['meta'] = {'newest_id': newer['data'][0]['id'], 'next_token': 'p2'}
+        self.fetcher.fetch_user_tweets = AsyncMock(side_effect=[newer, None])
+        self.fetcher.embed_tweets = AsyncMock()
+        self.fetcher.since_ids = {'1': '900'}
+
+        pipeline = self.fetcher.create_pipeline()
+        await pipeline.run(account_ids=['1'])
+
+        self.assertEqual(len(self.db.tweets), 10)
+        self.assertEqual(self.fetcher.since_ids['1'], '900')
+        # Not reported as a poll that found 10, nor as an empty one
+        self.assertNotIn('1', pipeline.fetch_counts)
+
+    async def test_since_id_waits_for_every_tweet_to_persist(self):
+        pages = {'1': make_page('1', 5), '2': make_page('2', 5)}
+        for page in pages.values():
+            page['meta'] = {'newest_id': page['data'][0]['id']}
+        self.fetcher.fetch_user_tweets = AsyncMock(side_effect=lambda account_id, **kwargs: pages[account_id])
+        self.fetcher.embed_tweets = AsyncMock()
+        self.fetcher.since_ids = {}
+        insert_tweet = self.db.insert_tweet
+
+        async def failing_insert(tweet_data, with_status=False):
+            if tweet_data['id'] == '20003':
+                return (None, False) if with_status else None
+            return await insert_tweet(tweet_data, with_status)
+
+        self.db.insert_tweet = failing_insert
+        await self.fetcher.create_pipeline().run(account_ids=['1', '2'])
+
+        self.assertEqual(self.fetcher.since_ids, {'1': '10000'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# tests/test_poll_scheduler.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import unittest
+from datetime import datetime, timezone
+from src.data_ingestion.poll_scheduler import AdaptivePollScheduler
+
+NOW = datetime(2024, 7, 10, 12, tzinfo=timezone.utc).timestamp()
+
+class FakeClock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+class FakePipeline:
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self.fetch_counts = {}
+
+    async def run(self, account_ids=None):
+        self.fetcher.polled.append(list(account_ids))
+        self.fetch_counts = {account_id: self.fetcher.counts.get(account_id, 0) for account_id in account_ids
+                             if account_id not in self.fetcher.failing}
+
+class FakeFetcher:
+    def __init__(self):
+        self.since_ids = None
+        self.page_sizes = {}
+        self.counts = {}
+        self.failing = set()
+        self.polled = []
+
+    def create_pipeline(self):
+        return FakePipeline(self)
+
+    def stop(self):
+        pass
+
+class FakeDBManager:
+    def __init__(self, tweet_counts):
+        self.tweet_counts = tweet_counts
+
+    async def get_posting_stats(self, user_ids, since):
+        return [{'user_id': user_id, 'tweet_count': count, 'last_tweet_at': None}
+                for user_id, count in self.tweet_counts.items() if user_id in user_ids]
+
+CONFIG = {'target_new_tweets': 5, 'min_interval_minutes': 5, 'max_interval_hours': 12, 'jitter': 0.0,
+          'lookback_days': 14, 'prior_tweets_per_day': 1.0, 'prior_days': 1.0, 'smoothing': 0.5}
+
+class TestAdaptivePollScheduler(unittest.IsolatedAsyncioTestCase):
+    async def start(self, tweet_counts):
+        self.clock = FakeClock()
+        self.fetcher = FakeFetcher()
+        scheduler = AdaptivePollScheduler(self.fetcher, FakeDBManager(tweet_counts), CONFIG,
+                                          clock=self.clock, rng=random.Random(7))
+        await scheduler.set_accounts(tweet_counts)
+        # First polls are staggered within min_interval and only set since_id
+        self.clock.now += 300
+        self.assertEqual(await scheduler.run_once(), len(tweet_counts))
+        return scheduler
+
+    async def test_busy_accounts_are_polled_sooner_with_larger_pages(self):
+        scheduler = await self.start({'busy': 280, 'quiet': 0, 'firehose': 100000})
+        self.assertEqual(self.fetcher.since_ids, {})
+        busy, quiet, firehose = (scheduler.accounts[name] for name in ('busy', 'quiet', 'firehose'))
+
+        self.assertLess(busy.next_poll, quiet.next_poll)
+        self.assertGreater(busy.page_size, quiet.page_size)
+        # Both ends are clamped
+        self.assertEqual(quiet.next_poll - self.clock.now, 12 * 3600)
+        self.assertEqual(quiet.page_size, 5)
+        self.assertEqual(firehose.next_poll - self.clock.now, 300)
+        self.assertEqual(self.fetcher.page_sizes, {'busy': busy.page_size, 'quiet': 5, 'firehose': firehose.page_size})
+        self.assertEqual(await scheduler.run_once(), 0)
+        self.clock.now += 300
+        self.assertEqual(await scheduler.run_once(), 1)
+        self.assertEqual(self.fetcher.polled[-1], ['firehose'])
+
+    async def test_report_compares_predicted_and_actual(self):
+        scheduler = await self.start({'busy': 280})
+        busy = scheduler.accounts['busy']
+        predicted, rate = busy.predicted, busy.rate
+        self.clock.now = busy.next_poll
+        self.fetcher.counts = {'busy': 8}
+
+        await scheduler.run_once()
+
+        report = scheduler.report()
+        self.assertEqual((report['polls'], report['actual']), (1, 8))
+        self.assertAlmostEqual(report['predicted'], predicted, places=2)
+        self.assertAlmostEqual(report['mean_abs_error'], 8 - predicted, places=2)
+        self.assertGreater(busy.rate, rate)
+
+    async def test_full_page_never_lowers_the_rate(self):
+        scheduler = await self.start({'busy': 280})
+        busy = scheduler.accounts['busy']
+        rate = busy.rate
+        # Polled late and the page came back full: a lower bound, not a measurement
+        self.clock.now = busy.next_poll + 3 * 86400
+        self.fetcher.counts = {'busy': busy.page_size}
+
+        await scheduler.run_once()
+
+        self.assertGreaterEqual(busy.rate, rate)
+        self.assertEqual(scheduler.report()['saturated_polls'], 1)
+
+    async def test_failed_poll_is_not_an_empty_poll(self):
+        scheduler = await self.start({'busy': 280})
+        busy = scheduler.accounts['busy']
+        rate, last_polled = busy.rate, busy.last_polled
+        self.clock.now = busy.next_poll
+        self.fetcher.failing = {'busy'}
+
+        self.assertEqual(await scheduler.run_once(), 1)
+
+        report = scheduler.report()
+        self.assertEqual((report['polls'], report['empty_polls'], report['failed_polls']), (0, 0, 1))
+        self.assertEqual((busy.rate, busy.last_polled), (rate, last_polled))
+        self.assertGreater(busy.next_poll, self.clock.now)
+        # The retry is expected to find everything since the last successful poll
+        self.assertAlmostEqual(busy.predicted, rate * (busy.next_poll - last_polled))
+
+if __name__ == '__main__':
+    unittest.main()
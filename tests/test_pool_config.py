@@ -0,0 +1,92 @@
+# tests/test_pool_config.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import unittest
+from src.database.pool_config import InstrumentedPool, pool_settings_from_env, server_settings
+
+class FakeConnection:
+    async def fetchval(self, query):
+        return 1
+
+class FakePool:
+    """Hands out up to max_size connections; later callers wait for a release."""
+
+    def __init__(self, min_size=1, max_size=2):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle = []
+        self.opened = 0
+        self.released = asyncio.Condition()
+
+    async def acquire(self, timeout=None):
+        async with self.released:
+            await self.released.wait_for(lambda: self.idle or self.opened < self.max_size)
+            if self.idle:
+                return self.idle.pop()
+            self.opened += 1
+            return FakeConnection()
+
+    async def release(self, conn):
+        async with self.released:
+            self.idle.append(conn)
+            self.released.notify()
+
+    def get_size(self):
+        return self.opened
+
+    def get_idle_size(self):
+        return len(self.idle)
+
+    def get_min_size(self):
+        return self.min_size
+
+    def get_max_size(self):
+        return self.max_size
+
+class TestPoolSettings(unittest.TestCase):
+    def test_environment_overrides_defaults(self):
+        settings = pool_settings_from_env({'DB_POOL_MIN_SIZE': '4', 'DB_POOL_MAX_SIZE': '20', 'DB_POOL_WARMUP': 'false',
+                                           'DB_STATEMENT_TIMEOUT_MS': '5000', 'DB_POOL_MAX_QUERIES': 'lots'})
+        self.assertEqual((settings['min_size'], settings['max_size'], settings['warmup']), (4, 20, False))
+        self.assertEqual(settings['max_queries'], 50000)
+        self.assertEqual(settings['max_inactive_connection_lifetime'], 300.0)
+        self.assertEqual(server_settings(settings)['statement_timeout'], '5000')
+        self.assertEqual(server_settings(settings)['idle_in_transaction_session_timeout'], '60000')
+
+    def test_min_size_is_capped_by_max_size(self):
+        settings = pool_settings_from_env({'DB_POOL_MIN_SIZE': '8', 'DB_POOL_MAX_SIZE': '3'})
+        self.assertEqual((settings['min_size'], settings['max_size']), (3, 3))
+
+class TestInstrumentedPool(unittest.IsolatedAsyncioTestCase):
+    async def test_stats_track_in_use_waiters_and_latency(self):
+        pool = InstrumentedPool(FakePool(max_size=2))
+        await pool.warmup(2)
+        self.assertEqual((pool.stats()['size'], pool.stats()['idle']), (2, 2))
+
+        held = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold():
+            async with pool.acquire():
+                held.set()
+                await release.wait()
+
+        holders = [asyncio.create_task(hold()) for _ in range(3)]
+        await held.wait()
+        await asyncio.sleep(0)
+        stats = pool.stats()
+        self.assertEqual((stats['in_use'], stats['idle'], stats['waiters']), (2, 0, 1))
+
+        release.set()
+        await asyncio.gather(*holders)
+        stats = pool.stats()
+        self.assertEqual((stats['in_use'], stats['waiters'], stats['acquires']), (0, 0, 5))
+        self.assertIsNotNone(stats['acquire_ms_p95'])
+        self.assertLessEqual(stats['acquire_ms_p50'], stats['acquire_ms_max'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_profiling.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import tempfile
+import unittest
+from src.utils.profiling import Profiler, STAGE_CODES, mark, profile_stage
+
+@profile_stage('busy')
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+class TestProfiling(unittest.TestCase):
+    def test_tagging_does_not_wrap(self):
+        def plain():
+            return 1
+        self.assertIs(profile_stage('plain')(plain), plain)
+        self.assertEqual(STAGE_CODES[plain.__code__], 'plain')
+        # Without an active profiler a boundary is a no-op
+        mark('nothing')
+
+    def test_samples_are_attributed_to_stages_and_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = Profiler(directory, interval=0.001, top_n=5).start()
+            busy(0.2)
+            kept = [bytearray(1024) for _ in range(100)]
+            mark('after busy')
+            summary = profiler.stop()
+
+            self.assertGreater(profiler.stage_totals()['busy'], 0)
+            self.assertIn('busy', summary)
+            own, _ = profiler.top_functions('busy')
+            self.assertTrue(any(name.startswith('busy (test_profiling.py') for name in own))
+
+            files = set(os.listdir(directory))
+            self.assertTrue({'all.folded', 'busy.folded', 'summary.txt', 'memory.txt'} <= files)
+            with open(os.path.join(directory, 'busy.folded')) as file:
+                stack, count = file.readline().rsplit(' ', 1)
+            self.assertIn(';busy (test_profiling.py', stack)
+            self.assertGreater(int(count), 0)
+            with open(os.path.join(directory, 'memory.txt')) as file:
+                self.assertIn('start -> after busy', file.read())
+            del kept
+
+if __name__ == '__main__':
+    unittest.main()
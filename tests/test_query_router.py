@@ -0,0 +1,114 @@
+# tests/test_query_router.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from datetime import datetime
+from src.agents.user_profiler import UserProfiler
+from src.router.query_router import (
+    QueryRouter, TTLCache, MemoryBackend, PostgresBackend, UserScoreRequest, LeaderboardRequest,
+    KeywordCountsRequest, RollupRequest, SimilarTweetsRequest,
+)
+
+class FakeDBManager:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    async def get_user_score(self, user_id):
+        self.calls.append(('user_score', user_id))
+        if self.fail:
+            raise ConnectionError("db down")
+        return {'tweet_count': 7, 'relevant_count': 3, 'total_engagement': 1.5, 'avg_sentiment': None, 'last_seen': None}
+
+    async def get_leaderboard(self, offset, limit, since, until):
+        self.calls.append(('leaderboard', offset, limit, since, until))
+        return [{'user_id': 5, 'total': 9.0, 'tweet_count': 2}]
+
+    async def get_term_counts(self, since=None, until=None):
+        self.calls.append(('term_counts', since, until))
+        return [{'term_type': 'keywords', 'term': 'j4j', 'count': 4}]
+
+def tweet_data(user_id, engagement):
+    return {'user_id': user_id, 'created_at': datetime(2024, 7, 3, 12), 'is_relevant': True,
+            'engagement_score': engagement, 'sentiment_score': 0.5, 'quality_score': 0.1}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestQueryRouter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db = FakeDBManager()
+        self.profiler = UserProfiler()
+        self.clock = FakeClock()
+        self.router = QueryRouter([PostgresBackend(self.db), MemoryBackend(self.profiler)], TTLCache(clock=self.clock))
+
+    async def test_user_scores_come_from_postgres(self):
+        # The profiler only holds this process's tweets, with engagement as first fetched
+        self.profiler.observe(tweet_data('1', 2.0))
+        await self.profiler.load()
+        score = await self.router.query(UserScoreRequest(1))
+        self.assertEqual(score['tweet_count'], 7)
+        self.assertEqual(self.db.calls, [('user_score', '1')])
+        self.assertNotIn('user_score:memory', self.router.latency_summary())
+
+        await self.router.query(UserScoreRequest(1))
+        self.assertEqual(len(self.db.calls), 1)
+        self.assertEqual(self.router.latency_summary()['user_score:cache']['calls'], 1)
+
+    async def test_leaderboard_from_memory_only_when_complete(self):
+        for user_id, engagement in (('1', 1.0), ('2', 5.0), ('3', 3.0)):
+            self.profiler.observe(tweet_data(user_id, engagement))
+        await self.router.query(LeaderboardRequest(limit=2))
+        self.assertEqual(self.db.calls[-1][0], 'leaderboard')
+
+        await self.profiler.load()
+        self.router.invalidate('tweets')
+        board = await self.router.query(LeaderboardRequest(offset=0, limit=2))
+        self.assertEqual([row['user_id'] for row in board], ['2', '3'])
+        ranged = LeaderboardRequest(limit=2, since=datetime(2024, 7, 1))
+        await self.router.query(ranged)
+        self.assertEqual(self.db.calls[-1], ('leaderboard', 0, 2, datetime(2024, 7, 1), None))
+
+    async def test_cache_ttl_and_invalidation(self):
+        request = KeywordCountsRequest()
+        await self.router.query(request)
+        await self.router.query(KeywordCountsRequest())
+        self.assertEqual(len(self.db.calls), 1)
+        self.assertEqual(self.router.latency_summary()['keyword_counts:cache']['calls'], 1)
+
+        self.assertEqual(self.router.invalidate('term_counts'), 1)
+        await self.router.query(request)
+        self.assertEqual(len(self.db.calls), 2)
+
+        self.clock.now += request.ttl + 1
+        await self.router.query(request)
+        self.assertEqual(len(self.db.calls), 3)
+
+    async def test_fallback_and_errors(self):
+        self.db.fail = True
+        with self.assertRaises(ConnectionError):
+            await self.router.query(UserScoreRequest(9))
+        self.assertEqual(self.router.latency_summary()['user_score:postgres']['errors'], 1)
+        with self.assertRaises(ValueError):
+            await self.router.query(SimilarTweetsRequest("gm"))
+        with self.assertRaises(ValueError):
+            RollupRequest(datetime(2024, 7, 1), datetime(2024, 7, 2), granularity='minute')
+
+    def test_cache_eviction_keeps_dependency_index_consistent(self):
+        cache = TTLCache(max_entries=2, clock=self.clock)
+        cache.set('a', 1, 10, ['x'])
+        cache.set('b', 2, 10, ['x', 'y'])
+        cache.set('c', 3, 10, ['y'])
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.invalidate('y'), 2)
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# tests/test_resilience.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+from src.utils.resilience import CircuitOpenError, DependencyGuard, RetryableError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class Flaky:
+    """Fails with the given exceptions in turn, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+def guard(clock=None, **config):
+    return DependencyGuard('test', dict({'base_delay': 0, 'failure_threshold': 10}, **config), clock=clock or FakeClock())
+
+class TestDependencyGuard(unittest.IsolatedAsyncioTestCase):
+    async def test_transient_errors_are_retried_and_others_are_not(self):
+        api = guard()
+        flaky = Flaky(ConnectionError('reset'), OSError('refused'))
+        self.assertEqual(await api.call(flaky), 'ok')
+        self.assertEqual(flaky.calls, 3)
+
+        broken = Flaky(ValueError('bad input'))
+        with self.assertRaises(ValueError):
+            await api.call(broken)
+        self.assertEqual(broken.calls, 1)
+        stats = api.stats()
+        self.assertEqual((stats['retries'], stats['failures'], stats['successes'], stats['state']), (2, 1, 1, 'closed'))
+
+    async def test_nested_calls_do_not_multiply_attempts(self):
+        api = guard()
+        inner = Flaky(*[ConnectionError('down') for _ in range(10)])
+
+        async def outer():
+            return await api.call(inner)
+
+        with self.assertRaises(ConnectionError):
+            await api.call(outer)
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual(api.stats()['calls'], 1)
+
+    async def test_circuit_opens_then_lets_one_trial_through(self):
+        clock = FakeClock()
+        api = guard(clock, failure_threshold=2, reset_timeout=30, max_attempts=1)
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                await api.call(Flaky(ConnectionError('down')))
+        self.assertEqual(api.stats()['state'], 'open')
+
+        skipped = Flaky()
+        with self.assertRaises(CircuitOpenError):
+            await api.call(skipped)
+        self.assertEqual(skipped.calls, 0)
+
+        clock.now += 30
+        self.assertEqual(await api.call(Flaky()), 'ok')
+        stats = api.stats()
+        self.assertEqual((stats['state'], stats['short_circuited'], stats['circuit_opened']), ('closed', 1, 1))
+
+    async def test_retry_budget_caps_retries_during_an_outage(self):
+        api = guard(budget_reserve=2, budget_ratio=0.0, max_attempts=3)
+        down = Flaky(*[ConnectionError('down') for _ in range(100)])
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                await api.call(down)
+        # Two retries from the reserve, then only first attempts
+        self.assertEqual(down.calls, 5)
+        self.assertEqual((api.stats()['retries'], api.stats()['retries_denied']), (2, 2))
+
+    async def test_rate_limits_wait_as_told_without_opening_the_circuit(self):
+        api = guard(failure_threshold=1)
+        limited = Flaky(RetryableError('HTTP 429', retry_after=7, trips_circuit=False))
+        with patch('src.utils.resilience.asyncio.sleep') as mock_sleep:
+            mock_sleep.return_value = None
+            self.assertEqual(await api.call(limited), 'ok')
+        mock_sleep.assert_called_once_with(7)
+        self.assertEqual(api.stats()['state'], 'closed')
+
+if __name__ == '__main__':
+    unittest.main()
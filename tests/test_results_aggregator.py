@@ -0,0 +1,117 @@
+# tests/test_results_aggregator.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+import numpy as np
+from src.aggregator.results_aggregator import ResultsAggregator, AgentSpec
+from src.agents.sentiment_analyzer import SentimentAnalyzer
+from src.agents.engagement_classifier import EngagementClassifier
+from src.agents.topic_modeler import TopicModeler
+from src.agents.user_profiler import UserProfiler
+
+def make_items(count):
+    items = []
+    for index in range(count):
+        tweet = {'id': str(index), 'text': f"gm great project {index}", 'author_id': '7',
+                 'public_metrics': {'like_count': index, 'retweet_count': 0, 'reply_count': 0, 'quote_count': 0}}
+        user_data = {'id': '7', 'username': 'alice', 'created_at': datetime(2020, 1, 1), 'follower_count': 10}
+        tweet_data = {'id': str(index), 'content': tweet['text'], 'created_at': datetime(2024, 7, 3, 12, index)}
+        items.append({'tweet': tweet, 'user_data': user_data, 'tweet_data': tweet_data})
+    return items
+
+def sleeping_agent(name, seconds, field):
+    def func(items):
+        time.sleep(seconds)
+        return [{field: name} for _ in items]
+    return func
+
+class TestResultsAggregator(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = {'default_timeout': 1.0, 'max_workers': 4, 'timeouts': {'slow': 0.05}}
+
+    async def test_agents_overlap(self):
+        aggregator = ResultsAggregator([AgentSpec(f"agent{index}", sleeping_agent(f"agent{index}", 0.2, f"field{index}")) for index in range(3)],
+                                       config=self.config)
+        try:
+            result = await aggregator.aggregate(make_items(4))
+        finally:
+            aggregator.close()
+        self.assertTrue(result.complete)
+        self.assertLess(result.seconds, 0.5)
+        self.assertEqual(result.records[2], {'tweet_id': '2', 'missing': [], 'field0': 'agent0', 'field1': 'agent1', 'field2': 'agent2'})
+
+    async def test_partial_results_on_timeout_and_error(self):
+        async def fine(items):
+            return [{'ok': True} for _ in items]
+
+        def broken(items):
+            raise RuntimeError("model not loaded")
+
+        async def slow(items):
+            await asyncio.sleep(1)
+
+        aggregator = ResultsAggregator([AgentSpec('fine', fine), AgentSpec('broken', broken), AgentSpec('slow', slow),
+                                        AgentSpec('short', lambda items: [None], cpu_bound=False)], config=self.config)
+        try:
+            result = await aggregator.aggregate(make_items(2))
+        finally:
+            aggregator.close()
+        self.assertFalse(result.complete)
+        self.assertEqual(result.agents['fine']['status'], 'ok')
+        self.assertEqual(result.agents['broken']['status'], 'error')
+        self.assertEqual(result.agents['slow']['status'], 'timeout')
+        self.assertEqual(result.agents['short']['status'], 'error')
+        self.assertTrue(all(record['ok'] for record in result.records))
+        self.assertEqual(sorted(result.records[0]['missing']), ['broken', 'short', 'slow'])
+
+    async def test_for_fetcher_merges_agent_fields(self):
+        fetcher = MagicMock()
+        fetcher.sentiment_analyzer = SentimentAnalyzer({})
+        fetcher.engagement_classifier = EngagementClassifier({})
+        fetcher.topic_modeler = TopicModeler(config={'num_topics': 2, 'seed': 0})
+        fetcher.topic_modeler.partial_fit(np.eye(2, 4))
+        fetcher.user_profiler = UserProfiler()
+        fetcher.user_profiler.observe({'user_id': '7', 'created_at': datetime(2024, 7, 3), 'is_relevant': True,
+                                       'engagement_score': 2.0, 'sentiment_score': None, 'quality_score': None})
+        items = make_items(3)
+        items[0]['embedding'] = np.array([1.0, 0.0, 0.0, 0.0])
+
+        aggregator = ResultsAggregator.for_fetcher(fetcher, config=self.config)
+        try:
+            result = await aggregator.aggregate(items)
+        finally:
+            aggregator.close()
+        self.assertTrue(result.complete)
+        first, second = result.records[0], result.records[1]
+        self.assertGreater(first['sentiment_score'], 0)
+        self.assertEqual(first['sentiment_label'], 'positive')
+        self.assertIn(first['quality_label'], ('organic', 'suspicious', 'farm'))
+        self.assertIn('topic_id', first)
+        self.assertNotIn('topic_id', second)
+        self.assertEqual(second['author_profile']['tweet_count'], 1)
+
+    async def test_engagement_quality_leaves_classifier_history_alone(self):
+        fetcher = MagicMock()
+        fetcher.engagement_classifier = EngagementClassifier({})
+        items = make_items(3)
+        items[0]['tweet_data'].update(quality_score=0.9, quality_label='farm')
+
+        aggregator = ResultsAggregator.for_fetcher(fetcher, config=self.config)
+        try:
+            result = await aggregator.aggregate(items, agents=['engagement_quality'])
+        finally:
+            aggregator.close()
+        self.assertEqual((result.records[0]['quality_score'], result.records[0]['quality_label']), (0.9, 'farm'))
+        self.assertIn(result.records[1]['quality_label'], ('organic', 'suspicious', 'farm'))
+        classifier = fetcher.engagement_classifier
+        self.assertEqual((classifier._last_seen, len(classifier._text_counts), len(classifier._tweet_history)), ({}, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
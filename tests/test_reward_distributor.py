@@ -0,0 +1,95 @@
+# tests/test_reward_distributor.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import tempfile
+import unittest
+import numpy as np
+from src.services.reward_distributor import (RewardDistributor, MerkleTree, allocate, decode_base58_batch,
+                                             leaf_hashes, BASE58_ALPHABET)
+
+def encode_base58(key: bytes) -> str:
+    value = int.from_bytes(key, 'big')
+    encoded = ''
+    while value:
+        value, digit = divmod(value, 58)
+        encoded = BASE58_ALPHABET.decode()[digit] + encoded
+    return '1' * (len(key) - len(key.lstrip(b'\0'))) + encoded
+
+def random_keys(count, seed=0):
+    keys = np.random.default_rng(seed).integers(0, 256, (count, 32), dtype=np.uint8)
+    keys[0, :2] = 0  # leading zero bytes become leading '1's
+    return keys
+
+class FakeValidator:
+    def __init__(self, wallets):
+        self.eligible_wallets = set(wallets)
+
+class FakeDBManager:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_wallet_engagement(self, since=None, until=None):
+        return self.rows
+
+class TestAllocate(unittest.TestCase):
+    def test_sums_to_budget_with_deterministic_ties(self):
+        amounts = allocate(np.array([1.0, 1.0, 1.0, 0.0]), 100)
+        self.assertEqual(amounts.tolist(), [34, 33, 33, 0])
+        self.assertEqual(allocate(np.random.default_rng(1).pareto(1.5, 1000), 10 ** 12).sum(), 10 ** 12)
+
+    def test_caps_redistribute_to_the_rest(self):
+        amounts = allocate(np.array([100.0, 50.0, 1.0, 1.0]), 1000, max_per_wallet=400)
+        self.assertEqual(amounts[:2].tolist(), [400, 400])
+        self.assertEqual(amounts[2:].tolist(), [100, 100])
+        # Caps below the budget share leave the remainder undistributed
+        self.assertEqual(allocate(np.array([1.0, 2.0]), 1000, max_per_wallet=300).tolist(), [300, 300])
+
+class TestMerkleTree(unittest.TestCase):
+    def test_base58_decode_roundtrip_and_invalid(self):
+        keys = random_keys(50)
+        addresses = [encode_base58(key.tobytes()) for key in keys] + ['0OIl' * 10, '1' * 10, 'z' * 44]
+        decoded, valid = decode_base58_batch(addresses)
+        self.assertEqual(valid.tolist(), [True] * 50 + [False] * 3)
+        self.assertTrue((decoded[:50] == keys).all())
+
+    def test_proofs_verify_for_odd_sizes(self):
+        for count in (1, 2, 5, 6, 7, 13):
+            leaves = leaf_hashes(random_keys(count, seed=count), np.arange(1, count + 1))
+            tree = MerkleTree(leaves)
+            encoded = list(tree.encoded_proofs(chunk_size=4))
+            for index in range(count):
+                proof = [bytes.fromhex(node) for node in json.loads(encoded[index])]
+                self.assertEqual(proof, tree.proof(index))
+                self.assertTrue(MerkleTree.verify(leaves[index].tobytes(), proof, tree.root))
+            self.assertFalse(MerkleTree.verify(leaves[0].tobytes(), tree.proof(0), bytes(32)))
+
+class TestRewardDistributor(unittest.IsolatedAsyncioTestCase):
+    async def test_snapshot_writes_root_and_claims(self):
+        wallets = [encode_base58(key.tobytes()) for key in random_keys(5)]
+        rows = [{'wallet_address': wallet, 'score': float(score)} for wallet, score in zip(wallets, (5, 3, 2, 1, 0.5))]
+        rows.append({'wallet_address': 'not-a-key!', 'score': 9.0})
+        validator = FakeValidator(wallets[:4] + ['not-a-key!'])
+        output_dir = tempfile.mkdtemp()
+
+        summary = await RewardDistributor(FakeDBManager(rows), validator).snapshot(1000, output_dir)
+
+        self.assertEqual((summary['wallets'], summary['ineligible'], summary['invalid']), (4, 1, 1))
+        self.assertEqual(summary['total'], 1000)
+        with open(os.path.join(output_dir, 'distribution.json')) as file:
+            self.assertEqual(json.load(file)['root'], summary['root'])
+        with open(os.path.join(output_dir, 'proofs.jsonl')) as file:
+            claims = [json.loads(line) for line in file]
+        self.assertEqual([claim['wallet'] for claim in claims], sorted(wallets[:4]))
+        self.assertEqual(sum(claim['amount'] for claim in claims), 1000)
+        for claim in claims:
+            key = decode_base58_batch([claim['wallet']])[0]
+            leaf = leaf_hashes(key, np.array([claim['amount']]))[0].tobytes()
+            proof = [bytes.fromhex(node) for node in claim['proof']]
+            self.assertTrue(MerkleTree.verify(leaf, proof, bytes.fromhex(summary['root'])))
+
+if __name__ == '__main__':
+    unittest.main()
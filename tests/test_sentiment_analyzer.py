@@ -0,0 +1,57 @@
+# tests/test_sentiment_analyzer.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+from src.agents.sentiment_analyzer import SentimentAnalyzer
+from src.utils.agent_config import load_agent_config
+
+class TestSentimentAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = SentimentAnalyzer({'cache_size': 3, 'lexicon_overrides': {'j4j': 1.0}})
+
+    def test_polarity(self):
+        self.assertGreater(self.analyzer.score("This project is amazing, bullish 🚀"), 0.5)
+        self.assertLess(self.analyzer.score("Total scam, got rekt"), -0.5)
+        self.assertEqual(self.analyzer.score("Wallet address posted at noon"), 0.0)
+
+    def test_scores_bounded(self):
+        score = self.analyzer.score(" ".join(["amazing"] * 200))
+        self.assertLess(score, 1.0)
+        self.assertGreater(score, 0.99)
+
+    def test_negation_flips_polarity(self):
+        self.assertGreater(self.analyzer.score("this is good"), 0)
+        self.assertLess(self.analyzer.score("this is not good"), 0)
+        # Outside the negation window the word keeps its polarity
+        self.assertGreater(self.analyzer.score("not that i would say it is good"), 0)
+
+    def test_lexicon_overrides(self):
+        self.assertGreater(self.analyzer.score("J4J"), 0)
+        self.assertIn('lexicon_overrides', load_agent_config('sentiment_analyzer'))
+        self.assertEqual(load_agent_config('no_such_agent'), {})
+
+    def test_batch_matches_single(self):
+        texts = ["love it", "hate it", "neutral text", "love it"]
+        batch = self.analyzer.score_batch(texts)
+        self.assertEqual(batch.dtype, np.float32)
+        self.assertEqual(len(batch), 4)
+        fresh = SentimentAnalyzer({})
+        for text, score in zip(texts, batch):
+            self.assertAlmostEqual(fresh.score(text), float(score), places=6)
+        self.assertEqual(batch[0], batch[3])
+
+    def test_cache_hits_and_eviction(self):
+        self.analyzer.score_batch(["a good day", "a bad day"])
+        self.analyzer.score_batch(["a good day"])
+        self.assertEqual(self.analyzer.stats()['cache_hits'], 1)
+        self.assertEqual(self.analyzer.stats()['cache_misses'], 2)
+        self.analyzer.score_batch(["one", "two", "three"])
+        self.assertEqual(self.analyzer.stats()['cache_entries'], 3)
+        self.assertEqual(self.analyzer.score_batch([]).shape, (0,))
+
+if __name__ == '__main__':
+    unittest.main()
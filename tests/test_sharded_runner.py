@@ -0,0 +1,128 @@
+# tests/test_sharded_runner.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.account_management.project_account_manager import ProjectAccountManager
+from src.database.sql_db_manager import SQLDBManager
+from src.data_ingestion.sharded_runner import (
+    shard_for, assign_shards, changed_shards, ShardCheckpoint, ShardSupervisor
+)
+
+def report_and_wait(shard_id, work, checkpoint_dir, stats_queue, stop_event, poll_interval):
+    stats_queue.put({'shard': shard_id, 'tweets': len(work['accounts']) * 10, 'seconds': 1.0, 'errors': 0})
+    stop_event.wait(30)
+
+class FakeProjectAccountsDB:
+    """The project_accounts table behind SQLDBManager's project account methods, and nothing else."""
+
+    def __init__(self):
+        self.rows = {}
+        self.fail = False
+
+    async def insert_project_account(self, twitter_id, twitter_username):
+        self.rows[int(twitter_id)] = {'twitter_id': int(twitter_id), 'twitter_username': twitter_username, 'is_archived': False}
+
+    async def archive_project_account(self, twitter_username):
+        for row in self.rows.values():
+            if row['twitter_username'] == twitter_username and not row['is_archived']:
+                row['is_archived'] = True
+                return True
+        return False
+
+    async def get_all_project_accounts(self, include_archived=False):
+        if self.fail:
+            raise ConnectionError("db down")
+        return [row for row in self.rows.values() if include_archived or not row['is_archived']]
+
+    async def get_archived_project_accounts(self):
+        return [row for row in self.rows.values() if row['is_archived']]
+
+class TestShardAssignment(unittest.TestCase):
+    def test_shard_for_is_stable_and_in_range(self):
+        for key in ('account:1', 'account:2', 'query:Jupiter'):
+            shard = shard_for(key, 4)
+            self.assertTrue(0 <= shard < 4)
+            self.assertEqual(shard, shard_for(key, 4))
+
+    def test_adding_accounts_does_not_move_existing_ones(self):
+        accounts = [str(i) for i in range(200)]
+        before = assign_shards(accounts, ['q'], 4)
+        after = assign_shards(accounts + ['9999'], ['q'], 4)
+        moved = [a for a in accounts if shard_for('account:' + a, 4) != next(s for s, w in after.items() if a in w['accounts'])]
+        self.assertEqual(moved, [])
+        self.assertEqual(len(changed_shards(before, after)), 1)
+
+    def test_adding_a_shard_moves_about_one_in_n(self):
+        accounts = [str(i) for i in range(2000)]
+        moved = sum(1 for a in accounts if shard_for('account:' + a, 4) != shard_for('account:' + a, 5))
+        self.assertLess(moved, 2000 * 0.3)
+
+    def test_checkpoint_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = ShardCheckpoint(tmp, 3)
+            state = checkpoint.load()
+            self.assertEqual(state, {'since_ids': {}, 'rounds': 0})
+            state['since_ids']['1'] = '1808336253991244265'
+            checkpoint.save(state)
+            self.assertEqual(ShardCheckpoint(tmp, 3).load()['since_ids'], {'1': '1808336253991244265'})
+
+class TestShardSupervisor(unittest.TestCase):
+    def test_supervisor_aggregates_and_rebalances(self):
+        accounts = [str(i) for i in range(20)]
+        supervisor = ShardSupervisor(2, account_source=lambda: list(accounts), worker_target=report_and_wait)
+        supervisor.started_at = 0
+        try:
+            supervisor.rebalance()
+            self.assertEqual(len(supervisor.shards), 2)
+            accounts.append('100')
+            supervisor.request_rebalance()
+            self.assertEqual(len(supervisor.rebalance()), 1)
+        finally:
+            supervisor.shutdown()
+        summary = supervisor.aggregate_throughput()
+        self.assertGreaterEqual(summary['total_tweets'], 200)
+
+    def test_fake_db_matches_sql_db_manager(self):
+        for name in vars(FakeProjectAccountsDB):
+            if not name.startswith('_'):
+                self.assertTrue(asyncio.iscoroutinefunction(getattr(SQLDBManager, name, None)), name)
+
+    def test_accounts_added_elsewhere_reach_the_next_rebalance(self):
+        db = FakeProjectAccountsDB()
+        # Another process (config_processor, the project_accounts CLI) writes the table
+        writer = ProjectAccountManager(db)
+        writer.twitter_service = MagicMock()
+        writer.twitter_service.get_user_id.return_value = '555'
+        reader = ProjectAccountManager(db)
+        supervisor = ShardSupervisor(2, account_source=lambda: asyncio.run(reader.get_project_account_ids()),
+                                     worker_target=report_and_wait)
+        try:
+            # Until the table is seeded the configured accounts are tracked
+            configured = supervisor.account_source()
+            self.assertTrue(configured)
+            self.assertTrue(asyncio.run(writer.add_project_account('@newproject')))
+            supervisor.rebalance()
+            self.assertEqual(sum(len(work['accounts']) for work in supervisor.assignment.values()), 1)
+            self.assertIn('555', supervisor.account_source())
+
+            db.fail = True
+            assignment = supervisor.assignment
+            self.assertEqual(supervisor.rebalance(), [])
+            self.assertIs(supervisor.assignment, assignment)
+            db.fail = False
+
+            self.assertTrue(asyncio.run(writer.archive_project_account('@newproject')))
+            self.assertFalse(asyncio.run(writer.archive_project_account('@newproject')))
+            self.assertEqual(supervisor.account_source(), [])
+            self.assertEqual(len(supervisor.rebalance()), 1)
+        finally:
+            supervisor.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
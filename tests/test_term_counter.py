@@ -0,0 +1,71 @@
+# tests/test_term_counter.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from src.utils.term_counter import TermCounter, bucket_start
+
+class FakeDBManager:
+    def __init__(self):
+        self.rows = []
+
+    async def upsert_term_counts(self, rows):
+        self.rows.extend(rows)
+
+    async def get_term_counts(self, since=None, until=None):
+        totals = {}
+        for term_type, term, bucket, count in self.rows:
+            if (since is None or bucket >= since) and (until is None or bucket < until):
+                totals[(term_type, term)] = totals.get((term_type, term), 0) + count
+        return [{'term_type': t, 'term': term, 'count': c} for (t, term), c in totals.items()]
+
+class TestTermCounter(unittest.TestCase):
+    def setUp(self):
+        self.tweet = {
+            'text': '@weremeow J4J and PPP #J4J',
+            'entities': {
+                'mentions': [{'username': 'weremeow'}],
+                'hashtags': [{'tag': 'J4J'}]
+            }
+        }
+        self.created_at = datetime(2024, 7, 3, 3, 5, 34)
+
+    def test_bucket_start(self):
+        self.assertEqual(bucket_start(self.created_at, 3600), datetime(2024, 7, 3, 3, 0, 0))
+
+    def test_observe_matches_snapshot_shape(self):
+        counter = TermCounter()
+        counter.observe(self.tweet, self.created_at)
+        counter.observe({'text': 'Jupiter is up'}, self.created_at)
+        snapshot = counter.pending_snapshot()
+
+        self.assertEqual(snapshot['total_relevant_tweets'], 2)
+        self.assertEqual(snapshot['mentions'], {'@jup_dao': 0, '@JupiterExchange': 0, '@weremeow': 1})
+        self.assertEqual(snapshot['keywords'], {'Jupiter': 1, 'J4J': 1, 'PPP': 1})
+        self.assertEqual(snapshot['hashtags'], {'Jupiter': 0, 'J4J': 1, 'PPP': 0})
+
+    def test_flush_and_export(self):
+        db = FakeDBManager()
+        counter = TermCounter(db, flush_interval=3600)
+        counter.observe(self.tweet, self.created_at)
+        self.assertEqual(asyncio.run(counter.flush_if_due()), 0)
+        self.assertEqual(asyncio.run(counter.flush()), 5)
+        self.assertEqual(counter.pending_count, 0)
+
+        counter.observe(self.tweet, datetime(2024, 7, 4, 12, 0, 0))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tweet_analysis.json')
+            asyncio.run(counter.export_snapshot(path, since=datetime(2024, 7, 4)))
+            with open(path) as file:
+                snapshot = json.load(file)
+        self.assertEqual(snapshot['total_relevant_tweets'], 1)
+        self.assertEqual(snapshot['mentions']['@weremeow'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
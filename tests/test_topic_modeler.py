@@ -0,0 +1,77 @@
+# tests/test_topic_modeler.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+from src.agents.topic_modeler import TopicModeler
+
+class FakeDBManager:
+    def __init__(self):
+        self.centroids = {}
+        self.assignments = {}
+
+    async def save_topic_centroids(self, rows):
+        for topic_id, centroid, count in rows:
+            self.centroids[topic_id] = {'topic_id': topic_id, 'centroid': centroid, 'member_count': count}
+
+    async def get_topic_centroids(self):
+        return list(self.centroids.values())
+
+    async def upsert_topic_assignments(self, rows):
+        for tweet_id, topic_id, distance in rows:
+            self.assignments[tweet_id] = topic_id
+
+def clustered_embeddings(rng, centers, per_center):
+    labels = np.repeat(np.arange(len(centers)), per_center)
+    points = centers[labels] + rng.normal(scale=0.05, size=(len(labels), centers.shape[1]))
+    order = rng.permutation(len(labels))
+    return points[order].astype(np.float32), labels[order]
+
+class TestTopicModeler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.centers = np.eye(3, 16) * 3
+        self.config = {'num_topics': 3, 'save_every_batches': 2, 'seed': 1}
+
+    def test_partial_fit_recovers_clusters(self):
+        modeler = TopicModeler(config=self.config)
+        for _ in range(5):
+            points, _ = clustered_embeddings(self.rng, self.centers, 40)
+            modeler.partial_fit(points)
+        points, truth = clustered_embeddings(self.rng, self.centers, 20)
+        labels, distances = modeler.assign(points)
+        # Every true cluster maps onto exactly one topic
+        mapping = {t: set(labels[truth == t].tolist()) for t in range(3)}
+        self.assertTrue(all(len(topics) == 1 for topics in mapping.values()))
+        self.assertEqual(len(set().union(*mapping.values())), 3)
+        self.assertTrue((distances < 0.5).all())
+        self.assertEqual(sum(modeler.topic_sizes()), 600)
+
+    def test_assign_requires_centroids(self):
+        with self.assertRaises(RuntimeError):
+            TopicModeler(config=self.config).assign(np.ones((1, 16)))
+        with self.assertRaises(ValueError):
+            TopicModeler(config=self.config).partial_fit(np.ones((2, 16)))
+
+    async def test_observe_buffers_then_persists(self):
+        db = FakeDBManager()
+        modeler = TopicModeler(db, config=self.config)
+        points, _ = clustered_embeddings(self.rng, self.centers, 10)
+        self.assertEqual(await modeler.observe(['1', '2'], points[:2]), 0)
+        self.assertEqual(await modeler.observe([str(i) for i in range(3, 31)], points[2:]), 30)
+        self.assertEqual(len(db.assignments), 30)
+        self.assertEqual(db.centroids, {})
+        await modeler.observe(['31', '32'], points[:2])
+        self.assertEqual(len(db.centroids), 3)
+
+        # A new modeler resumes from the saved centroids
+        resumed = TopicModeler(db, config=self.config)
+        await resumed.load()
+        np.testing.assert_allclose(resumed.centroids, modeler.centroids, rtol=1e-5)
+        np.testing.assert_array_equal(resumed.assign(points)[0], modeler.assign(points)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# tests/test_user_profiler.py
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from src.agents.user_profiler import UserProfiler
+
+class FakeDBManager:
+    """Applies profile deltas the way the user_profiles upsert does."""
+
+    def __init__(self):
+        self.profiles = {}
+        self.fail_next = False
+
+    async def upsert_user_profiles(self, rows):
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError("db down")
+        for row in rows:
+            user_id, tweets, relevant, counts, sums, sumsqs, hours, first, last, embedding, embedding_count = row
+            stored = self.profiles.get(user_id)
+            if stored is None:
+                self.profiles[user_id] = {
+                    'user_id': user_id, 'tweet_count': tweets, 'relevant_count': relevant, 'score_count': counts,
+                    'score_sum': sums, 'score_sumsq': sumsqs, 'hour_histogram': hours, 'first_seen': first,
+                    'last_seen': last, 'embedding_sum': embedding, 'embedding_count': embedding_count,
+                }
+                continue
+            stored['tweet_count'] += tweets
+            stored['relevant_count'] += relevant
+            for key, values in (('score_count', counts), ('score_sum', sums), ('score_sumsq', sumsqs), ('hour_histogram', hours)):
+                stored[key] = [a + b for a, b in zip(stored[key], values)]
+            stored['first_seen'] = min(filter(None, [stored['first_seen'], first]), default=None)
+            stored['last_seen'] = max(filter(None, [stored['last_seen'], last]), default=None)
+            if embedding is not None:
+                stored['embedding_sum'] = embedding if stored['embedding_sum'] is None else [a + b for a, b in zip(stored['embedding_sum'], embedding)]
+            stored['embedding_count'] += embedding_count
+
+    async def get_user_profiles(self):
+        return list(self.profiles.values())
+
+def tweet_data(user_id, hours_ago, engagement=1.0, sentiment=None, relevant=True):
+    return {
+        'user_id': user_id,
+        'created_at': datetime(2024, 7, 3, 12, 0, 0) - timedelta(hours=hours_ago),
+        'is_relevant': relevant,
+        'engagement_score': engagement,
+        'sentiment_score': sentiment,
+        'quality_score': 0.1,
+    }
+
+class TestUserProfiler(unittest.IsolatedAsyncioTestCase):
+    def test_profile_moments_and_histogram(self):
+        profiler = UserProfiler(flush_interval=60, initial_capacity=2)
+        for index, engagement in enumerate([1.0, 2.0, 3.0, 6.0]):
+            profiler.observe(tweet_data('10', index, engagement, sentiment=0.5, relevant=index % 2 == 0))
+        for user in range(5):
+            profiler.observe(tweet_data(str(100 + user), 0))
+
+        profile = profiler.profile('10')
+        self.assertEqual(len(profiler), 6)
+        self.assertEqual(profile['tweet_count'], 4)
+        self.assertEqual(profile['relevant_count'], 2)
+        self.assertAlmostEqual(profile['scores']['engagement_score']['mean'], 3.0)
+        self.assertAlmostEqual(profile['scores']['engagement_score']['std'], np.std([1.0, 2.0, 3.0, 6.0]))
+        self.assertEqual(profile['scores']['sentiment_score']['count'], 4)
+        self.assertEqual(profile['hour_histogram'][12], 1)
+        self.assertEqual(profile['hour_histogram'][9], 1)
+        self.assertEqual(profile['first_seen'], datetime(2024, 7, 3, 9, 0, 0))
+        self.assertEqual(profile['last_seen'], datetime(2024, 7, 3, 12, 0, 0))
+        self.assertIsNone(profile['mean_embedding'])
+        self.assertIsNone(profiler.profile('unknown'))
+
+    async def test_mean_embedding(self):
+        profiler = UserProfiler()
+        profiler.observe_embeddings(['1', '1', '2'], np.array([[1.0, 0.0], [0.0, 1.0], [2.0, 2.0]]))
+        np.testing.assert_allclose(profiler.profile('1')['mean_embedding'], [0.5, 0.5])
+        self.assertEqual(profiler.profile('2')['tweet_count'], 0)
+
+    async def test_flush_adds_deltas_and_survives_errors(self):
+        db = FakeDBManager()
+        first = UserProfiler(db)
+        flushed = []
+        first.add_listener(flushed.extend)
+        first.observe(tweet_data('1', 0, 2.0))
+        first.observe_embeddings(['1'], [[1.0, 1.0]])
+        db.fail_next = True
+        self.assertEqual(await first.flush(), 0)
+        first.observe(tweet_data('1', 5, 4.0))
+        self.assertEqual(await first.flush(), 1)
+        self.assertEqual(flushed, ['1'])
+        self.assertEqual(db.profiles[1]['tweet_count'], 2)
+        self.assertEqual(db.profiles[1]['embedding_count'], 1)
+        self.assertEqual(await first.flush(), 0)
+
+        # A second process resumes from the stored profile and adds its own deltas on top
+        second = UserProfiler(db)
+        second.observe(tweet_data('1', 1, 6.0))
+        await second.flush()
+        profile = second.profile('1')
+        self.assertEqual(profile['tweet_count'], 3)
+        self.assertAlmostEqual(profile['scores']['engagement_score']['mean'], 4.0)
+        self.assertEqual(profile['first_seen'], datetime(2024, 7, 3, 7, 0, 0))
+        np.testing.assert_allclose(profile['mean_embedding'], [1.0, 1.0])
+        self.assertEqual(db.profiles[1]['tweet_count'], 3)
+
+if __name__ == '__main__':
+    unittest.main()